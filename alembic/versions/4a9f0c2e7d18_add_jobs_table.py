@@ -0,0 +1,52 @@
+"""add jobs table
+
+Revision ID: 4a9f0c2e7d18
+Revises: e8b31d5a9c62
+Create Date: 2026-10-17 15:37:14.528093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9f0c2e7d18'
+down_revision: Union[str, None] = 'e8b31d5a9c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.Text(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.Text(), nullable=False, server_default='queued'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('upload_file_events_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['upload_file_events_id'], ['upload_file_events.id'], ondelete='CASCADE'),
+        sa.CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'failed')", name='ck_jobs_status'
+        ),
+    )
+    # Workers poll for the oldest queued job
+    op.create_index(
+        'idx_jobs_queued', 'jobs', ['id'], postgresql_where=sa.text("status = 'queued'")
+    )
+    op.create_index('idx_jobs_upload_file_events_id', 'jobs', ['upload_file_events_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_jobs_upload_file_events_id', table_name='jobs')
+    op.drop_index('idx_jobs_queued', table_name='jobs')
+    op.drop_table('jobs')
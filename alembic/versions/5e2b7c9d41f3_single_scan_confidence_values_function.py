@@ -0,0 +1,254 @@
+"""single scan confidence values function
+
+Revision ID: 5e2b7c9d41f3
+Revises: 79d68f42b636
+Create Date: 2026-10-17 11:03:27.640115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9d41f3'
+down_revision: Union[str, None] = '79d68f42b636'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same signature and results as 80811109be28, but the sensor's rows are read
+    # once: the interval expression is computed in an inner select, and all
+    # aggregates plus the five percentiles (one sort via percentile_cont over an
+    # array of fractions) come out of a single GROUP BY.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION get_sensor_aggregated_measurements(
+        p_sensor_id INTEGER,
+        p_interval TEXT DEFAULT 'hour',
+        p_interval_value INTEGER DEFAULT 1,
+        p_start_date TIMESTAMP DEFAULT NULL,
+        p_end_date TIMESTAMP DEFAULT NULL,
+        p_min_value FLOAT DEFAULT NULL,
+        p_max_value FLOAT DEFAULT NULL
+    )
+    RETURNS TABLE (
+        measurement_time TIMESTAMP,
+        value FLOAT,
+        median_value FLOAT,
+        point_count BIGINT,
+        lower_bound FLOAT,
+        upper_bound FLOAT,
+        parametric_lower_bound FLOAT,
+        parametric_upper_bound FLOAT,
+        std_dev FLOAT,
+        min_value FLOAT,
+        max_value FLOAT,
+        percentile_25 FLOAT,
+        percentile_75 FLOAT,
+        ci_method TEXT,
+        confidence_level NUMERIC
+    ) AS $$
+    DECLARE
+        interval_sql TEXT;
+    BEGIN
+        -- Handle custom interval sizes (e.g., 15 minutes)
+        IF p_interval = 'minute' AND p_interval_value > 1 THEN
+            interval_sql := format('date_trunc(''hour'', collectiontime) +
+                                INTERVAL ''%s min'' * (EXTRACT(MINUTE FROM collectiontime)::INTEGER / %s)',
+                                p_interval_value, p_interval_value);
+        ELSIF p_interval = 'hour' AND p_interval_value > 1 THEN
+            interval_sql := format('date_trunc(''day'', collectiontime) +
+                                INTERVAL ''%s hour'' * (EXTRACT(HOUR FROM collectiontime)::INTEGER / %s)',
+                                p_interval_value, p_interval_value);
+        ELSE
+            interval_sql := format('date_trunc(%L, collectiontime)', p_interval);
+        END IF;
+
+        RETURN QUERY EXECUTE format(
+            'SELECT
+                s.interval_start AS measurement_time,
+                s.avg_value AS value,
+                s.pct[3] AS median_value,
+                s.point_count,
+                s.pct[1] AS lower_bound,
+                s.pct[5] AS upper_bound,
+                s.avg_value - s.margin AS parametric_lower_bound,
+                s.avg_value + s.margin AS parametric_upper_bound,
+                s.std_dev,
+                s.min_value,
+                s.max_value,
+                s.pct[2] AS percentile_25,
+                s.pct[4] AS percentile_75,
+                ''percentile'' AS ci_method,
+                0.95 AS confidence_level
+            FROM (
+                SELECT
+                    g.*,
+                    (CASE
+                        WHEN g.point_count >= 30 THEN 1.96
+                        WHEN g.point_count >= 20 THEN 2.09
+                        WHEN g.point_count >= 10 THEN 2.23
+                        ELSE 2.58
+                    END) * (g.std_dev / SQRT(g.point_count)) AS margin
+                FROM (
+                    SELECT
+                        m.interval_start,
+                        AVG(m.measurementvalue) AS avg_value,
+                        COUNT(*) AS point_count,
+                        STDDEV(m.measurementvalue) AS std_dev,
+                        MIN(m.measurementvalue) AS min_value,
+                        MAX(m.measurementvalue) AS max_value,
+                        percentile_cont(ARRAY[0.025, 0.25, 0.5, 0.75, 0.975])
+                            WITHIN GROUP (ORDER BY m.measurementvalue) AS pct
+                    FROM (
+                        SELECT %s AS interval_start, measurementvalue
+                        FROM measurements
+                        WHERE
+                            sensorid = $1
+                            AND ($2::TIMESTAMP IS NULL OR collectiontime >= $2)
+                            AND ($3::TIMESTAMP IS NULL OR collectiontime <= $3)
+                            AND ($4::FLOAT IS NULL OR measurementvalue >= $4)
+                            AND ($5::FLOAT IS NULL OR measurementvalue <= $5)
+                    ) m
+                    GROUP BY m.interval_start
+                    HAVING COUNT(*) > 1
+                ) g
+            ) s
+            ORDER BY measurement_time',
+            interval_sql
+        ) USING p_sensor_id, p_start_date, p_end_date, p_min_value, p_max_value;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Restore the two-CTE version from 80811109be28
+    op.execute("""
+    CREATE OR REPLACE FUNCTION get_sensor_aggregated_measurements(
+        p_sensor_id INTEGER,
+        p_interval TEXT DEFAULT 'hour',
+        p_interval_value INTEGER DEFAULT 1,
+        p_start_date TIMESTAMP DEFAULT NULL,
+        p_end_date TIMESTAMP DEFAULT NULL,
+        p_min_value FLOAT DEFAULT NULL,
+        p_max_value FLOAT DEFAULT NULL
+    )
+    RETURNS TABLE (
+        measurement_time TIMESTAMP,
+        value FLOAT,
+        median_value FLOAT,
+        point_count BIGINT,  -- Changed from INTEGER to BIGINT
+        lower_bound FLOAT,
+        upper_bound FLOAT,
+        parametric_lower_bound FLOAT,
+        parametric_upper_bound FLOAT,
+        std_dev FLOAT,
+        min_value FLOAT,
+        max_value FLOAT,
+        percentile_25 FLOAT,
+        percentile_75 FLOAT,
+        ci_method TEXT,
+        confidence_level NUMERIC
+    ) AS $$
+    DECLARE
+        interval_sql TEXT;
+    BEGIN
+        -- Handle custom interval sizes (e.g., 15 minutes)
+        IF p_interval = 'minute' AND p_interval_value > 1 THEN
+            interval_sql := format('date_trunc(''hour'', collectiontime) +
+                                INTERVAL ''%s min'' * (EXTRACT(MINUTE FROM collectiontime)::INTEGER / %s)',
+                                p_interval_value, p_interval_value);
+        ELSIF p_interval = 'hour' AND p_interval_value > 1 THEN
+            interval_sql := format('date_trunc(''day'', collectiontime) +
+                                INTERVAL ''%s hour'' * (EXTRACT(HOUR FROM collectiontime)::INTEGER / %s)',
+                                p_interval_value, p_interval_value);
+        ELSE
+            interval_sql := format('date_trunc(%L, collectiontime)', p_interval);
+        END IF;
+
+        -- Using the alternative approach without arrays to avoid potential issues
+        RETURN QUERY EXECUTE format(
+            'WITH aggregated_stats AS (
+                SELECT
+                    %s AS interval_start,
+                    AVG(measurementvalue) AS avg_value,
+                    COUNT(*) AS point_count,
+                    STDDEV(measurementvalue) AS std_dev,
+                    MIN(measurementvalue) AS min_value,
+                    MAX(measurementvalue) AS max_value
+                FROM
+                    measurements
+                WHERE
+                    sensorid = $1
+                    AND ($2::TIMESTAMP IS NULL OR collectiontime >= $2)
+                    AND ($3::TIMESTAMP IS NULL OR collectiontime <= $3)
+                    AND ($4::FLOAT IS NULL OR measurementvalue >= $4)
+                    AND ($5::FLOAT IS NULL OR measurementvalue <= $5)
+                GROUP BY
+                    interval_start
+                ORDER BY
+                    interval_start
+            ),
+            percentile_stats AS (
+                SELECT
+                    %s AS interval_start,
+                    percentile_cont(0.025) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_2_5,
+                    percentile_cont(0.25) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_25,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY measurementvalue) AS median_value,
+                    percentile_cont(0.75) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_75,
+                    percentile_cont(0.975) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_97_5
+                FROM
+                    measurements
+                WHERE
+                    sensorid = $1
+                    AND ($2::TIMESTAMP IS NULL OR collectiontime >= $2)
+                    AND ($3::TIMESTAMP IS NULL OR collectiontime <= $3)
+                    AND ($4::FLOAT IS NULL OR measurementvalue >= $4)
+                    AND ($5::FLOAT IS NULL OR measurementvalue <= $5)
+                GROUP BY
+                    interval_start
+            )
+            SELECT
+                a.interval_start AS measurement_time,
+                a.avg_value AS value,
+                p.median_value,
+                a.point_count,
+                p.percentile_2_5 AS lower_bound,
+                p.percentile_97_5 AS upper_bound,
+                a.avg_value - (CASE
+                            WHEN a.point_count >= 30 THEN 1.96
+                            WHEN a.point_count >= 20 THEN 2.09
+                            WHEN a.point_count >= 10 THEN 2.23
+                            ELSE 2.58
+                            END) * (a.std_dev / SQRT(GREATEST(a.point_count, 1))) AS parametric_lower_bound,
+                a.avg_value + (CASE
+                            WHEN a.point_count >= 30 THEN 1.96
+                            WHEN a.point_count >= 20 THEN 2.09
+                            WHEN a.point_count >= 10 THEN 2.23
+                            ELSE 2.58
+                            END) * (a.std_dev / SQRT(GREATEST(a.point_count, 1))) AS parametric_upper_bound,
+                a.std_dev,
+                a.min_value,
+                a.max_value,
+                p.percentile_25,
+                p.percentile_75,
+                ''percentile'' AS ci_method,
+                0.95 AS confidence_level
+            FROM
+                aggregated_stats a
+            JOIN
+                percentile_stats p ON a.interval_start = p.interval_start
+            WHERE
+                a.point_count > 1
+            ORDER BY
+                measurement_time',
+            interval_sql, interval_sql
+        ) USING p_sensor_id, p_start_date, p_end_date, p_min_value, p_max_value;
+    END;
+    $$ LANGUAGE plpgsql;
+""")
@@ -0,0 +1,28 @@
+"""add job heartbeat
+
+Revision ID: 6b3e9d2f4a17
+Revises: d41c6e9a8b05
+Create Date: 2026-10-17 21:12:40.315276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b3e9d2f4a17'
+down_revision: Union[str, None] = 'd41c6e9a8b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'heartbeat_at')
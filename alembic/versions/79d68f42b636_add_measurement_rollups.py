@@ -0,0 +1,167 @@
+"""add measurement rollups
+
+Revision ID: 79d68f42b636
+Revises: 778a9dbdeb5e
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '79d68f42b636'
+down_revision: Union[str, None] = '778a9dbdeb5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'measurement_rollups',
+        sa.Column('sensorid', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.Text(), nullable=False),
+        sa.Column('bucket_start', sa.TIMESTAMP(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('sum', sa.Float(), nullable=False),
+        sa.Column('sum_sq', sa.Float(), nullable=False),
+        sa.Column('min', sa.Float(), nullable=False),
+        sa.Column('max', sa.Float(), nullable=False),
+        sa.Column('sketch', postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint('sensorid', 'resolution', 'bucket_start'),
+        sa.ForeignKeyConstraint(['sensorid'], ['sensors.sensorid'], ondelete='CASCADE'),
+        sa.CheckConstraint("resolution IN ('minute', 'hour', 'day')", name='ck_measurement_rollups_resolution'),
+    )
+
+    # Quantile sketch: a log-bucketed histogram (DDSketch, 2% relative accuracy) stored as
+    # {"p<k>": n, "n<k>": n, "z": n}. Sketches merge by adding counts per bin.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION sketch_bin(v DOUBLE PRECISION)
+    RETURNS TEXT AS $$
+        SELECT CASE
+            WHEN v > 1e-9 THEN 'p' || CEIL(LN(v) / LN(1.02 / 0.98))::INTEGER
+            WHEN v < -1e-9 THEN 'n' || CEIL(LN(-v) / LN(1.02 / 0.98))::INTEGER
+            ELSE 'z'
+        END;
+    $$ LANGUAGE sql IMMUTABLE STRICT;
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION sketch_merge(a JSONB, b JSONB)
+    RETURNS JSONB AS $$
+        SELECT COALESCE(jsonb_object_agg(key, total), '{}'::JSONB)
+        FROM (
+            SELECT key, SUM(value::BIGINT) AS total
+            FROM (
+                SELECT * FROM jsonb_each_text(a)
+                UNION ALL
+                SELECT * FROM jsonb_each_text(b)
+            ) bins
+            GROUP BY key
+        ) merged;
+    $$ LANGUAGE sql IMMUTABLE STRICT;
+    """)
+    op.execute("""
+    CREATE AGGREGATE sketch_merge_agg(JSONB) (
+        SFUNC = sketch_merge,
+        STYPE = JSONB,
+        INITCOND = '{}'
+    );
+    """)
+
+    # Rebuild every rollup bucket of a sensor that overlaps [p_start, p_end].
+    # Minute buckets are computed from raw measurements in one pass; hour and day
+    # buckets are merged from the finer rollups, so the cost is proportional to
+    # the time span touched, not to the sensor's history.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION refresh_measurement_rollups(
+        p_sensor_id INTEGER,
+        p_start TIMESTAMP,
+        p_end TIMESTAMP
+    )
+    RETURNS VOID AS $$
+    DECLARE
+        minute_start TIMESTAMP := date_trunc('hour', p_start);
+        minute_end TIMESTAMP := date_trunc('hour', p_end) + INTERVAL '1 hour';
+        day_start TIMESTAMP := date_trunc('day', p_start);
+        day_end TIMESTAMP := date_trunc('day', p_end) + INTERVAL '1 day';
+    BEGIN
+        DELETE FROM measurement_rollups
+        WHERE sensorid = p_sensor_id
+          AND resolution = 'minute'
+          AND bucket_start >= minute_start AND bucket_start < minute_end;
+
+        INSERT INTO measurement_rollups (sensorid, resolution, bucket_start, count, sum, sum_sq, min, max, sketch)
+        SELECT
+            p_sensor_id, 'minute', bucket, SUM(n), SUM(s), SUM(ss), MIN(mn), MAX(mx),
+            jsonb_object_agg(bin, n)
+        FROM (
+            SELECT
+                date_trunc('minute', collectiontime) AS bucket,
+                sketch_bin(measurementvalue) AS bin,
+                COUNT(*) AS n,
+                SUM(measurementvalue) AS s,
+                SUM(measurementvalue * measurementvalue) AS ss,
+                MIN(measurementvalue) AS mn,
+                MAX(measurementvalue) AS mx
+            FROM measurements
+            WHERE sensorid = p_sensor_id
+              AND collectiontime >= minute_start AND collectiontime < minute_end
+            GROUP BY 1, 2
+        ) bins
+        GROUP BY bucket;
+
+        DELETE FROM measurement_rollups
+        WHERE sensorid = p_sensor_id
+          AND resolution = 'hour'
+          AND bucket_start >= minute_start AND bucket_start < minute_end;
+
+        INSERT INTO measurement_rollups (sensorid, resolution, bucket_start, count, sum, sum_sq, min, max, sketch)
+        SELECT
+            p_sensor_id, 'hour', date_trunc('hour', bucket_start),
+            SUM(count), SUM(sum), SUM(sum_sq), MIN(min), MAX(max), sketch_merge_agg(sketch)
+        FROM measurement_rollups
+        WHERE sensorid = p_sensor_id
+          AND resolution = 'minute'
+          AND bucket_start >= minute_start AND bucket_start < minute_end
+        GROUP BY 3;
+
+        DELETE FROM measurement_rollups
+        WHERE sensorid = p_sensor_id
+          AND resolution = 'day'
+          AND bucket_start >= day_start AND bucket_start < day_end;
+
+        INSERT INTO measurement_rollups (sensorid, resolution, bucket_start, count, sum, sum_sq, min, max, sketch)
+        SELECT
+            p_sensor_id, 'day', date_trunc('day', bucket_start),
+            SUM(count), SUM(sum), SUM(sum_sq), MIN(min), MAX(max), sketch_merge_agg(sketch)
+        FROM measurement_rollups
+        WHERE sensorid = p_sensor_id
+          AND resolution = 'hour'
+          AND bucket_start >= day_start AND bucket_start < day_end
+        GROUP BY 3;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    # Backfill existing measurements
+    op.execute("""
+        SELECT refresh_measurement_rollups(sensorid, first_time, last_time)
+        FROM (
+            SELECT sensorid, MIN(collectiontime) AS first_time, MAX(collectiontime) AS last_time
+            FROM measurements
+            GROUP BY sensorid
+        ) spans;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS refresh_measurement_rollups(INTEGER, TIMESTAMP, TIMESTAMP);")
+    op.execute("DROP AGGREGATE IF EXISTS sketch_merge_agg(JSONB);")
+    op.execute("DROP FUNCTION IF EXISTS sketch_merge(JSONB, JSONB);")
+    op.execute("DROP FUNCTION IF EXISTS sketch_bin(DOUBLE PRECISION);")
+    op.drop_table('measurement_rollups')
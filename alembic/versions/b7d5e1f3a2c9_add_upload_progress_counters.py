@@ -0,0 +1,39 @@
+"""add upload progress counters
+
+Revision ID: b7d5e1f3a2c9
+Revises: 4a9f0c2e7d18
+Create Date: 2026-10-17 16:52:39.110847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d5e1f3a2c9'
+down_revision: Union[str, None] = '4a9f0c2e7d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('upload_file_events', sa.Column('rows_parsed', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('upload_file_events', sa.Column('rows_inserted', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('upload_file_events', sa.Column('rows_rejected', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('upload_file_events', sa.Column('processing_started_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('upload_file_events', sa.Column('processing_finished_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('upload_file_events', sa.Column('errors', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('upload_file_events', 'errors')
+    op.drop_column('upload_file_events', 'processing_finished_at')
+    op.drop_column('upload_file_events', 'processing_started_at')
+    op.drop_column('upload_file_events', 'rows_rejected')
+    op.drop_column('upload_file_events', 'rows_inserted')
+    op.drop_column('upload_file_events', 'rows_parsed')
@@ -0,0 +1,207 @@
+"""incremental sensor statistics
+
+Revision ID: c2f4a8e61b07
+Revises: 5e2b7c9d41f3
+Create Date: 2026-10-17 13:26:08.214379
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f4a8e61b07'
+down_revision: Union[str, None] = '5e2b7c9d41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mergeable state kept next to the derived statistics
+    op.add_column('sensor_statistics', sa.Column('sum', sa.Float(), nullable=True))
+    op.add_column('sensor_statistics', sa.Column('sum_sq', sa.Float(), nullable=True))
+    op.add_column('sensor_statistics', sa.Column('sketch', postgresql.JSONB(), nullable=True))
+
+    # Quantile of a sketch built by sketch_bin(), mirrors app.utils.sketch.sketch_quantiles
+    op.execute("""
+    CREATE OR REPLACE FUNCTION sketch_quantile(s JSONB, q DOUBLE PRECISION)
+    RETURNS DOUBLE PRECISION AS $$
+        WITH bins AS (
+            SELECT
+                CASE
+                    WHEN key = 'z' THEN 0
+                    WHEN left(key, 1) = 'p' THEN 2 * power(1.02 / 0.98, substr(key, 2)::INTEGER) / (1.02 / 0.98 + 1)
+                    ELSE -2 * power(1.02 / 0.98, substr(key, 2)::INTEGER) / (1.02 / 0.98 + 1)
+                END::DOUBLE PRECISION AS v,
+                value::BIGINT AS n
+            FROM jsonb_each_text(s)
+        ),
+        ranked AS (
+            SELECT v, SUM(n) OVER (ORDER BY v) AS cumulative, SUM(n) OVER () AS total
+            FROM bins
+        )
+        SELECT v FROM ranked WHERE cumulative > q * (total - 1) ORDER BY v LIMIT 1;
+    $$ LANGUAGE sql IMMUTABLE STRICT;
+    """)
+
+    # Rebuild one sensor's statistics from its day rollups plus two index lookups
+    # for the first and last measurement, without reading the sensor's history.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION rebuild_sensor_statistics(p_sensor_id INTEGER)
+    RETURNS VOID AS $$
+    BEGIN
+        DELETE FROM sensor_statistics WHERE sensorid = p_sensor_id;
+
+        INSERT INTO sensor_statistics (
+            sensorid, max_value, min_value, avg_value, stddev_value,
+            percentile_90, percentile_95, percentile_99, count,
+            first_measurement_value, first_measurement_collectiontime,
+            last_measurement_value, last_measurement_collectiontime,
+            stats_last_updated, sum, sum_sq, sketch
+        )
+        SELECT
+            p_sensor_id, r.mx, r.mn, r.s / r.n,
+            CASE WHEN r.n > 1 THEN SQRT(GREATEST((r.ss - r.s * r.s / r.n) / (r.n - 1), 0)) END,
+            sketch_quantile(r.sk, 0.90), sketch_quantile(r.sk, 0.95), sketch_quantile(r.sk, 0.99), r.n,
+            f.measurementvalue, f.collectiontime,
+            l.measurementvalue, l.collectiontime,
+            NOW(), r.s, r.ss, r.sk
+        FROM (
+            SELECT
+                SUM(count) AS n, SUM(sum) AS s, SUM(sum_sq) AS ss,
+                MIN(min) AS mn, MAX(max) AS mx, sketch_merge_agg(sketch) AS sk
+            FROM measurement_rollups
+            WHERE sensorid = p_sensor_id AND resolution = 'day'
+        ) r,
+        LATERAL (
+            SELECT measurementvalue, collectiontime FROM measurements
+            WHERE sensorid = p_sensor_id ORDER BY collectiontime ASC LIMIT 1
+        ) f,
+        LATERAL (
+            SELECT measurementvalue, collectiontime FROM measurements
+            WHERE sensorid = p_sensor_id ORDER BY collectiontime DESC LIMIT 1
+        ) l
+        WHERE r.n > 0;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    # Merge the rows one upload inserted for a sensor into its statistics. Only the
+    # upload's time window is read, so the cost follows the size of the upload.
+    # Rows skipped by ON CONFLICT DO NOTHING keep their original upload id and are
+    # not counted twice. If the stored statistics are missing or no longer add up
+    # (measurements changed outside uploads), they are rebuilt from the rollups.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION merge_sensor_statistics(
+        p_sensor_id INTEGER,
+        p_upload_event_id INTEGER,
+        p_start TIMESTAMP,
+        p_end TIMESTAMP
+    )
+    RETURNS VOID AS $$
+    DECLARE
+        ss sensor_statistics%ROWTYPE;
+        stats_found BOOLEAN;
+        batch RECORD;
+        batch_first RECORD;
+        batch_last RECORD;
+        rollup_count BIGINT;
+        n BIGINT;
+        s DOUBLE PRECISION;
+        sq DOUBLE PRECISION;
+        merged JSONB;
+    BEGIN
+        SELECT * INTO ss FROM sensor_statistics WHERE sensorid = p_sensor_id FOR UPDATE;
+        stats_found := FOUND;
+
+        SELECT
+            SUM(cnt) AS n, SUM(total) AS s, SUM(total_sq) AS sq,
+            MIN(mn) AS mn, MAX(mx) AS mx, jsonb_object_agg(bin, cnt) AS sketch
+        INTO batch
+        FROM (
+            SELECT
+                sketch_bin(measurementvalue) AS bin,
+                COUNT(*) AS cnt,
+                SUM(measurementvalue) AS total,
+                SUM(measurementvalue * measurementvalue) AS total_sq,
+                MIN(measurementvalue) AS mn,
+                MAX(measurementvalue) AS mx
+            FROM measurements
+            WHERE sensorid = p_sensor_id
+              AND collectiontime >= p_start AND collectiontime <= p_end
+              AND upload_file_events_id = p_upload_event_id
+            GROUP BY 1
+        ) bins;
+
+        SELECT SUM(count) INTO rollup_count
+        FROM measurement_rollups
+        WHERE sensorid = p_sensor_id AND resolution = 'day';
+
+        IF NOT stats_found OR ss.stats_last_updated IS NULL OR ss.sketch IS NULL
+           OR ss.count + COALESCE(batch.n, 0) IS DISTINCT FROM rollup_count THEN
+            PERFORM rebuild_sensor_statistics(p_sensor_id);
+            RETURN;
+        END IF;
+
+        IF batch.n IS NULL THEN
+            RETURN;
+        END IF;
+
+        SELECT measurementvalue, collectiontime INTO batch_first
+        FROM measurements
+        WHERE sensorid = p_sensor_id
+          AND collectiontime >= p_start AND collectiontime <= p_end
+          AND upload_file_events_id = p_upload_event_id
+        ORDER BY collectiontime ASC LIMIT 1;
+
+        SELECT measurementvalue, collectiontime INTO batch_last
+        FROM measurements
+        WHERE sensorid = p_sensor_id
+          AND collectiontime >= p_start AND collectiontime <= p_end
+          AND upload_file_events_id = p_upload_event_id
+        ORDER BY collectiontime DESC LIMIT 1;
+
+        n := ss.count + batch.n;
+        s := ss.sum + batch.s;
+        sq := ss.sum_sq + batch.sq;
+        merged := sketch_merge(ss.sketch, batch.sketch);
+
+        UPDATE sensor_statistics SET
+            count = n,
+            sum = s,
+            sum_sq = sq,
+            sketch = merged,
+            min_value = LEAST(ss.min_value, batch.mn::NUMERIC),
+            max_value = GREATEST(ss.max_value, batch.mx::NUMERIC),
+            avg_value = s / n,
+            stddev_value = CASE WHEN n > 1 THEN SQRT(GREATEST((sq - s * s / n) / (n - 1), 0)) END,
+            percentile_90 = sketch_quantile(merged, 0.90),
+            percentile_95 = sketch_quantile(merged, 0.95),
+            percentile_99 = sketch_quantile(merged, 0.99),
+            first_measurement_value = CASE
+                WHEN batch_first.collectiontime < ss.first_measurement_collectiontime
+                THEN batch_first.measurementvalue ELSE ss.first_measurement_value END,
+            first_measurement_collectiontime = LEAST(ss.first_measurement_collectiontime, batch_first.collectiontime),
+            last_measurement_value = CASE
+                WHEN batch_last.collectiontime > ss.last_measurement_collectiontime
+                THEN batch_last.measurementvalue ELSE ss.last_measurement_value END,
+            last_measurement_collectiontime = GREATEST(ss.last_measurement_collectiontime, batch_last.collectiontime),
+            stats_last_updated = NOW()
+        WHERE sensorid = p_sensor_id;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS merge_sensor_statistics(INTEGER, INTEGER, TIMESTAMP, TIMESTAMP);")
+    op.execute("DROP FUNCTION IF EXISTS rebuild_sensor_statistics(INTEGER);")
+    op.execute("DROP FUNCTION IF EXISTS sketch_quantile(JSONB, DOUBLE PRECISION);")
+    op.drop_column('sensor_statistics', 'sketch')
+    op.drop_column('sensor_statistics', 'sum_sq')
+    op.drop_column('sensor_statistics', 'sum')
@@ -0,0 +1,28 @@
+"""add upload row watermark
+
+Revision ID: d41c6e9a8b05
+Revises: b7d5e1f3a2c9
+Create Date: 2026-10-17 19:05:12.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c6e9a8b05'
+down_revision: Union[str, None] = 'b7d5e1f3a2c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('upload_file_events', sa.Column('rows_committed', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('upload_file_events', 'rows_committed')
@@ -0,0 +1,131 @@
+"""add bulk sensor statistics refresh
+
+Revision ID: e8b31d5a9c62
+Revises: c2f4a8e61b07
+Create Date: 2026-10-17 14:48:52.907361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b31d5a9c62'
+down_revision: Union[str, None] = 'c2f4a8e61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Recompute the statistics of every sensor of a station and/or campaign in one
+    # statement. Measurements are read once, grouped by sensorid; the first and last
+    # measurement values are fetched through the (sensorid, collectiontime) index
+    # from the min/max collectiontime of that same pass. Sketches are merged from the
+    # day rollups. Returns the ids of the sensors whose statistics were rewritten or,
+    # for sensors without measurements, removed.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION refresh_sensor_statistics_bulk(
+        p_station_id INTEGER DEFAULT NULL,
+        p_campaign_id INTEGER DEFAULT NULL
+    )
+    RETURNS SETOF INTEGER AS $$
+    BEGIN
+        RETURN QUERY
+        WITH target AS (
+            SELECT s.sensorid
+            FROM sensors s
+            JOIN stations st ON st.stationid = s.stationid
+            WHERE (p_station_id IS NULL OR s.stationid = p_station_id)
+              AND (p_campaign_id IS NULL OR st.campaignid = p_campaign_id)
+        ),
+        stats AS (
+            SELECT
+                m.sensorid,
+                MAX(m.measurementvalue) AS max_val,
+                MIN(m.measurementvalue) AS min_val,
+                AVG(m.measurementvalue) AS avg_val,
+                STDDEV(m.measurementvalue) AS stddev_val,
+                percentile_cont(ARRAY[0.90, 0.95, 0.99])
+                    WITHIN GROUP (ORDER BY m.measurementvalue) AS pct,
+                COUNT(*) AS cnt,
+                SUM(m.measurementvalue) AS total,
+                SUM(m.measurementvalue * m.measurementvalue) AS total_sq,
+                MIN(m.collectiontime) AS first_time,
+                MAX(m.collectiontime) AS last_time
+            FROM measurements m
+            JOIN target t ON t.sensorid = m.sensorid
+            GROUP BY m.sensorid
+        ),
+        sketches AS (
+            SELECT r.sensorid, sketch_merge_agg(r.sketch) AS sketch
+            FROM measurement_rollups r
+            JOIN target t ON t.sensorid = r.sensorid
+            WHERE r.resolution = 'day'
+            GROUP BY r.sensorid
+        ),
+        upserted AS (
+            INSERT INTO sensor_statistics (
+                sensorid, max_value, min_value, avg_value, stddev_value,
+                percentile_90, percentile_95, percentile_99, count,
+                first_measurement_value, first_measurement_collectiontime,
+                last_measurement_value, last_measurement_collectiontime,
+                stats_last_updated, sum, sum_sq, sketch
+            )
+            SELECT
+                s.sensorid, s.max_val, s.min_val, s.avg_val, s.stddev_val,
+                s.pct[1], s.pct[2], s.pct[3], s.cnt,
+                f.measurementvalue, s.first_time,
+                l.measurementvalue, s.last_time,
+                NOW(), s.total, s.total_sq, k.sketch
+            FROM stats s
+            CROSS JOIN LATERAL (
+                SELECT measurementvalue FROM measurements
+                WHERE sensorid = s.sensorid AND collectiontime = s.first_time
+                LIMIT 1
+            ) f
+            CROSS JOIN LATERAL (
+                SELECT measurementvalue FROM measurements
+                WHERE sensorid = s.sensorid AND collectiontime = s.last_time
+                LIMIT 1
+            ) l
+            LEFT JOIN sketches k ON k.sensorid = s.sensorid
+            ON CONFLICT (sensorid) DO UPDATE SET
+                max_value = EXCLUDED.max_value,
+                min_value = EXCLUDED.min_value,
+                avg_value = EXCLUDED.avg_value,
+                stddev_value = EXCLUDED.stddev_value,
+                percentile_90 = EXCLUDED.percentile_90,
+                percentile_95 = EXCLUDED.percentile_95,
+                percentile_99 = EXCLUDED.percentile_99,
+                count = EXCLUDED.count,
+                first_measurement_value = EXCLUDED.first_measurement_value,
+                first_measurement_collectiontime = EXCLUDED.first_measurement_collectiontime,
+                last_measurement_value = EXCLUDED.last_measurement_value,
+                last_measurement_collectiontime = EXCLUDED.last_measurement_collectiontime,
+                stats_last_updated = EXCLUDED.stats_last_updated,
+                sum = EXCLUDED.sum,
+                sum_sq = EXCLUDED.sum_sq,
+                sketch = EXCLUDED.sketch
+            RETURNING sensor_statistics.sensorid
+        ),
+        cleared AS (
+            DELETE FROM sensor_statistics ss
+            USING target t
+            WHERE ss.sensorid = t.sensorid
+              AND NOT EXISTS (SELECT 1 FROM stats s WHERE s.sensorid = t.sensorid)
+            RETURNING ss.sensorid
+        )
+        SELECT sensorid FROM upserted
+        UNION ALL
+        SELECT sensorid FROM cleared;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS refresh_sensor_statistics_bulk(INTEGER, INTEGER);")
@@ -6,12 +6,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from app.api.dependencies.auth import get_current_user
 from app.api.dependencies.pytas import check_allocation_permission
 from app.api.v1.schemas.user import User
-from app.api.v1.schemas.measurement import AggregatedMeasurement, ListMeasurementsResponsePagination, MeasurementCreateResponse, MeasurementUpdate, MeasurementIn
+from app.api.v1.schemas.measurement import AggregatedMeasurement, DownsampleMethod, ListMeasurementsResponsePagination, MeasurementCreateResponse, MeasurementUpdate, MeasurementIn
 from app.db.repositories.measurement_repository import MeasurementRepository
 from app.db.repositories.sensor_repository import SensorRepository
 from app.db.session import get_db
 from app.services.measurement_service import MeasurementService
 from app.services.sensor_service import SensorService
+from app.utils.cursor import InvalidCursorError
 
 router = APIRouter(
     prefix="/campaigns/{campaign_id}/stations/{station_id}/sensors/{sensor_id}",
@@ -46,13 +47,19 @@ async def get_sensor_measurements(
     limit: int = 1000,
     page: int = 1,
     downsample_threshold: int | None = None,
+    cursor: str | None = Query(None, description="Opaque cursor from a previous response's next_cursor; takes precedence over page"),
+    full_range: bool = Query(False, description="Downsample the whole filtered range to downsample_threshold points instead of a single page"),
+    downsample_method: DownsampleMethod = Query(DownsampleMethod.LTTB, description="Downsampling algorithm; minmax and m4 are computed in the database over the whole filtered range"),
     db: Session = Depends(get_db),
 ) -> ListMeasurementsResponsePagination:
     if not check_allocation_permission(current_user, campaign_id):
         raise HTTPException(status_code=404, detail="Allocation is incorrect")
     measurement_repository = MeasurementRepository(db)
     measurement_service = MeasurementService(measurement_repository)
-    return measurement_service.list_measurements(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_measurement_value, max_value=max_measurement_value, page=page, limit=limit, downsample_threshold=downsample_threshold)
+    try:
+        return measurement_service.list_measurements(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_measurement_value, max_value=max_measurement_value, page=page, limit=limit, downsample_threshold=downsample_threshold, cursor=cursor, full_range=full_range, downsample_method=downsample_method)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/measurements/confidence-intervals", response_model=list[AggregatedMeasurement])
 async def get_measurements_with_confidence_intervals(
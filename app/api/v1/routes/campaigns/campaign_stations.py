@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Annotated
 
 from app.services.campaign_service import CampaignService
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api.dependencies.auth import get_current_user
@@ -14,14 +14,18 @@ from app.api.v1.schemas.station import (
     StationCreateResponse,
     StationUpdate,
 )
+from app.api.v1.schemas.measurement import ExportFormat, StationExportFormat
+from app.api.v1.schemas.sensor import ForceUpdateSensorStatisticsResponse
 from app.api.v1.schemas.user import User
 from app.db.session import get_db
 from app.db.repositories.station_repository import StationRepository
 from app.db.repositories.campaign_repository import CampaignRepository
 from app.db.repositories.sensor_repository import SensorRepository
 from app.db.repositories.measurement_repository import MeasurementRepository
+from app.services.sensor_service import SensorService
 from app.services.station_service import StationService
-from app.services.export_service import ExportService
+from app.services.export_service import ARROW_FILE_TYPES, ExportService
+from app.utils.gzip_stream import csv_streaming_response
 
 router = APIRouter(prefix="/campaigns/{campaign_id}", tags=["stations"])
 
@@ -94,6 +98,25 @@ def delete_sensor(
     return Response(status_code=204)
 
 
+@router.post("/stations/sensors/statistics",
+             response_model=ForceUpdateSensorStatisticsResponse,
+             description="Force update sensor statistics for all sensors in all stations of the campaign")
+def force_update_campaign_sensor_statistics(
+    campaign_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ForceUpdateSensorStatisticsResponse:
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=404, detail="Allocation is incorrect")
+
+    sensor_service = SensorService(
+        sensor_repository=SensorRepository(db),
+        measurement_repository=MeasurementRepository(db)
+    )
+
+    return sensor_service.force_update_campaign_sensor_statistics(campaign_id)
+
+
 @router.put("/stations/{station_id}", response_model=StationCreateResponse)
 def update_station(
     station_id: int,
@@ -165,10 +188,15 @@ async def export_measurements_csv(
         datetime | None, Query(description="Start date filter")
     ] = None,
     end_date: Annotated[datetime | None, Query(description="End date filter")] = None,
+    format: Annotated[
+        StationExportFormat,
+        Query(description="csv, parquet or arrow (Arrow IPC stream)"),
+    ] = StationExportFormat.CSV,
+    accept_encoding: Annotated[str | None, Header()] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> StreamingResponse:
-    """Export measurements for a station as CSV with streaming support."""
+    """Export measurements for a station as CSV, Parquet or Arrow with streaming support."""
     if not check_allocation_permission(current_user, campaign_id):
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -181,10 +209,18 @@ async def export_measurements_csv(
     # Initialize export service
     export_service = ExportService(SensorRepository(db), MeasurementRepository(db))
 
-    return StreamingResponse(
+    export_format = ExportFormat(format.value)
+    if export_format in ARROW_FILE_TYPES:
+        media_type, extension = ARROW_FILE_TYPES[export_format]
+        return StreamingResponse(
+            export_service.export_measurements_arrow(station_id, export_format, start_date, end_date),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="measurements-{station_id}.{extension}"'
+            },
+        )
+    return csv_streaming_response(
         export_service.export_measurements_csv(station_id, start_date, end_date),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="measurements-{station_id}.csv"'
-        },
+        f"measurements-{station_id}.csv",
+        accept_encoding,
     )
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api.dependencies.pytas import check_allocation_permission
 
@@ -14,10 +15,16 @@ from app.api.v1.schemas.campaign import (
     CampaignsIn,
     CampaignUpdate,
 )
+from app.api.v1.schemas.measurement import ExportFormat
 from app.api.v1.schemas.user import User
 from app.db.repositories.campaign_repository import CampaignRepository
+from app.db.repositories.measurement_repository import MeasurementRepository
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.station_repository import StationRepository
 from app.db.session import get_db
 from app.services.campaign_service import CampaignService
+from app.services.export_service import ARROW_FILE_TYPES, ExportService
+from app.utils.gzip_stream import csv_streaming_response
 
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
@@ -83,6 +90,57 @@ async def get_campaign(
     return campaign
 
 
+@router.get("/{campaign_id}/measurements/export")
+async def export_campaign_measurements(
+    campaign_id: int,
+    start_date: Annotated[
+        datetime | None, Query(description="Start date filter")
+    ] = None,
+    end_date: Annotated[datetime | None, Query(description="End date filter")] = None,
+    format: Annotated[
+        ExportFormat,
+        Query(
+            description="csv, parquet or arrow (Arrow IPC stream): one file with a station_id column; "
+            "zip: the sensors and measurements files of each station"
+        ),
+    ] = ExportFormat.CSV,
+    accept_encoding: Annotated[str | None, Header()] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Export the measurements of every station of a campaign in one streamed pass."""
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    if not CampaignRepository(db).campaign_exists(campaign_id):
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    export_service = ExportService(
+        SensorRepository(db), MeasurementRepository(db), StationRepository(db)
+    )
+    if format in ARROW_FILE_TYPES:
+        media_type, extension = ARROW_FILE_TYPES[format]
+        return StreamingResponse(
+            export_service.export_campaign_measurements_arrow(campaign_id, format, start_date, end_date),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="measurements-campaign-{campaign_id}.{extension}"'
+            },
+        )
+    if format == ExportFormat.ZIP:
+        return StreamingResponse(
+            export_service.export_campaign_measurements_zip(campaign_id, start_date, end_date),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="campaign-{campaign_id}.zip"'
+            },
+        )
+    return csv_streaming_response(
+        export_service.export_campaign_measurements_csv(campaign_id, start_date, end_date),
+        f"measurements-campaign-{campaign_id}.csv",
+        accept_encoding,
+    )
+
+
 @router.delete("/{campaign_id}", status_code=204)
 def delete_sensor(
     campaign_id: int,
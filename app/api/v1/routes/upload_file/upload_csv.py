@@ -1,20 +1,25 @@
 # type: ignore
 import time
-from datetime import datetime
 from typing import Annotated, Dict, Any, List
 
 from starlette.formparsers import MultiPartParser
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Path, Query, Request, UploadFile
 from sqlalchemy.orm import Session
 
 from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.pytas import check_allocation_permission
 from app.api.v1.schemas.user import User
 from app.api.v1.schemas.error import Error
-from app.db.models.upload_file_event import UploadFileEvent
 from app.db.session import SessionLocal, get_db
-from app.db.repositories.sensor_repository import SensorRepository
 from app.db.repositories.measurement_repository import MeasurementRepository
-from app.utils.upload_csv import process_sensors_file, process_measurements_file, update_sensor_statistics
+from app.db.repositories.job_repository import JobRepository
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services.job_service import JobService
+from app.services.stream_service import MeasurementStreamService
+from app.services.upload_service import UploadService
+from app.api.v1.schemas.job import UploadJobsResponse, UploadStatusResponse
+from app.utils.upload_csv import process_sensors_file, process_measurements_file
 
 
 # Constants
@@ -24,12 +29,19 @@ DEFAULT_VARIABLE_NAME = 'No BestGuess Formula'
 
 router = APIRouter(prefix="/uploadfile_csv", tags=["uploadfile_csv"])
 
-def create_upload_event(session: Session) -> UploadFileEvent:
-    """Create and return a new upload file event."""
-    upload_event = UploadFileEvent(time=datetime.now())
-    session.add(upload_event)
-    session.commit()
-    return upload_event
+
+def get_upload_service(db: Session) -> UploadService:
+    upload_file_event_repository = UploadFileEventRepository(db)
+    return UploadService(upload_file_event_repository, JobService(JobRepository(db), upload_file_event_repository))
+
+
+def check_upload_permission(db: Session, current_user: User, upload_event_id: int) -> None:
+    """Reject callers without access to the campaign an upload event belongs to."""
+    campaign_id = get_upload_service(db).get_campaign_id(upload_event_id)
+    if campaign_id is None:
+        raise HTTPException(status_code=404, detail="Upload event not found")
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=403, detail="Access denied")
 
 
 @router.post("/campaign/{campaign_id}/station/{station_id}/sensor")
@@ -38,12 +50,18 @@ def post_sensor_and_measurement(
     station_id: int,
     upload_file_sensors: Annotated[UploadFile, File(description="File with sensors.")],
     upload_file_measurements: Annotated[UploadFile, File(description="File with measurements.")],
+    background: bool = Query(False, description="Queue the files for the worker and return immediately."),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    """Process sensor and measurement files and store data in the database."""
+    """Process sensor and measurement files and store data in the database.
+
+    With background=true the files are handed to the worker and progress is
+    reported by GET /uploadfile_csv/events/{upload_event_id}.
+    """
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=403, detail="Access denied")
     start_time = time.time()
-    sensor_repository = SensorRepository(db)
 
     response = {
         'uploaded_file_sensors stored in memory': upload_file_sensors._in_memory,
@@ -51,7 +69,21 @@ def post_sensor_and_measurement(
     }
 
     # Create upload event
-    upload_event = create_upload_event(db)
+    upload_file_event_repository = UploadFileEventRepository(db)
+    upload_event = upload_file_event_repository.create_upload_event()
+    job_service = JobService(JobRepository(db), upload_file_event_repository)
+
+    if background:
+        job = job_service.enqueue_upload_processing(
+            upload_event.id, station_id, campaign_id,
+            upload_file_sensors.file, upload_file_measurements.file,
+        )
+        upload_file_sensors.file.close()
+        upload_file_measurements.file.close()
+        response.update({'upload_event_id': upload_event.id, 'job_id': job.id, 'status': job.status})
+        return response
+
+    upload_file_event_repository.start_processing(upload_event.id)
 
     # Process sensors file
     alias_to_sensorid_map = process_sensors_file(
@@ -60,12 +92,21 @@ def post_sensor_and_measurement(
     upload_file_sensors.file.close()
 
     # Process measurements file
-    total_measurements, errors = process_measurements_file(upload_file_measurements, station_id, alias_to_sensorid_map, upload_event.id, db)
+    total_measurements, errors, sensor_spans = process_measurements_file(
+        upload_file_measurements, station_id, alias_to_sensorid_map, upload_event.id, db,
+        on_progress=lambda parsed, inserted, rejected: upload_file_event_repository.update_progress(
+            upload_event.id, parsed, inserted, rejected
+        ),
+    )
     upload_file_measurements.file.close()
+    upload_file_event_repository.finish_processing(upload_event.id, errors)
     data_processing_time = round(time.time() - start_time, 1)
-    update_sensor_statistics(sensor_repository, alias_to_sensorid_map)
+
+    # Statistics, rollups and bounding boxes are refreshed by the background worker
+    job_service.enqueue_upload_refresh(upload_event.id, station_id, campaign_id, sensor_spans)
 
     response.update({
+        'upload_event_id': upload_event.id,
         'Total sensors processed': len(alias_to_sensorid_map),
         'Total measurements added to database': total_measurements,
         'Data Processing time': f"{data_processing_time} seconds.",
@@ -74,3 +115,136 @@ def post_sensor_and_measurement(
 
     return response
 
+
+@router.post("/campaign/{campaign_id}/station/{station_id}/stream")
+async def stream_measurements(
+    campaign_id: int,
+    station_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Ingest newline-delimited JSON measurements as the request body arrives.
+
+    Each line is one row of the measurements CSV as an object, e.g.
+    {"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 20.5},
+    keyed by the aliases of any sensors of the station. Rows are inserted in
+    batches of STREAM_BATCH_ROWS lines, or every STREAM_FLUSH_SECONDS for a slow
+    (chunked) body; progress is reported by GET /uploadfile_csv/events/{upload_event_id}.
+    """
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    upload_file_event_repository = UploadFileEventRepository(db)
+    stream_service = MeasurementStreamService(
+        upload_file_event_repository,
+        SensorRepository(db),
+        JobService(JobRepository(db), upload_file_event_repository),
+    )
+    return await stream_service.ingest(station_id, campaign_id, request.stream())
+
+
+@router.get("/events/{upload_event_id}/jobs", response_model=UploadJobsResponse)
+def get_upload_jobs(
+    upload_event_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadJobsResponse:
+    """Status of the background jobs queued by an upload."""
+    check_upload_permission(db, current_user, upload_event_id)
+    job_service = JobService(JobRepository(db))
+    upload_jobs = job_service.get_upload_jobs(upload_event_id)
+    if upload_jobs is None:
+        raise HTTPException(status_code=404, detail="Upload event not found")
+    return upload_jobs
+
+
+@router.get("/events/{upload_event_id}", response_model=UploadStatusResponse)
+def get_upload_status(
+    upload_event_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadStatusResponse:
+    """Rows parsed, inserted and rejected so far, throughput, and the jobs queued by an upload."""
+    check_upload_permission(db, current_user, upload_event_id)
+    job_service = JobService(JobRepository(db))
+    upload_status = job_service.get_upload_status(upload_event_id)
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload event not found")
+    return upload_status
+
+
+
+
+@router.post("/campaign/{campaign_id}/station/{station_id}/resumable")
+def create_resumable_upload(
+    campaign_id: int,
+    station_id: int,
+    upload_file_sensors: Annotated[UploadFile, File(description="File with sensors.")],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Start a resumable upload.
+
+    Send the measurements file in numbered parts with PUT /events/{upload_event_id}/parts/{part_number}
+    (resending any part that failed), then POST /events/{upload_event_id}/complete to ingest it.
+    """
+    if not check_allocation_permission(current_user, campaign_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    upload_service = get_upload_service(db)
+    upload_event_id = upload_service.create_resumable_upload(station_id, campaign_id, upload_file_sensors.file)
+    upload_file_sensors.file.close()
+    return {'upload_event_id': upload_event_id}
+
+
+@router.put("/events/{upload_event_id}/parts/{part_number}")
+def put_upload_part(
+    upload_event_id: int,
+    part: Annotated[UploadFile, File(description="Next bytes of the measurements file.")],
+    part_number: int = Path(..., ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Store one part of a resumable upload; sending a part again replaces it."""
+    upload_service = get_upload_service(db)
+    try:
+        check_upload_permission(db, current_user, upload_event_id)
+        size = upload_service.save_part(upload_event_id, part_number, part.file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        part.file.close()
+    if size is None:
+        raise HTTPException(status_code=404, detail="Resumable upload not found")
+    return {'upload_event_id': upload_event_id, 'part_number': part_number, 'size': size}
+
+
+@router.get("/events/{upload_event_id}/parts")
+def get_upload_parts(
+    upload_event_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Part numbers received so far, for a client resuming an interrupted upload."""
+    check_upload_permission(db, current_user, upload_event_id)
+    parts = get_upload_service(db).list_parts(upload_event_id)
+    if parts is None:
+        raise HTTPException(status_code=404, detail="Resumable upload not found")
+    return {'upload_event_id': upload_event_id, 'parts': parts}
+
+
+@router.post("/events/{upload_event_id}/complete")
+def complete_upload(
+    upload_event_id: int,
+    total_parts: int = Query(..., ge=1, description="Number of parts the measurements file was split into."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Join the parts and queue the ingest; calling it again after a failed ingest resumes it."""
+    check_upload_permission(db, current_user, upload_event_id)
+    try:
+        job = get_upload_service(db).complete_upload(upload_event_id, total_parts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Resumable upload not found")
+    return {'upload_event_id': upload_event_id, 'job_id': job.id, 'status': job.status}
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class JobItem(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+
+class UploadJobsResponse(BaseModel):
+    upload_event_id: int
+    # Overall state: 'failed' if any job failed, 'succeeded' once all jobs did,
+    # otherwise 'running' or 'queued'
+    status: str
+    jobs: List[JobItem]
+
+
+class UploadStatusResponse(BaseModel):
+    upload_event_id: int
+    status: str
+    rows_parsed: int
+    rows_inserted: int
+    rows_rejected: int
+    processing_started_at: Optional[datetime] = None
+    processing_finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    errors: List[str] = []
+    jobs: List[JobItem]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 
 from geoalchemy2 import Geometry
@@ -33,6 +34,30 @@ class MeasurementItem(BaseModel):
     variabletype: str | None = None
     description: str | None = None
 
+class DownsampleMethod(str, Enum):
+    # Largest-Triangle-Three-Buckets, computed in Python
+    LTTB = "lttb"
+    # Min and max point per time bucket, computed in the database
+    MINMAX = "minmax"
+    # First, last, min and max point per time bucket, computed in the database
+    M4 = "m4"
+
+class ExportFormat(str, Enum):
+    # One CSV with a station_id column
+    CSV = "csv"
+    # ZIP with the sensors and measurements CSV files of each station
+    ZIP = "zip"
+    # Parquet file streamed one row group at a time
+    PARQUET = "parquet"
+    # Arrow IPC stream
+    ARROW = "arrow"
+
+class StationExportFormat(str, Enum):
+    # ExportFormat without zip, which bundles several stations
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
 class ListMeasurementsResponsePagination(BaseModel):
     items: list[MeasurementItem]
     total: int
@@ -44,6 +69,7 @@ class ListMeasurementsResponsePagination(BaseModel):
     average_value: float
     downsampled: bool
     downsampled_total: int | None = None
+    next_cursor: str | None = None
 
 class AggregatedMeasurement(BaseModel):
     measurement_time: datetime
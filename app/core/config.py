@@ -9,6 +9,16 @@ class Settings(BaseSettings):
     ENV: str
     ENVIRONMENT: str
     ALG: str
+    # Where uploads processed in the background are kept until a worker picks them up;
+    # must be shared by the API and the workers
+    UPLOAD_DIR: str = "uploads"
+    # Worker processes inserting the chunks of one measurements upload, each with
+    # its own database connection; 1 inserts them in the request's session
+    UPLOAD_INGEST_PROCESSES: int = 1
+    # Streamed (NDJSON) measurements are inserted once this many lines are buffered,
+    # or once the oldest buffered line is this many seconds old
+    STREAM_BATCH_ROWS: int = 10000
+    STREAM_FLUSH_SECONDS: float = 1.0
 
 
     class Config:
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Float, ForeignKey, Integer, Text, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MeasurementRollup(Base):
+    __tablename__ = "measurement_rollups"
+
+    sensorid: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sensors.sensorid", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # 'minute', 'hour' or 'day'
+    resolution: Mapped[str] = mapped_column(Text, primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(TIMESTAMP, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger)
+    sum: Mapped[float] = mapped_column(Float)
+    sum_sq: Mapped[float] = mapped_column(Float)
+    min: Mapped[float] = mapped_column(Float)
+    max: Mapped[float] = mapped_column(Float)
+    # Mergeable quantile sketch, see app.utils.sketch
+    sketch: Mapped[dict[str, Any]] = mapped_column(JSONB)
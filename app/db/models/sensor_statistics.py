@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import ForeignKey, Integer, Numeric, TIMESTAMP, func
+from sqlalchemy import Float, ForeignKey, Integer, Numeric, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -37,6 +38,10 @@ class SensorStatistics(Base):
         TIMESTAMP(timezone=True),
         default=func.now
     )
+    # Mergeable state used by merge_sensor_statistics() to fold in new uploads
+    sum: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sum_sq: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sketch: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
 
     # Relationship with Sensor model
     sensor: Mapped["Sensor"] = relationship("Sensor", back_populates="statistics")
\ No newline at end of file
@@ -1,7 +1,9 @@
 from app.db.base import Base
 from datetime import datetime
+from sqlalchemy import BigInteger, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List
+from typing import List, Optional
 
 class UploadFileEvent(Base):
     __tablename__ = "upload_file_events"
@@ -9,7 +11,17 @@ class UploadFileEvent(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     time: Mapped[datetime] = mapped_column()
 
+    # Progress of the measurements file, updated after every inserted batch
+    rows_parsed: Mapped[int] = mapped_column(BigInteger, default=0)
+    rows_inserted: Mapped[int] = mapped_column(BigInteger, default=0)
+    # Parsed rows that were not inserted (already stored for that sensor and time)
+    rows_rejected: Mapped[int] = mapped_column(BigInteger, default=0)
+    processing_started_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    processing_finished_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    errors: Mapped[Optional[List[str]]] = mapped_column(JSONB, nullable=True)
+    # CSV data rows whose measurements are all committed; a resumed ingest starts after them
+    rows_committed: Mapped[int] = mapped_column(BigInteger, default=0)
+
     # relationships
     #measurements: Mapped[list("Measurement")] = relationship(lazy="joined") # back_populates="upload_file_event",
     #sensors: Mapped[list("Sensor")] = relationship(lazy="joined") # back_populates="upload_file_event",
-
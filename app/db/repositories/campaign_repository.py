@@ -3,7 +3,7 @@ import json
 from typing import Union
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, select, or_
+from sqlalchemy import func, select, or_, text
 from geoalchemy2.functions import ST_AsGeoJSON
 
 from app.api.v1.schemas.campaign import CampaignsIn, CampaignUpdate
@@ -56,6 +56,9 @@ class CampaignRepository:
 
         return campaign
 
+    def campaign_exists(self, campaign_id: int) -> bool:
+        return self.db.get(Campaign, campaign_id) is not None
+
     def get_campaigns_and_summary(
         self,
         allocations: list[str] | None,
@@ -125,6 +128,14 @@ class CampaignRepository:
             return True
         return False
 
+    def refresh_campaign_geometry(self, campaign_id: int) -> None:
+        """Recompute the campaign bounding box from its stations."""
+        self.db.execute(
+            text("SELECT update_campaign_geometry(:campaign_id);"),
+            {"campaign_id": campaign_id},
+        )
+        self.db.commit()
+
     def count_stations(self, campaign_id: int) -> int:
         return self.db.query(Station).filter(Station.campaignid == campaign_id).count()
 
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Any, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models.job import Job
+
+
+class JobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self, kind: str, payload: dict[str, Any], upload_event_id: int | None = None
+    ) -> Job:
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status="queued",
+            attempts=0,
+            upload_file_events_id=upload_event_id,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def claim_next(self) -> Job | None:
+        """Mark the oldest queued job as running and return it.
+
+        FOR UPDATE SKIP LOCKED lets any number of workers poll the same table
+        without handing the same job out twice.
+        """
+        job = (
+            self.db.query(Job)
+            .filter(Job.status == "queued")
+            .order_by(Job.id)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+            .first()
+        )
+        if job is None:
+            self.db.rollback()
+            return None
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = func.now()
+        job.heartbeat_at = func.now()
+        job.error = None
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def mark_succeeded(self, job: Job) -> None:
+        job.status = "succeeded"
+        job.finished_at = func.now()
+        self.db.commit()
+
+    def mark_failed(self, job: Job, error: str, retry: bool) -> None:
+        """Record a failure; the job goes back to the queue when retry is set."""
+        job.status = "queued" if retry else "failed"
+        job.error = error
+        job.finished_at = None if retry else func.now()
+        self.db.commit()
+
+    def heartbeat(self, job_id: int) -> None:
+        """Record that a running job is still making progress."""
+        self.db.query(Job).filter(Job.id == job_id).update(
+            {Job.heartbeat_at: func.now()}, synchronize_session=False
+        )
+        self.db.commit()
+
+    def requeue_stale(self, timeout: timedelta, max_attempts: int) -> int:
+        """Put back running jobs whose heartbeat is older than timeout; their worker died mid-job.
+
+        claim_next already counted the attempt that died, so a job that has used
+        max_attempts fails instead of crashing its next worker too. Returns the
+        number of jobs queued again.
+        """
+        stale = (
+            Job.status == "running",
+            func.coalesce(Job.heartbeat_at, Job.started_at) < datetime.now().astimezone() - timeout,
+        )
+        self.db.query(Job).filter(*stale, Job.attempts >= max_attempts).update(
+            {
+                Job.status: "failed",
+                Job.error: "Worker stopped while running the job",
+                Job.finished_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+        count = (
+            self.db.query(Job)
+            .filter(*stale)
+            .update({Job.status: "queued"}, synchronize_session=False)
+        )
+        self.db.commit()
+        return count
+
+    def list_jobs_for_upload(self, upload_event_id: int) -> List[Job]:
+        return (
+            self.db.query(Job)
+            .filter(Job.upload_file_events_id == upload_event_id)
+            .order_by(Job.id)
+            .all()
+        )
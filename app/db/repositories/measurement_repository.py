@@ -2,15 +2,50 @@ from datetime import datetime
 from typing import List
 import typing
 
+import numpy as np
+import numpy.typing as npt
 from sqlalchemy.orm import Session
 from geoalchemy2 import WKTElement
-from sqlalchemy import func, text, select
+from sqlalchemy import ColumnElement, Float, Select, and_, cast, func, or_, text, select
+from sqlalchemy.dialects.postgresql import array
 from app.api.v1.schemas.measurement import (
     AggregatedMeasurement,
+    DownsampleMethod,
     MeasurementIn,
     MeasurementUpdate,
 )
 from app.db.models.measurement import Measurement
+from app.db.models.measurement_rollup import MeasurementRollup
+
+
+def measurement_filters(
+    sensor_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    min_value: float | None = None,
+    max_value: float | None = None,
+    variable_name: str | None = None,
+) -> list[ColumnElement[bool]]:
+    """Build the WHERE clauses shared by the measurement listing queries."""
+    if isinstance(start_date, int):
+        start_date = datetime.fromtimestamp(start_date)
+    if isinstance(end_date, int):
+        end_date = datetime.fromtimestamp(end_date)
+
+    filters: list[ColumnElement[bool]] = []
+    if sensor_id:
+        filters.append(Measurement.sensorid == sensor_id)
+    if start_date is not None:
+        filters.append(Measurement.collectiontime >= start_date)
+    if end_date is not None:
+        filters.append(Measurement.collectiontime <= end_date)
+    if min_value is not None:
+        filters.append(Measurement.measurementvalue >= min_value)
+    if max_value is not None:
+        filters.append(Measurement.measurementvalue <= max_value)
+    if variable_name:
+        filters.append(Measurement.variablename == variable_name)
+    return filters
 
 
 class MeasurementRepository:
@@ -33,6 +68,9 @@ class MeasurementRepository:
         self.db.add(db_measurement)
         self.db.commit()
         self.db.refresh(db_measurement)
+        self.refresh_measurement_rollups(
+            sensor_id, db_measurement.collectiontime, db_measurement.collectiontime
+        )
         return db_measurement
 
     def get_measurement(self, measurement_id: int) -> Measurement | None:
@@ -48,65 +86,49 @@ class MeasurementRepository:
         variable_name: str | None = None,
         page: int = 1,
         limit: int = 20,
+        after: tuple[datetime, int] | None = None,
     ) -> tuple[
         list[tuple[Measurement, str]], int, float | None, float | None, float | None
     ]:
+        filters = measurement_filters(
+            sensor_id, start_date, end_date, min_value, max_value, variable_name
+        )
+
         query = self.db.query(
             Measurement, func.ST_AsGeoJSON(Measurement.geometry).label("geometry")
+        ).filter(*filters)
+
+        # Order by collection time for time series data, measurementid breaks ties
+        query = query.order_by(
+            Measurement.collectiontime.desc(), Measurement.measurementid.desc()
         )
 
-        if sensor_id:
-            query = query.filter(Measurement.sensorid == sensor_id)
-        if start_date is not None:
-            if isinstance(start_date, int):
-                start_date = datetime.fromtimestamp(start_date)
-            query = query.filter(Measurement.collectiontime >= start_date)
-        if end_date is not None:
-            if isinstance(end_date, int):
-                end_date = datetime.fromtimestamp(end_date)
-            query = query.filter(Measurement.collectiontime <= end_date)
-        if min_value is not None:
-            query = query.filter(Measurement.measurementvalue >= min_value)
-        if max_value is not None:
-            query = query.filter(Measurement.measurementvalue <= max_value)
-        if variable_name:
-            query = query.filter(Measurement.variablename == variable_name)
-
-        # Order by collection time for time series data
-        query = query.order_by(Measurement.collectiontime.desc())
-
-        total_count = query.filter(Measurement.measurementvalue > 0).count()
-
-        results_paginated = query.offset((page - 1) * limit).limit(limit).all()
-
-        # Create a separate query for stats without ordering
-        stats_query = self.db.query(Measurement)
-        if sensor_id:
-            stats_query = stats_query.filter(Measurement.sensorid == sensor_id)
-        if start_date is not None:
-            if isinstance(start_date, int):
-                start_date = datetime.fromtimestamp(start_date)
-            stats_query = stats_query.filter(Measurement.collectiontime >= start_date)
-        if end_date is not None:
-            if isinstance(end_date, int):
-                end_date = datetime.fromtimestamp(end_date)
-            stats_query = stats_query.filter(Measurement.collectiontime <= end_date)
-        if min_value is not None:
-            stats_query = stats_query.filter(Measurement.measurementvalue >= min_value)
-        if max_value is not None:
-            stats_query = stats_query.filter(Measurement.measurementvalue <= max_value)
-        if variable_name:
-            stats_query = stats_query.filter(Measurement.variablename == variable_name)
-
-        stats_min_value = stats_query.with_entities(
-            func.min(Measurement.measurementvalue)
-        ).scalar()
-        stats_max_value = stats_query.with_entities(
-            func.max(Measurement.measurementvalue)
-        ).scalar()
-        stats_average_value = stats_query.with_entities(
-            func.avg(Measurement.measurementvalue)
-        ).scalar()
+        if after is not None:
+            # Keyset seek: continue strictly after the (collectiontime, id) of the
+            # last row of the previous page so deep pages don't scan skipped rows
+            after_time, after_id = after
+            results_paginated = (
+                query.filter(Measurement.collectiontime <= after_time)
+                .filter(
+                    or_(
+                        Measurement.collectiontime < after_time,
+                        and_(
+                            Measurement.collectiontime == after_time,
+                            Measurement.measurementid < after_id,
+                        ),
+                    )
+                )
+                .limit(limit)
+                .all()
+            )
+        else:
+            results_paginated = query.offset((page - 1) * limit).limit(limit).all()
+
+        total_count, stats_min_value, stats_max_value, stats_average_value = (
+            self.get_measurement_statistics(
+                sensor_id, start_date, end_date, min_value, max_value, variable_name
+            )
+        )
 
         return (
             results_paginated,
@@ -116,11 +138,261 @@ class MeasurementRepository:
             stats_average_value,
         )
 
+    def get_measurement_statistics(
+        self,
+        sensor_id: int | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+        variable_name: str | None = None,
+    ) -> tuple[int, float | None, float | None, float | None]:
+        """Return (count, min, max, avg) over the filtered measurements."""
+        filters = measurement_filters(
+            sensor_id, start_date, end_date, min_value, max_value, variable_name
+        )
+
+        # Without range filters the answer is exactly what sensor_statistics
+        # holds, so skip the scan when that row is up to date
+        if sensor_id and len(filters) == 1:
+            precomputed = self.get_fresh_sensor_statistics(sensor_id)
+            if precomputed is not None:
+                return precomputed
+
+        # Count and all aggregates in a single pass over the filtered rows
+        total_count, min_value, max_value, avg_value = (
+            self.db.query(
+                func.count().filter(Measurement.measurementvalue > 0),
+                func.min(Measurement.measurementvalue),
+                func.max(Measurement.measurementvalue),
+                func.avg(Measurement.measurementvalue),
+            )
+            .filter(*filters)
+            .one()
+        )
+        return total_count, min_value, max_value, avg_value
+
+    def get_measurement_series_statistics(
+        self,
+        sensor_id: int,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+    ) -> tuple[int, int, float | None, float | None, float | None]:
+        """Return (rows, count, min, max, avg) over the filtered measurements in one pass.
+
+        rows counts every measurement, as stream_measurement_series yields them;
+        count only the positive ones, like get_measurement_statistics.
+        """
+        filters = measurement_filters(
+            sensor_id, start_date, end_date, min_value, max_value
+        )
+        series_length, total_count, min_value, max_value, avg_value = (
+            self.db.query(
+                func.count(),
+                func.count().filter(Measurement.measurementvalue > 0),
+                func.min(Measurement.measurementvalue),
+                func.max(Measurement.measurementvalue),
+                func.avg(Measurement.measurementvalue),
+            )
+            .filter(*filters)
+            .one()
+        )
+        return series_length, total_count, min_value, max_value, avg_value
+
+    def stream_measurement_series(
+        self,
+        sensor_id: int,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+        chunk_size: int = 10000,
+    ) -> "typing.Iterator[typing.Tuple[npt.NDArray[np.int64], npt.NDArray[np.float64], npt.NDArray[np.float64]]]":
+        """Generator that streams (measurementid, epoch seconds, value) arrays in time order.
+
+        Rows are read through a server-side cursor, so only one chunk is held
+        in memory at a time regardless of the size of the range.
+        """
+        filters = measurement_filters(
+            sensor_id, start_date, end_date, min_value, max_value
+        )
+        stmt = (
+            select(
+                Measurement.measurementid,
+                func.extract("epoch", Measurement.collectiontime),
+                Measurement.measurementvalue,
+            )
+            .where(*filters)
+            .order_by(Measurement.collectiontime, Measurement.measurementid)
+            .execution_options(stream_results=True, yield_per=chunk_size)
+        )
+        for partition in self.db.execute(stmt).partitions():
+            ids, times, values = zip(*partition)
+            yield (
+                np.array(ids, dtype=np.int64),
+                np.array(times, dtype=np.float64),
+                np.array(values, dtype=np.float64),
+            )
+
+    def get_bucket_extrema_ids(
+        self,
+        method: DownsampleMethod,
+        buckets: int,
+        sensor_id: int,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+    ) -> List[int]:
+        """Reduce the filtered range in SQL and return the ids of the points to keep.
+
+        The time range is split into equal-width buckets with width_bucket and a
+        single GROUP BY pass picks the min/max value point of each bucket (minmax)
+        plus the first/last point (m4).
+        """
+        filters = measurement_filters(
+            sensor_id, start_date, end_date, min_value, max_value
+        )
+        epoch = func.extract("epoch", Measurement.collectiontime)
+
+        # Bounds come from the (sensorid, collectiontime) index
+        lo, hi = self.db.execute(
+            select(func.min(epoch), func.max(epoch)).where(*filters)
+        ).one()
+        if lo is None:
+            return []
+
+        measurement_id = cast(Measurement.measurementid, Float)
+        by_value: array[float] = array(  # type: ignore[no-untyped-call]
+            [cast(Measurement.measurementvalue, Float), measurement_id]
+        )
+        columns = [func.min(by_value)[2], func.max(by_value)[2]]
+        if method == DownsampleMethod.M4:
+            by_time: array[float] = array(  # type: ignore[no-untyped-call]
+                [cast(epoch, Float), measurement_id]
+            )
+            columns += [func.min(by_time)[2], func.max(by_time)[2]]
+
+        stmt = select(*columns).where(*filters)
+        if hi > lo:
+            # width_bucket puts the upper bound in bucket n + 1; fold it into the last one
+            stmt = stmt.group_by(
+                func.least(func.width_bucket(epoch, lo, hi, buckets), buckets)
+            )
+        ids = {int(i) for row in self.db.execute(stmt) for i in row if i is not None}
+        return sorted(ids)
+
+    def get_measurements_by_ids(
+        self, measurement_ids: List[int]
+    ) -> list[tuple[Measurement, str]]:
+        """Fetch measurements with GeoJSON geometry, newest first."""
+        if not measurement_ids:
+            return []
+        rows: list[tuple[Measurement, str]] = (
+            self.db.query(
+                Measurement, func.ST_AsGeoJSON(Measurement.geometry).label("geometry")
+            )
+            .filter(Measurement.measurementid.in_(measurement_ids))
+            .order_by(
+                Measurement.collectiontime.desc(), Measurement.measurementid.desc()
+            )
+            .all()
+        )
+        return rows
+
+    @staticmethod
+    def _pending_upload_refresh(sensor_id: int) -> Select[tuple[int]]:
+        """Refresh jobs of uploads that touched the sensor and have not succeeded yet."""
+        from app.db.models.job import Job
+
+        # Refresh jobs of uploads are the only jobs carrying sensor_spans
+        return select(Job.id).where(
+            Job.payload["sensor_spans"].has_key(str(sensor_id)),
+            Job.status != "succeeded",
+        )
+
+    def has_pending_rollup_refresh(self, sensor_id: int) -> bool:
+        """Whether an upload touching the sensor is not in its rollups yet."""
+        return self.db.query(self._pending_upload_refresh(sensor_id).exists()).scalar() is True
+
+    def get_fresh_sensor_statistics(
+        self, sensor_id: int
+    ) -> tuple[int, float | None, float | None, float | None] | None:
+        """Return (count, min, max, avg) from sensor_statistics if it is current.
+
+        Statistics are considered stale when they are pending a refresh
+        (stats_last_updated is NULL), when their count differs from the day
+        rollups (rows added or deleted outside uploads), when the sensor has a
+        measurement newer than the last one they were computed from, or when
+        an upload touching the sensor has not been merged into them yet.
+
+        The live aggregate only counts positive values, while sensor_statistics
+        counts every row; the two agree only when the sensor's minimum is
+        positive, so other sensors are always answered live.
+        """
+        from app.db.models.job import Job
+        from app.db.models.sensor_statistics import SensorStatistics
+
+        latest_collectiontime = (
+            select(func.max(Measurement.collectiontime))
+            .where(Measurement.sensorid == sensor_id)
+            .scalar_subquery()
+        )
+        rollup_count = (
+            select(func.coalesce(func.sum(MeasurementRollup.count), 0))
+            .where(MeasurementRollup.sensorid == sensor_id, MeasurementRollup.resolution == "day")
+            .scalar_subquery()
+        )
+        unmerged_upload = (
+            self._pending_upload_refresh(sensor_id)
+            .where(Job.created_at > SensorStatistics.stats_last_updated)
+            .exists()
+        )
+        stmt = select(
+            SensorStatistics.count,
+            SensorStatistics.min_value,
+            SensorStatistics.max_value,
+            SensorStatistics.avg_value,
+        ).where(
+            SensorStatistics.sensorid == sensor_id,
+            SensorStatistics.stats_last_updated.is_not(None),
+            SensorStatistics.min_value > 0,
+            SensorStatistics.count == rollup_count,
+            SensorStatistics.last_measurement_collectiontime == latest_collectiontime,
+            ~unmerged_upload,
+        )
+        row = self.db.execute(stmt).first()
+        if row is None:
+            return None
+
+        count, min_value, max_value, avg_value = row
+        if count is None:
+            return None
+        return (
+            count,
+            float(min_value) if min_value is not None else None,
+            float(max_value) if max_value is not None else None,
+            float(avg_value) if avg_value is not None else None,
+        )
+
+    def mark_sensor_statistics_stale(self, sensor_id: int) -> None:
+        """Flag a sensor's statistics as pending a refresh; the next merge rebuilds them."""
+        from app.db.models.sensor_statistics import SensorStatistics
+
+        self.db.query(SensorStatistics).filter(SensorStatistics.sensorid == sensor_id).update(
+            {SensorStatistics.stats_last_updated: None}, synchronize_session=False
+        )
+        self.db.commit()
+
     def delete_measurement(self, measurement_id: int) -> bool:
         db_measurement = self.get_measurement(measurement_id)
         if db_measurement:
+            sensor_id, collectiontime = db_measurement.sensorid, db_measurement.collectiontime
             self.db.delete(db_measurement)
             self.db.commit()
+            self.refresh_measurement_rollups(sensor_id, collectiontime, collectiontime)
             return True
         return False
 
@@ -143,8 +415,39 @@ class MeasurementRepository:
             db_measurements.append(db_measurement)
 
         self.db.commit()
+        if measurements:
+            times = [m.collectiontime for m in measurements]
+            self.refresh_measurement_rollups(sensor_id, min(times), max(times))
         return db_measurements
 
+    def refresh_measurement_rollups(
+        self, sensor_id: int, start: datetime, end: datetime
+    ) -> None:
+        """Rebuild the minute/hour/day rollups of a sensor overlapping [start, end]."""
+        self.db.execute(
+            text("SELECT refresh_measurement_rollups(:sensor_id, :start, :end)"),
+            {"sensor_id": sensor_id, "start": start, "end": end},
+        )
+        self.db.commit()
+
+    def get_measurement_rollups(
+        self,
+        sensor_id: int,
+        resolution: str,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> List[MeasurementRollup]:
+        """Rollup buckets of one resolution, ordered by time; end_date is exclusive."""
+        query = self.db.query(MeasurementRollup).filter(
+            MeasurementRollup.sensorid == sensor_id,
+            MeasurementRollup.resolution == resolution,
+        )
+        if start_date:
+            query = query.filter(MeasurementRollup.bucket_start >= start_date)
+        if end_date:
+            query = query.filter(MeasurementRollup.bucket_start < end_date)
+        return query.order_by(MeasurementRollup.bucket_start).all()
+
     def get_measurements_with_confidence_intervals(
         self,
         sensor_id: int,
@@ -181,6 +484,13 @@ class MeasurementRepository:
 
         return measurements
 
+    def has_measurement_at(self, sensor_id: int, collectiontime: datetime) -> bool:
+        return self.db.query(
+            self.db.query(Measurement)
+            .filter(Measurement.sensorid == sensor_id, Measurement.collectiontime == collectiontime)
+            .exists()
+        ).scalar() is True
+
     def get_latest_measurement_by_sensor_id(self, sensor_id: int) -> Measurement | None:
         return (
             self.db.query(Measurement)
@@ -201,6 +511,7 @@ class MeasurementRepository:
 
         if not db_measurement:
             return None
+        previous = (db_measurement.sensorid, db_measurement.collectiontime)
 
         if partial:
             # Get only the fields that were explicitly set in the request
@@ -247,6 +558,17 @@ class MeasurementRepository:
 
         self.db.commit()
         self.db.refresh(db_measurement)
+        self.refresh_measurement_rollups(previous[0], previous[1], previous[1])
+        # An edited value keeps the count and latest time, so flag the statistics
+        self.mark_sensor_statistics_stale(previous[0])
+        if previous != (db_measurement.sensorid, db_measurement.collectiontime):
+            self.refresh_measurement_rollups(
+                db_measurement.sensorid,
+                db_measurement.collectiontime,
+                db_measurement.collectiontime,
+            )
+            if db_measurement.sensorid != previous[0]:
+                self.mark_sensor_statistics_stale(db_measurement.sensorid)
         return db_measurement
 
     def get_measurements_by_campaign_chunked(
@@ -256,41 +578,32 @@ class MeasurementRepository:
         start_date: datetime | None = None,
         end_date: datetime | None = None,
     ) -> "typing.Iterator[List[typing.Tuple[Measurement, str]]]":
-        """Generator that yields measurements for a campaign in chunks."""
+        """Generator that yields measurements for a campaign in chunks.
+
+        One query read through a server-side cursor, chunk_size rows at a time.
+        """
         from app.db.models.sensor import Sensor
         from app.db.models.station import Station
 
-        offset = 0
-        while True:
-            stmt = (
-                select(Measurement, Sensor.alias)
-                .join(Sensor, Measurement.sensorid == Sensor.sensorid)
-                .join(Station, Sensor.stationid == Station.stationid)
-                .filter(Station.campaignid == campaign_id)
-                .order_by(Measurement.collectiontime, Measurement.measurementid)
-                .offset(offset)
-                .limit(chunk_size)
-            )
-
-            if start_date:
-                stmt = stmt.filter(Measurement.collectiontime >= start_date)
-            if end_date:
-                stmt = stmt.filter(Measurement.collectiontime <= end_date)
+        stmt = (
+            select(Measurement, Sensor.alias)
+            .join(Sensor, Measurement.sensorid == Sensor.sensorid)
+            .join(Station, Sensor.stationid == Station.stationid)
+            .filter(Station.campaignid == campaign_id)
+            .order_by(Measurement.collectiontime, Measurement.measurementid)
+        )
 
-            result = list(self.db.execute(stmt).all())
-            if not result:
-                break
+        if start_date:
+            stmt = stmt.filter(Measurement.collectiontime >= start_date)
+        if end_date:
+            stmt = stmt.filter(Measurement.collectiontime <= end_date)
 
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
             # Convert Row objects to tuples and filter out None aliases
-            filtered_result = []
-            for row in result:
-                measurement, alias = row
-                if alias is not None:
-                    filtered_result.append((measurement, alias))
-
+            filtered_result = [(measurement, alias) for measurement, alias in rows if alias is not None]
             if filtered_result:
                 yield filtered_result
-            offset += chunk_size
 
     def get_unique_sensor_aliases_for_campaign(self, campaign_id: int) -> List[str]:
         """Get unique sensor aliases for a campaign to construct CSV headers."""
@@ -331,39 +644,30 @@ class MeasurementRepository:
         start_date: datetime | None = None,
         end_date: datetime | None = None,
     ) -> "typing.Iterator[List[typing.Tuple[Measurement, str]]]":
-        """Generator that yields measurements for a station in chunks."""
-        from app.db.models.sensor import Sensor
+        """Generator that yields measurements for a station in chunks.
 
-        offset = 0
-        while True:
-            stmt = (
-                select(Measurement, Sensor.alias)
-                .join(Sensor, Measurement.sensorid == Sensor.sensorid)
-                .filter(Sensor.stationid == station_id)
-                .order_by(Measurement.collectiontime, Measurement.measurementid)
-                .offset(offset)
-                .limit(chunk_size)
-            )
+        One query read through a server-side cursor, chunk_size rows at a time.
+        """
+        from app.db.models.sensor import Sensor
 
-            if start_date:
-                stmt = stmt.filter(Measurement.collectiontime >= start_date)
-            if end_date:
-                stmt = stmt.filter(Measurement.collectiontime <= end_date)
+        stmt = (
+            select(Measurement, Sensor.alias)
+            .join(Sensor, Measurement.sensorid == Sensor.sensorid)
+            .filter(Sensor.stationid == station_id)
+            .order_by(Measurement.collectiontime, Measurement.measurementid)
+        )
 
-            result = list(self.db.execute(stmt).all())
-            if not result:
-                break
+        if start_date:
+            stmt = stmt.filter(Measurement.collectiontime >= start_date)
+        if end_date:
+            stmt = stmt.filter(Measurement.collectiontime <= end_date)
 
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
             # Convert Row objects to tuples and filter out None aliases
-            filtered_result = []
-            for row in result:
-                measurement, alias = row
-                if alias is not None:
-                    filtered_result.append((measurement, alias))
-
+            filtered_result = [(measurement, alias) for measurement, alias in rows if alias is not None]
             if filtered_result:
                 yield filtered_result
-            offset += chunk_size
 
     def get_measurements_with_coordinates_by_station_chunked(
         self,
@@ -374,47 +678,38 @@ class MeasurementRepository:
     ) -> "typing.Iterator[List[typing.Tuple[datetime, float, float, str, float]]]":
         """Generator that yields measurements with coordinates for a station in chunks.
 
-        Returns tuples of (collection_time, lat, lon, sensor_alias, measurement_value)
+        Returns tuples of (collection_time, lat, lon, sensor_alias, measurement_value),
+        read through a server-side cursor chunk_size rows at a time.
         """
         from app.db.models.sensor import Sensor
         from geoalchemy2.functions import ST_X, ST_Y
 
-        offset = 0
-        while True:
-            stmt = (
-                select(
-                    Measurement.collectiontime,
-                    ST_Y(Measurement.geometry).label("lat"),
-                    ST_X(Measurement.geometry).label("lon"),
-                    Sensor.alias,
-                    Measurement.measurementvalue,
-                )
-                .join(Sensor, Measurement.sensorid == Sensor.sensorid)
-                .filter(Sensor.stationid == station_id)
-                .filter(Sensor.alias.is_not(None))
-                .order_by(Measurement.collectiontime, Measurement.measurementid)
-                .offset(offset)
-                .limit(chunk_size)
+        stmt = (
+            select(
+                Measurement.collectiontime,
+                ST_Y(Measurement.geometry).label("lat"),
+                ST_X(Measurement.geometry).label("lon"),
+                Sensor.alias,
+                Measurement.measurementvalue,
             )
+            .join(Sensor, Measurement.sensorid == Sensor.sensorid)
+            .filter(Sensor.stationid == station_id)
+            .filter(Sensor.alias.is_not(None))
+            .order_by(Measurement.collectiontime, Measurement.measurementid)
+        )
 
-            if start_date:
-                stmt = stmt.filter(Measurement.collectiontime >= start_date)
-            if end_date:
-                stmt = stmt.filter(Measurement.collectiontime <= end_date)
-
-            result = list(self.db.execute(stmt).all())
-            if not result:
-                break
+        if start_date:
+            stmt = stmt.filter(Measurement.collectiontime >= start_date)
+        if end_date:
+            stmt = stmt.filter(Measurement.collectiontime <= end_date)
 
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
             # Convert to tuples for easy processing
-            measurements = []
-            for row in result:
-                collection_time, lat, lon, alias, value = row
-                measurements.append((collection_time, lat, lon, alias, value))
-
-            if measurements:
-                yield measurements
-            offset += chunk_size
+            yield [
+                (collection_time, lat, lon, alias, value)
+                for collection_time, lat, lon, alias, value in rows
+            ]
 
     def get_measurements_pivot_by_station_chunked(
         self,
@@ -425,83 +720,108 @@ class MeasurementRepository:
     ) -> "typing.Iterator[List[typing.Dict[str, typing.Any]]]":
         """Generator that yields pre-grouped measurements for a station in chunks.
 
-        Returns dicts with keys: collection_time, lat, lon, sensor_values
+        Returns dicts with keys: station_id, collection_time, lat, lon, sensor_values
+        """
+        sensor_aliases = self.get_unique_sensor_aliases_for_station(station_id)
+        for rows in self.get_measurements_pivot_rows_by_station_chunked(
+            station_id, sensor_aliases, chunk_size, start_date, end_date
+        ):
+            yield self._pivot_dicts(rows, sensor_aliases)
+
+    def get_measurements_pivot_rows_by_station_chunked(
+        self,
+        station_id: int,
+        sensor_aliases: List[str],
+        chunk_size: int = 1000,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> "typing.Iterator[typing.Sequence[typing.Any]]":
+        """Pivot rows of a station as returned by the cursor, in chunks.
+
+        Each row is (station_id, collection_time, lat, lon, *one value per alias in sensor_aliases)
         """
         from app.db.models.sensor import Sensor
-        from geoalchemy2.functions import ST_X, ST_Y
-        from collections import defaultdict
 
-        # Get sensor aliases for this station
-        sensor_aliases = self.get_unique_sensor_aliases_for_station(station_id)
+        return self._get_measurements_pivot_rows(
+            Sensor.stationid == station_id, sensor_aliases, chunk_size, start_date, end_date
+        )
+
+    def get_measurements_pivot_rows_by_campaign_chunked(
+        self,
+        campaign_id: int,
+        sensor_aliases: List[str],
+        chunk_size: int = 1000,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> "typing.Iterator[typing.Sequence[typing.Any]]":
+        """Pivot rows of every station of a campaign, station by station, in chunks.
+
+        Each row is (station_id, collection_time, lat, lon, *one value per alias in sensor_aliases)
+        """
+        from app.db.models.sensor import Sensor
+        from app.db.models.station import Station
+
+        campaign_stations = select(Station.stationid).filter(Station.campaignid == campaign_id)
+        return self._get_measurements_pivot_rows(
+            Sensor.stationid.in_(campaign_stations), sensor_aliases, chunk_size, start_date, end_date
+        )
 
-        # Use a simpler approach that generates one row per (time, lat, lon) combination
-        # First, get all unique (time, lat, lon) combinations
-        base_stmt = (
+    def _get_measurements_pivot_rows(
+        self,
+        sensor_filter: ColumnElement[bool],
+        sensor_aliases: List[str],
+        chunk_size: int,
+        start_date: datetime | None,
+        end_date: datetime | None,
+    ) -> "typing.Iterator[typing.Sequence[typing.Any]]":
+        """One row per (station, time, lat, lon) of the matching sensors, one value per alias.
+
+        The pivot is a single GROUP BY with one filtered aggregate per sensor
+        alias, read through a server-side cursor chunk_size rows at a time.
+        """
+        from app.db.models.sensor import Sensor
+        from geoalchemy2.functions import ST_X, ST_Y
+
+        lat = ST_Y(Measurement.geometry).label("lat")
+        lon = ST_X(Measurement.geometry).label("lon")
+        stmt = (
             select(
+                Sensor.stationid,
                 Measurement.collectiontime,
-                ST_Y(Measurement.geometry).label("lat"),
-                ST_X(Measurement.geometry).label("lon"),
+                lat,
+                lon,
+                *[
+                    func.max(Measurement.measurementvalue).filter(Sensor.alias == alias)
+                    for alias in sensor_aliases
+                ],
             )
             .join(Sensor, Measurement.sensorid == Sensor.sensorid)
-            .filter(Sensor.stationid == station_id)
+            .filter(sensor_filter)
             .filter(Sensor.alias.is_not(None))
-            .distinct()
-            .order_by(
-                Measurement.collectiontime,
-                ST_Y(Measurement.geometry),
-                ST_X(Measurement.geometry),
-            )
+            .group_by(Sensor.stationid, Measurement.collectiontime, lat, lon)
+            .order_by(Sensor.stationid, Measurement.collectiontime, lat, lon)
         )
 
         if start_date:
-            base_stmt = base_stmt.filter(Measurement.collectiontime >= start_date)
+            stmt = stmt.filter(Measurement.collectiontime >= start_date)
         if end_date:
-            base_stmt = base_stmt.filter(Measurement.collectiontime <= end_date)
-
-        offset = 0
-        while True:
-            # Get a chunk of unique time/location combinations
-            unique_combinations = list(
-                self.db.execute(base_stmt.offset(offset).limit(chunk_size)).all()
-            )
+            stmt = stmt.filter(Measurement.collectiontime <= end_date)
 
-            if not unique_combinations:
-                break
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size))
+        return iter(result.partitions())
 
-            grouped_measurements = []
-
-            for collection_time, lat, lon in unique_combinations:
-                # For each unique combination, get all sensor values
-                sensor_values = {alias: None for alias in sensor_aliases}
-
-                # Query to get all measurements for this specific time/location
-                measurements_stmt = (
-                    select(Sensor.alias, Measurement.measurementvalue)
-                    .join(Sensor, Measurement.sensorid == Sensor.sensorid)
-                    .filter(Sensor.stationid == station_id)
-                    .filter(Sensor.alias.is_not(None))
-                    .filter(Measurement.collectiontime == collection_time)
-                    .filter(ST_Y(Measurement.geometry) == lat)
-                    .filter(ST_X(Measurement.geometry) == lon)
-                )
-
-                measurements_result = list(self.db.execute(measurements_stmt).all())
-
-                # Populate sensor values
-                for alias, value in measurements_result:
-                    sensor_values[alias] = value
-
-                grouped_measurements.append(
-                    {
-                        "collection_time": collection_time,
-                        "lat": lat,
-                        "lon": lon,
-                        "sensor_values": sensor_values,
-                        "sensor_aliases": sensor_aliases,
-                    }
-                )
-
-            if grouped_measurements:
-                yield grouped_measurements
-
-            offset += chunk_size
+    @staticmethod
+    def _pivot_dicts(
+        rows: "typing.Sequence[typing.Any]", sensor_aliases: List[str]
+    ) -> "List[typing.Dict[str, typing.Any]]":
+        return [
+            {
+                "station_id": row[0],
+                "collection_time": row[1],
+                "lat": row[2],
+                "lon": row[3],
+                "sensor_values": dict(zip(sensor_aliases, row[4:])),
+                "sensor_aliases": sensor_aliases,
+            }
+            for row in rows
+        ]
@@ -1,7 +1,8 @@
+from datetime import datetime
 from typing import Optional, List, Tuple, Any
 import typing
 from sqlalchemy.orm import Session
-from sqlalchemy import Row, select, func, Column
+from sqlalchemy import Row, insert, select, func, Column
 from sqlalchemy.sql import text
 from enum import Enum
 
@@ -13,6 +14,7 @@ from app.api.v1.schemas.sensor import (
 )
 from app.db.models.sensor import Sensor
 from app.db.models.measurement import Measurement
+from app.db.models.measurement_rollup import MeasurementRollup
 from app.db.models.sensor_statistics import SensorStatistics
 
 
@@ -64,6 +66,28 @@ class SensorRepository:
         self.db.commit()
         return sensors
 
+    def get_sensor_ids_by_alias(self, station_id: int, aliases: list[str]) -> dict[str, int]:
+        """Map the aliases that already exist on a station to their sensor ids.
+
+        If a station holds several sensors with the same alias, the oldest wins.
+        """
+        rows = self.db.execute(
+            select(Sensor.alias, Sensor.sensorid)
+            .where(Sensor.stationid == station_id, Sensor.alias == func.any(aliases))
+            .order_by(Sensor.sensorid.desc())
+        ).all()
+        return {alias: sensor_id for alias, sensor_id in rows}
+
+    def insert_sensors(self, sensors: list[dict[str, Any]]) -> dict[str, int]:
+        """Insert sensors with a single statement and map their aliases to the new ids."""
+        if not sensors:
+            return {}
+        rows = self.db.execute(
+            insert(Sensor).values(sensors).returning(Sensor.alias, Sensor.sensorid)
+        ).all()
+        self.db.commit()
+        return {alias: sensor_id for alias, sensor_id in rows}
+
     def get_sensor(self, sensor_id: int) -> GetSensorResponse | None:
         stmt = (
             select(Sensor, SensorStatistics)
@@ -128,8 +152,31 @@ class SensorRepository:
         self.db.commit()
         return True
 
+    def refresh_sensor_statistics_bulk(
+        self, station_id: int | None = None, campaign_id: int | None = None
+    ) -> List[int]:
+        """Recompute statistics for every sensor of a station and/or campaign in one statement."""
+        result = self.db.execute(
+            text("SELECT * FROM refresh_sensor_statistics_bulk(:station_id, :campaign_id);"),
+            {"station_id": station_id, "campaign_id": campaign_id},
+        )
+        sensor_ids = sorted(row[0] for row in result)
+        self.db.commit()
+        return sensor_ids
+
+    def merge_sensor_statistics(
+        self, sensor_id: int, upload_event_id: int, start: datetime, end: datetime
+    ) -> None:
+        """Fold the measurements an upload inserted between start and end into the sensor's statistics."""
+        self.db.execute(
+            text("SELECT merge_sensor_statistics(:sensor_id, :upload_event_id, :start, :end);"),
+            {"sensor_id": sensor_id, "upload_event_id": upload_event_id, "start": start, "end": end},
+        )
+        self.db.commit()
+
     def delete_sensor_measurements(self, sensor_id: int) -> None:
         self.db.query(Measurement).filter(Measurement.sensorid == sensor_id).delete()
+        self.db.query(MeasurementRollup).filter(MeasurementRollup.sensorid == sensor_id).delete()
         self.db.commit()
 
     def get_sort_column(self, sort_by: SortField) -> Column[Any] | None:
@@ -339,44 +386,28 @@ class SensorRepository:
     def get_sensors_by_campaign_chunked(
         self, campaign_id: int, chunk_size: int = 1000
     ) -> "typing.Iterator[List[Sensor]]":
-        """Generator that yields sensors for a campaign in chunks."""
+        """Generator that yields sensors for a campaign in chunks, from one server-side cursor."""
         from app.db.models.station import Station
 
-        offset = 0
-        while True:
-            stmt = (
-                select(Sensor)
-                .join(Station, Sensor.stationid == Station.stationid)
-                .filter(Station.campaignid == campaign_id)
-                .order_by(Sensor.sensorid)
-                .offset(offset)
-                .limit(chunk_size)
-            )
-
-            result = list(self.db.execute(stmt).scalars().all())
-            if not result:
-                break
-
-            yield result
-            offset += chunk_size
+        stmt = (
+            select(Sensor)
+            .join(Station, Sensor.stationid == Station.stationid)
+            .filter(Station.campaignid == campaign_id)
+            .order_by(Sensor.sensorid)
+        )
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size)).scalars()
+        for sensors in result.partitions():
+            yield list(sensors)
 
     def get_sensors_by_station_chunked(
         self, station_id: int, chunk_size: int = 1000
     ) -> "typing.Iterator[List[Sensor]]":
-        """Generator that yields sensors for a station in chunks."""
-        offset = 0
-        while True:
-            stmt = (
-                select(Sensor)
-                .filter(Sensor.stationid == station_id)
-                .order_by(Sensor.sensorid)
-                .offset(offset)
-                .limit(chunk_size)
-            )
-
-            result = list(self.db.execute(stmt).scalars().all())
-            if not result:
-                break
-
-            yield result
-            offset += chunk_size
+        """Generator that yields sensors for a station in chunks, from one server-side cursor."""
+        stmt = (
+            select(Sensor)
+            .filter(Sensor.stationid == station_id)
+            .order_by(Sensor.sensorid)
+        )
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size)).scalars()
+        for sensors in result.partitions():
+            yield list(sensors)
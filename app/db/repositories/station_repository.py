@@ -3,7 +3,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
-from sqlalchemy import func
+from sqlalchemy import func, text
 from sqlalchemy.orm import joinedload
 from app.api.v1.schemas.station import StationCreate, StationUpdate
 from app.db.models.sensor import Sensor
@@ -64,6 +64,10 @@ class StationRepository:
     def get_stations_by_campaign_id(self, campaign_id: int, page: int = 1, limit: int = 20) -> list[Station]:
         return self.db.query(Station).filter(Station.campaignid == campaign_id).offset((page - 1) * limit).limit(limit).all()
 
+    def get_station_ids_by_campaign_id(self, campaign_id: int) -> list[int]:
+        query = self.db.query(Station.stationid).filter(Station.campaignid == campaign_id).order_by(Station.stationid)
+        return [station_id for (station_id,) in query.all()]
+
     def list_stations_and_summary(self, campaign_id: int, page: int = 1, limit: int = 20) -> tuple[list[tuple[Station, int, list[str | None], list[str | None], str | None]], int]:
         query = self.db.query(Station,
             func.count(Sensor.sensorid.distinct()).label('sensor_count'),
@@ -102,6 +106,14 @@ class StationRepository:
             return True
         return False
 
+    def refresh_station_geometry(self, station_id: int) -> None:
+        """Recompute the station bounding box from its measurements."""
+        self.db.execute(
+            text("SELECT update_station_geometry(:station_id);"),
+            {"station_id": station_id},
+        )
+        self.db.commit()
+
     def delete_station_sensors(self, station_id: int) -> bool:
         self.db.query(Sensor).filter(Sensor.stationid == station_id).delete()
         self.db.commit()
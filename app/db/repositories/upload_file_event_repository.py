@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models.upload_file_event import UploadFileEvent
+
+
+class UploadFileEventRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_upload_event(self) -> UploadFileEvent:
+        upload_event = UploadFileEvent(time=datetime.now())
+        self.db.add(upload_event)
+        self.db.commit()
+        return upload_event
+
+    def get_upload_event(self, upload_event_id: int) -> UploadFileEvent | None:
+        return self.db.get(UploadFileEvent, upload_event_id)
+
+    def start_processing(self, upload_event_id: int) -> None:
+        """Reset the counters; a retried upload starts counting from zero."""
+        self.db.query(UploadFileEvent).filter(UploadFileEvent.id == upload_event_id).update(
+            {
+                UploadFileEvent.rows_parsed: 0,
+                UploadFileEvent.rows_inserted: 0,
+                UploadFileEvent.rows_rejected: 0,
+                UploadFileEvent.rows_committed: 0,
+                UploadFileEvent.processing_started_at: func.now(),
+                UploadFileEvent.processing_finished_at: None,
+                UploadFileEvent.errors: None,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def update_progress(
+        self, upload_event_id: int, rows_parsed: int, rows_inserted: int, rows_rejected: int
+    ) -> None:
+        self.db.query(UploadFileEvent).filter(UploadFileEvent.id == upload_event_id).update(
+            {
+                UploadFileEvent.rows_parsed: rows_parsed,
+                UploadFileEvent.rows_inserted: rows_inserted,
+                UploadFileEvent.rows_rejected: rows_rejected,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def commit_rows(
+        self, upload_event_id: int, rows_committed: int, rows_parsed: int, rows_inserted: int
+    ) -> None:
+        """Advance the watermark a resumed ingest starts from, with the counters as of that row."""
+        self.db.query(UploadFileEvent).filter(UploadFileEvent.id == upload_event_id).update(
+            {
+                UploadFileEvent.rows_committed: rows_committed,
+                UploadFileEvent.rows_parsed: rows_parsed,
+                UploadFileEvent.rows_inserted: rows_inserted,
+                UploadFileEvent.rows_rejected: rows_parsed - rows_inserted,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def resume_processing(self, upload_event_id: int) -> None:
+        """Reopen an interrupted ingest, keeping its counters and watermark."""
+        self.db.query(UploadFileEvent).filter(UploadFileEvent.id == upload_event_id).update(
+            {UploadFileEvent.processing_finished_at: None},
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def finish_processing(self, upload_event_id: int, errors: list[str]) -> None:
+        self.db.query(UploadFileEvent).filter(UploadFileEvent.id == upload_event_id).update(
+            {
+                UploadFileEvent.processing_finished_at: func.now(),
+                UploadFileEvent.errors: errors,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
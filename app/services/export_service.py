@@ -1,8 +1,82 @@
+import csv
 from datetime import datetime
-from typing import Iterator
+import io
+from typing import Any, Iterator, Sequence
+import zipfile
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.api.v1.schemas.measurement import ExportFormat
 from app.db.repositories.sensor_repository import SensorRepository
 from app.db.repositories.measurement_repository import MeasurementRepository
+from app.db.repositories.station_repository import StationRepository
+
+# Characters of CSV buffered before an export hands them to the response
+CSV_BLOCK_CHARS = 1024 * 1024
+# Pivot rows read per cursor partition by the CSV exports
+CSV_CHUNK_ROWS = 10000
+# Compressed bytes buffered before a ZIP export hands them to the response
+ZIP_FLUSH_BYTES = 64 * 1024
+# Pivot rows per record batch of a Parquet or Arrow export; each is one Parquet row group
+ARROW_BATCH_ROWS = 65536
+# Media type and file extension of the columnar export formats
+ARROW_FILE_TYPES = {
+    ExportFormat.PARQUET: ("application/vnd.apache.parquet", "parquet"),
+    ExportFormat.ARROW: ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+class ExportStream:
+    """Write-only file whose bytes are taken out as an export is written.
+
+    It cannot seek, so zipfile writes each entry's sizes after its data, and
+    neither a ZIP archive nor a Parquet file has to be held in memory.
+    """
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+class CsvBuffer:
+    """csv.writer over a StringIO that is emptied and reused each time its text is taken out."""
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self.writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
+
+    def write(self, text: str) -> None:
+        self._buffer.write(text)
+
+    @property
+    def size(self) -> int:
+        return self._buffer.tell()
+
+    def drain(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
 
 
 class ExportService:
@@ -12,9 +86,11 @@ class ExportService:
         self,
         sensor_repository: SensorRepository,
         measurement_repository: MeasurementRepository,
+        station_repository: StationRepository | None = None,
     ):
         self.sensor_repository = sensor_repository
         self.measurement_repository = measurement_repository
+        self.station_repository = station_repository or StationRepository(measurement_repository.db)
 
     def export_sensors_csv(self, station_id: int) -> Iterator[str]:
         """Export sensors for a station as CSV with streaming support.
@@ -60,8 +136,9 @@ class ExportService:
             end_date: Optional end date filter
 
         Yields:
-            CSV rows as strings
+            Blocks of about CSV_BLOCK_CHARS characters of whole CSV rows
         """
+        csv_buffer = CsvBuffer()
         try:
             # Get unique sensor aliases for headers
             sensor_aliases = (
@@ -71,41 +148,168 @@ class ExportService:
             )
 
             # Write CSV header
-            header = "collectiontime,Lat_deg,Lon_deg," + ",".join(sensor_aliases) + "\n"
-            yield header
-
-            # Process measurements in chunks with pre-grouped data
-            for (
-                measurement_chunk
-            ) in self.measurement_repository.get_measurements_pivot_by_station_chunked(
-                station_id, chunk_size=1000, start_date=start_date, end_date=end_date
+            csv_buffer.write("collectiontime,Lat_deg,Lon_deg," + ",".join(sensor_aliases) + "\n")
+
+            # Each chunk of cursor rows is formatted by csv.writer in one call
+            for rows in self.measurement_repository.get_measurements_pivot_rows_by_station_chunked(
+                station_id, sensor_aliases, chunk_size=CSV_CHUNK_ROWS, start_date=start_date, end_date=end_date
             ):
-                for measurement_group in measurement_chunk:
-                    # Extract values from the pre-grouped data
-                    collection_time = measurement_group["collection_time"]
-                    lat = measurement_group["lat"]
-                    lon = measurement_group["lon"]
-                    sensor_values = measurement_group["sensor_values"]
-
-                    # Build row data efficiently
-                    row_data = [
-                        collection_time.isoformat() if collection_time else "",
-                        str(lat) if lat is not None else "",
-                        str(lon) if lon is not None else "",
-                    ]
-
-                    # Add sensor values in order of aliases
-                    for alias in sensor_aliases:
-                        value = sensor_values.get(alias)
-                        row_data.append(str(value) if value is not None else "")
-
-                    # Write CSV row with optimized escaping
-                    escaped_fields = []
-                    for field in row_data:
-                        escaped_field = str(field).replace('"', '""')
-                        escaped_fields.append(f'"{escaped_field}"')
-                    yield ",".join(escaped_fields) + "\n"
+                csv_buffer.writer.writerows(self._csv_rows(rows))
+                if csv_buffer.size >= CSV_BLOCK_CHARS:
+                    yield csv_buffer.drain()
 
         except Exception as e:
             # If streaming fails, yield error information
-            yield f"# Error during export: {str(e)}\n"
+            csv_buffer.write(f"# Error during export: {str(e)}\n")
+        yield csv_buffer.drain()
+
+    def export_campaign_measurements_csv(
+        self,
+        campaign_id: int,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> Iterator[str]:
+        """Export measurements for every station of a campaign as one CSV, in a single pass.
+
+        The columns are those of the station export, led by station_id, with
+        one column per sensor alias found in the campaign.
+        """
+        csv_buffer = CsvBuffer()
+        try:
+            sensor_aliases = (
+                self.measurement_repository.get_unique_sensor_aliases_for_campaign(
+                    campaign_id
+                )
+            )
+            csv_buffer.write("station_id,collectiontime,Lat_deg,Lon_deg," + ",".join(sensor_aliases) + "\n")
+
+            for rows in self.measurement_repository.get_measurements_pivot_rows_by_campaign_chunked(
+                campaign_id, sensor_aliases, chunk_size=CSV_CHUNK_ROWS, start_date=start_date, end_date=end_date
+            ):
+                csv_buffer.writer.writerows(self._csv_rows(rows, with_station_id=True))
+                if csv_buffer.size >= CSV_BLOCK_CHARS:
+                    yield csv_buffer.drain()
+
+        except Exception as e:
+            # If streaming fails, yield error information
+            csv_buffer.write(f"# Error during export: {str(e)}\n")
+        yield csv_buffer.drain()
+
+    def export_campaign_measurements_zip(
+        self,
+        campaign_id: int,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> Iterator[bytes]:
+        """Export a campaign as a ZIP of the sensors and measurements files of each station.
+
+        The entries are the station exports, compressed as they are generated;
+        only about ZIP_FLUSH_BYTES of the archive is in memory at a time.
+        """
+        stream = ExportStream()
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for station_id in self.station_repository.get_station_ids_by_campaign_id(campaign_id):
+                entries = (
+                    (f"sensors-{station_id}.csv", self.export_sensors_csv(station_id)),
+                    (
+                        f"measurements-{station_id}.csv",
+                        self.export_measurements_csv(station_id, start_date, end_date),
+                    ),
+                )
+                for name, lines in entries:
+                    # Sizes are unknown up front, so allow entries over 4 GiB
+                    with archive.open(name, "w", force_zip64=True) as entry:
+                        for line in lines:
+                            entry.write(line.encode())
+                            if stream.size >= ZIP_FLUSH_BYTES:
+                                yield stream.drain()
+        yield stream.drain()
+
+    def export_measurements_arrow(
+        self,
+        station_id: int,
+        export_format: ExportFormat,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> Iterator[bytes]:
+        """Export measurements for a station as Parquet or an Arrow IPC stream.
+
+        The columns are those of the CSV export, typed: collectiontime is a
+        timestamp and the coordinates and sensor values are float64. Each
+        partition of the database cursor becomes one record batch, and one
+        Parquet row group, written out before the next is read.
+        """
+        sensor_aliases = self.measurement_repository.get_unique_sensor_aliases_for_station(station_id)
+        schema = self._measurement_schema(sensor_aliases)
+        row_chunks = self.measurement_repository.get_measurements_pivot_rows_by_station_chunked(
+            station_id, sensor_aliases, chunk_size=ARROW_BATCH_ROWS, start_date=start_date, end_date=end_date
+        )
+        # Rows lead with the station id, which a station export leaves out
+        yield from self._write_arrow(
+            (self._record_batch(rows, schema, skip_columns=1) for rows in row_chunks), schema, export_format
+        )
+
+    def export_campaign_measurements_arrow(
+        self,
+        campaign_id: int,
+        export_format: ExportFormat,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> Iterator[bytes]:
+        """Export measurements for every station of a campaign as Parquet or an Arrow IPC stream.
+
+        The columns are those of the station export, led by station_id, with
+        one column per sensor alias found in the campaign.
+        """
+        sensor_aliases = self.measurement_repository.get_unique_sensor_aliases_for_campaign(campaign_id)
+        schema = self._measurement_schema(sensor_aliases, with_station_id=True)
+        row_chunks = self.measurement_repository.get_measurements_pivot_rows_by_campaign_chunked(
+            campaign_id, sensor_aliases, chunk_size=ARROW_BATCH_ROWS, start_date=start_date, end_date=end_date
+        )
+        yield from self._write_arrow(
+            (self._record_batch(rows, schema) for rows in row_chunks), schema, export_format
+        )
+
+    @staticmethod
+    def _measurement_schema(sensor_aliases: list[str], with_station_id: bool = False) -> pa.Schema:
+        fields = [
+            pa.field("collectiontime", pa.timestamp("us")),
+            pa.field("Lat_deg", pa.float64()),
+            pa.field("Lon_deg", pa.float64()),
+            *[pa.field(alias, pa.float64()) for alias in sensor_aliases],
+        ]
+        if with_station_id:
+            fields.insert(0, pa.field("station_id", pa.int32()))
+        return pa.schema(fields)
+
+    @staticmethod
+    def _record_batch(rows: Sequence[Any], schema: pa.Schema, skip_columns: int = 0) -> pa.RecordBatch:
+        """Columns of a chunk of cursor rows, converted straight from the driver's values."""
+        columns = list(zip(*rows))[skip_columns:]
+        return pa.record_batch(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+        )
+
+    @staticmethod
+    def _write_arrow(
+        batches: Iterator[pa.RecordBatch], schema: pa.Schema, export_format: ExportFormat
+    ) -> Iterator[bytes]:
+        stream = ExportStream()
+        writer: pq.ParquetWriter | pa.ipc.RecordBatchStreamWriter
+        if export_format == ExportFormat.PARQUET:
+            writer = pq.ParquetWriter(stream, schema)
+        else:
+            writer = pa.ipc.new_stream(stream, schema)
+        with writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                yield stream.drain()
+        # The Parquet footer, or the end-of-stream marker
+        yield stream.drain()
+
+    @staticmethod
+    def _csv_rows(rows: Sequence[Any], with_station_id: bool = False) -> Iterator[tuple[Any, ...]]:
+        """Cells of cursor rows for csv.writer, with collectiontime in ISO 8601; None is written empty."""
+        for station_id, collection_time, *values in rows:
+            time = collection_time.isoformat() if collection_time else None
+            yield (station_id, time, *values) if with_station_id else (time, *values)
@@ -0,0 +1,249 @@
+from datetime import datetime
+import logging
+from pathlib import Path
+import shutil
+from typing import Any, BinaryIO, Callable
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app.api.v1.schemas.job import JobItem, UploadJobsResponse, UploadStatusResponse
+from app.core.config import get_settings
+from app.db.models.job import Job
+from app.db.repositories.campaign_repository import CampaignRepository
+from app.db.repositories.job_repository import JobRepository
+from app.db.repositories.measurement_repository import MeasurementRepository
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.station_repository import StationRepository
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.utils.upload_csv import process_measurements_file, process_sensors_file
+
+MAX_ATTEMPTS = 3
+
+UPLOAD_STATISTICS_JOB = "upload_statistics"
+STATION_GEOMETRY_JOB = "station_geometry"
+PROCESS_UPLOAD_JOB = "process_upload"
+
+
+def upload_dir(upload_event_id: int) -> Path:
+    return Path(get_settings().UPLOAD_DIR) / str(upload_event_id)
+
+
+def refresh_upload_statistics(db: Session, payload: dict[str, Any], heartbeat: Callable[[], None]) -> None:
+    """Rebuild rollups and merge sensor statistics for the windows an upload touched."""
+    measurement_repository = MeasurementRepository(db)
+    sensor_repository = SensorRepository(db)
+    for sensor_id, (start, end) in payload["sensor_spans"].items():
+        start_time, end_time = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        measurement_repository.refresh_measurement_rollups(int(sensor_id), start_time, end_time)
+        sensor_repository.merge_sensor_statistics(
+            int(sensor_id), payload["upload_event_id"], start_time, end_time
+        )
+        heartbeat()
+
+
+def refresh_station_geometry(db: Session, payload: dict[str, Any], heartbeat: Callable[[], None]) -> None:
+    """Recompute the station bounding box, then the campaign's that contains it."""
+    StationRepository(db).refresh_station_geometry(payload["station_id"])
+    if payload.get("campaign_id") is not None:
+        CampaignRepository(db).refresh_campaign_geometry(payload["campaign_id"])
+
+
+def process_upload(db: Session, payload: dict[str, Any], heartbeat: Callable[[], None]) -> None:
+    """Ingest the sensors and measurements files saved by an upload accepted in background mode.
+
+    A retried job resumes after the rows its earlier attempts committed; rows past
+    that watermark that did reach the database are skipped by the
+    (sensorid, collectiontime) conflict target and counted as rejected. The
+    counters are saved with the watermark, so they only cover the rows below it.
+    Each checkpoint is also the job's heartbeat.
+    """
+    upload_event_id = payload["upload_event_id"]
+    station_id = payload["station_id"]
+    directory = upload_dir(upload_event_id)
+    upload_file_event_repository = UploadFileEventRepository(db)
+
+    upload_event = upload_file_event_repository.get_upload_event(upload_event_id)
+    if upload_event is not None and upload_event.rows_committed > 0:
+        skip_rows = upload_event.rows_committed
+        base_parsed, base_inserted = upload_event.rows_parsed, upload_event.rows_inserted
+        upload_file_event_repository.resume_processing(upload_event_id)
+    else:
+        skip_rows = base_parsed = base_inserted = 0
+        upload_file_event_repository.start_processing(upload_event_id)
+
+    def checkpoint(rows: int, parsed: int, inserted: int) -> None:
+        upload_file_event_repository.commit_rows(
+            upload_event_id, rows, base_parsed + parsed, base_inserted + inserted
+        )
+        heartbeat()
+
+    with open(directory / "sensors.csv", "rb") as sensors_file:
+        alias_to_sensorid_map = process_sensors_file(
+            UploadFile(sensors_file), station_id, upload_event_id, db
+        )
+    with open(directory / "measurements.csv", "rb") as measurements_file:
+        _, errors, sensor_spans = process_measurements_file(
+            UploadFile(measurements_file),
+            station_id,
+            alias_to_sensorid_map,
+            upload_event_id,
+            db,
+            skip_rows=skip_rows,
+            on_checkpoint=checkpoint,
+        )
+    upload_file_event_repository.finish_processing(upload_event_id, errors)
+
+    JobService(JobRepository(db)).enqueue_upload_refresh(
+        upload_event_id, station_id, payload["campaign_id"], sensor_spans
+    )
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+# Handlers take the session, the job payload and a callback that refreshes the job's heartbeat
+JOB_HANDLERS: dict[str, Callable[[Session, dict[str, Any], Callable[[], None]], None]] = {
+    UPLOAD_STATISTICS_JOB: refresh_upload_statistics,
+    STATION_GEOMETRY_JOB: refresh_station_geometry,
+    PROCESS_UPLOAD_JOB: process_upload,
+}
+
+
+class JobService:
+    def __init__(
+        self,
+        job_repository: JobRepository,
+        upload_file_event_repository: UploadFileEventRepository | None = None,
+    ):
+        self.job_repository = job_repository
+        self.upload_file_event_repository = upload_file_event_repository or UploadFileEventRepository(
+            job_repository.db
+        )
+
+    def enqueue_upload_processing(
+        self,
+        upload_event_id: int,
+        station_id: int,
+        campaign_id: int,
+        sensors_file: BinaryIO,
+        measurements_file: BinaryIO,
+    ) -> Job:
+        """Save the uploaded files where the workers can read them and queue their ingestion."""
+        directory = upload_dir(upload_event_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, source in (("sensors.csv", sensors_file), ("measurements.csv", measurements_file)):
+            with open(directory / name, "wb") as target:
+                shutil.copyfileobj(source, target, length=1024 * 1024)
+        return self.enqueue_upload_ingest(upload_event_id, station_id, campaign_id)
+
+    def enqueue_upload_ingest(self, upload_event_id: int, station_id: int, campaign_id: int) -> Job:
+        """Queue ingestion of the files saved for an upload, unless it is already queued or running."""
+        for job in self.job_repository.list_jobs_for_upload(upload_event_id):
+            if job.kind == PROCESS_UPLOAD_JOB and job.status in ("queued", "running"):
+                return job
+        return self.job_repository.enqueue(
+            PROCESS_UPLOAD_JOB,
+            {"upload_event_id": upload_event_id, "station_id": station_id, "campaign_id": campaign_id},
+            upload_event_id=upload_event_id,
+        )
+
+    def enqueue_upload_refresh(
+        self,
+        upload_event_id: int,
+        station_id: int,
+        campaign_id: int,
+        sensor_spans: dict[int, tuple[datetime, datetime]],
+    ) -> list[Job]:
+        """Queue the derived-data refreshes that follow a measurements upload."""
+        spans = {
+            str(sensor_id): [start.isoformat(), end.isoformat()]
+            for sensor_id, (start, end) in sensor_spans.items()
+        }
+        return [
+            self.job_repository.enqueue(
+                UPLOAD_STATISTICS_JOB,
+                {"upload_event_id": upload_event_id, "sensor_spans": spans},
+                upload_event_id=upload_event_id,
+            ),
+            self.job_repository.enqueue(
+                STATION_GEOMETRY_JOB,
+                {"station_id": station_id, "campaign_id": campaign_id},
+                upload_event_id=upload_event_id,
+            ),
+        ]
+
+    def get_upload_campaign_id(self, upload_event_id: int) -> int | None:
+        """Campaign of an upload, from the payload of a job it queued."""
+        for job in self.job_repository.list_jobs_for_upload(upload_event_id):
+            if job.payload.get("campaign_id") is not None:
+                return int(job.payload["campaign_id"])
+        return None
+
+    def get_upload_jobs(self, upload_event_id: int) -> UploadJobsResponse | None:
+        if self.upload_file_event_repository.get_upload_event(upload_event_id) is None:
+            return None
+        jobs = self.job_repository.list_jobs_for_upload(upload_event_id)
+        return UploadJobsResponse(
+            upload_event_id=upload_event_id,
+            status=self._overall_status(jobs),
+            jobs=[JobItem.model_validate(job, from_attributes=True) for job in jobs],
+        )
+
+    def get_upload_status(self, upload_event_id: int) -> UploadStatusResponse | None:
+        """Progress counters and throughput of an upload, with the jobs it queued."""
+        upload_event = self.upload_file_event_repository.get_upload_event(upload_event_id)
+        if upload_event is None:
+            return None
+        jobs = self.job_repository.list_jobs_for_upload(upload_event_id)
+
+        elapsed_seconds = rows_per_second = None
+        if upload_event.processing_started_at is not None:
+            end = upload_event.processing_finished_at or datetime.now().astimezone()
+            elapsed_seconds = max((end - upload_event.processing_started_at).total_seconds(), 0.0)
+            if elapsed_seconds > 0:
+                rows_per_second = upload_event.rows_parsed / elapsed_seconds
+
+        return UploadStatusResponse(
+            upload_event_id=upload_event_id,
+            status=self._overall_status(jobs),
+            rows_parsed=upload_event.rows_parsed,
+            rows_inserted=upload_event.rows_inserted,
+            rows_rejected=upload_event.rows_rejected,
+            processing_started_at=upload_event.processing_started_at,
+            processing_finished_at=upload_event.processing_finished_at,
+            elapsed_seconds=elapsed_seconds,
+            rows_per_second=rows_per_second,
+            errors=upload_event.errors or [],
+            jobs=[JobItem.model_validate(job, from_attributes=True) for job in jobs],
+        )
+
+    @staticmethod
+    def _overall_status(jobs: list[Job]) -> str:
+        statuses = {job.status for job in jobs}
+        if "failed" in statuses:
+            return "failed"
+        if statuses <= {"succeeded"}:
+            return "succeeded"
+        if "running" in statuses or "succeeded" in statuses:
+            return "running"
+        return "queued"
+
+    def run_next(self) -> bool:
+        """Run one queued job. Returns False when the queue is empty."""
+        job = self.job_repository.claim_next()
+        if job is None:
+            return False
+
+        handler = JOB_HANDLERS.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job.kind}")
+            handler(self.job_repository.db, job.payload, lambda: self.job_repository.heartbeat(job.id))
+        except Exception as e:
+            self.job_repository.db.rollback()
+            retry = handler is not None and job.attempts < MAX_ATTEMPTS
+            logging.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            self.job_repository.mark_failed(job, str(e), retry=retry)
+            return True
+
+        self.job_repository.mark_succeeded(job)
+        return True
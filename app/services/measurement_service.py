@@ -1,38 +1,61 @@
 from datetime import datetime
 import json
-from app.api.v1.schemas.measurement import AggregatedMeasurement, MeasurementCreateResponse, MeasurementIn, MeasurementItem, ListMeasurementsResponsePagination, MeasurementUpdate
+
+import numpy as np
+
+from app.api.v1.schemas.measurement import AggregatedMeasurement, DownsampleMethod, MeasurementCreateResponse, MeasurementIn, MeasurementItem, ListMeasurementsResponsePagination, MeasurementUpdate
 from app.db.repositories.measurement_repository import MeasurementRepository
-from app.utils.lttb import lttb
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.lttb import StreamingLTTB, lttb_indices
+from app.utils.rollups import aggregate_rollups, choose_rollup_resolution
 
 
 class MeasurementService:
     def __init__(self, measurement_repository: MeasurementRepository):
         self.measurement_repository = measurement_repository
 
-    def list_measurements(self, sensor_id: int, start_date: datetime | None, end_date: datetime | None, min_value: float | None, max_value: float | None, page: int = 1, limit: int = 20, downsample_threshold: int | None = None) -> ListMeasurementsResponsePagination:
-        rows, total_count, stats_min_value, stats_max_value, stats_average_value = self.measurement_repository.list_measurements(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value, page=page, limit=limit)
+    def list_measurements(self, sensor_id: int, start_date: datetime | None, end_date: datetime | None, min_value: float | None, max_value: float | None, page: int = 1, limit: int = 20, downsample_threshold: int | None = None, cursor: str | None = None, full_range: bool = False, downsample_method: DownsampleMethod = DownsampleMethod.LTTB) -> ListMeasurementsResponsePagination:
+        # minmax and m4 are computed in SQL and always cover the whole filtered range
+        if (full_range or downsample_method != DownsampleMethod.LTTB) and downsample_threshold is not None and downsample_threshold > 2:
+            return self.downsample_full_range(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value, downsample_threshold=downsample_threshold, downsample_method=downsample_method)
 
-        # Convert rows to MeasurementItem objects
-        measurements : list[MeasurementItem] = []
+        after = decode_cursor(cursor) if cursor else None
+        rows, total_count, stats_min_value, stats_max_value, stats_average_value = self.measurement_repository.list_measurements(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value, page=page, limit=limit, after=after)
+
+        # A full page means there may be more rows; hand out the position of the last one
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1][0].collectiontime, rows[-1][0].measurementid)
+
+        rows_with_geometry = []
         for row in rows:
             if row[1] is not None:
-                measurements.append(MeasurementItem(
-                    id=row[0].measurementid,
-                    value=row[0].measurementvalue,
-                    collectiontime=row[0].collectiontime,
-                    description=row[0].description,
-                    variabletype=row[0].variabletype,
-                    variablename=row[0].variablename,
-                    sensorid=row[0].sensorid,
-                    geometry=json.loads(row[1])
-                ))
+                rows_with_geometry.append(row)
             else:
                 print(f"Measurement {row[0].measurementid} has no geometry {row[1]}")
 
         is_downsampled = downsample_threshold is not None and downsample_threshold > 2
-        # Apply LTTB downsampling if threshold is provided
+        # Apply LTTB downsampling on raw arrays so only surviving points become MeasurementItems
+        if is_downsampled and downsample_threshold is not None:
+            times = np.fromiter((row[0].collectiontime.timestamp() for row in rows_with_geometry), np.float64, len(rows_with_geometry))
+            values = np.fromiter((row[0].measurementvalue for row in rows_with_geometry), np.float64, len(rows_with_geometry))
+            rows_with_geometry = [rows_with_geometry[i] for i in lttb_indices(times, values, downsample_threshold)]
+
+        # Convert rows to MeasurementItem objects
+        measurements : list[MeasurementItem] = []
+        for row in rows_with_geometry:
+            measurements.append(MeasurementItem(
+                id=row[0].measurementid,
+                value=row[0].measurementvalue,
+                collectiontime=row[0].collectiontime,
+                description=row[0].description,
+                variabletype=row[0].variabletype,
+                variablename=row[0].variablename,
+                sensorid=row[0].sensorid,
+                geometry=json.loads(row[1])
+            ))
+
         if is_downsampled and downsample_threshold is not None:
-            measurements = lttb(measurements, downsample_threshold)
             pages = len(measurements) // downsample_threshold + 1
             downsampled_total = len(measurements)
         else:
@@ -47,12 +70,74 @@ class MeasurementService:
             pages=pages,
             downsampled=is_downsampled,
             downsampled_total=downsampled_total,
+            next_cursor=next_cursor,
+            min_value=stats_min_value if stats_min_value is not None else 0,
+            max_value=stats_max_value if stats_max_value is not None else 0,
+            average_value=stats_average_value if stats_average_value is not None else 0
+        )
+
+    def downsample_full_range(self, sensor_id: int, start_date: datetime | None, end_date: datetime | None, min_value: float | None, max_value: float | None, downsample_threshold: int, downsample_method: DownsampleMethod = DownsampleMethod.LTTB) -> ListMeasurementsResponsePagination:
+        """Downsample every measurement in the filtered range to at most downsample_threshold points.
+
+        For LTTB the range is streamed from the database in time order and reduced bucket by
+        bucket, so memory stays bounded no matter how many rows the range holds. minmax (2 points
+        per bucket) and m4 (4 points per bucket) are reduced entirely in the database.
+        """
+        if downsample_method == DownsampleMethod.LTTB:
+            # The series length comes from the same scan as the statistics
+            series_length, total_count, stats_min_value, stats_max_value, stats_average_value = self.measurement_repository.get_measurement_series_statistics(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value)
+            reducer = StreamingLTTB(series_length, downsample_threshold)
+            for ids, times, values in self.measurement_repository.stream_measurement_series(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value):
+                reducer.push(ids, times, values)
+            selected_ids = reducer.finish()
+        else:
+            total_count, stats_min_value, stats_max_value, stats_average_value = self.measurement_repository.get_measurement_statistics(sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value)
+            points_per_bucket = 4 if downsample_method == DownsampleMethod.M4 else 2
+            selected_ids = self.measurement_repository.get_bucket_extrema_ids(method=downsample_method, buckets=max(downsample_threshold // points_per_bucket, 1), sensor_id=sensor_id, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value)
+        rows = self.measurement_repository.get_measurements_by_ids(selected_ids)
+
+        measurements : list[MeasurementItem] = []
+        for row in rows:
+            if row[1] is not None:
+                measurements.append(MeasurementItem(
+                    id=row[0].measurementid,
+                    value=row[0].measurementvalue,
+                    collectiontime=row[0].collectiontime,
+                    description=row[0].description,
+                    variabletype=row[0].variabletype,
+                    variablename=row[0].variablename,
+                    sensorid=row[0].sensorid,
+                    geometry=json.loads(row[1])
+                ))
+
+        return ListMeasurementsResponsePagination(
+            items=measurements,
+            total=total_count,
+            page=1,
+            size=downsample_threshold,
+            pages=1,
+            downsampled=True,
+            downsampled_total=len(measurements),
             min_value=stats_min_value if stats_min_value is not None else 0,
             max_value=stats_max_value if stats_max_value is not None else 0,
             average_value=stats_average_value if stats_average_value is not None else 0
         )
 
     def get_measurements_with_confidence_intervals(self, sensor_id: int, interval: str, interval_value: int, start_date: datetime | None, end_date: datetime | None, min_value: float | None, max_value: float | None) -> list[AggregatedMeasurement]:
+        # Value filters apply to individual measurements, which rollups no longer have
+        resolution = None
+        if min_value is None and max_value is None:
+            resolution = choose_rollup_resolution(interval, interval_value, start_date, end_date)
+        # Uploads whose refresh job has not succeeded yet are missing from the rollups
+        if resolution and self.measurement_repository.has_pending_rollup_refresh(sensor_id):
+            resolution = None
+        if resolution:
+            rollups = self.measurement_repository.get_measurement_rollups(sensor_id, resolution, start_date, end_date)
+            # No rollups yet (e.g. not backfilled): answer from the raw measurements. end_date is
+            # inclusive on the raw path but the rollups stop before it, so they only answer when
+            # nothing was measured at exactly end_date
+            if rollups and (end_date is None or not self.measurement_repository.has_measurement_at(sensor_id, end_date)):
+                return aggregate_rollups(rollups, interval, interval_value)
         return self.measurement_repository.get_measurements_with_confidence_intervals(sensor_id=sensor_id, interval=interval, interval_value=interval_value, start_date=start_date, end_date=end_date, min_value=min_value, max_value=max_value)
 
     def update_measurement(self, measurement_id: int, measurement: MeasurementUpdate) -> MeasurementCreateResponse | None:
@@ -181,22 +181,22 @@ class SensorService:
 
     def force_update_station_sensor_statistics(self, station_id: int) -> ForceUpdateSensorStatisticsResponse:
         """Force update statistics for all sensors in a station."""
-        from app.db.models.sensor import Sensor
-        
-        # Get all sensors for the station
-        sensors = self.sensor_repository.db.query(Sensor).filter(Sensor.stationid == station_id).all()
-        sensor_ids = [sensor.sensorid for sensor in sensors]
-        updated_sensor_ids = []
-
-        for sensor_id in sensor_ids:
-            try:
-                self.sensor_repository.delete_sensor_statistics(sensor_id)
-                self.sensor_repository.refresh_sensor_statistics(sensor_id)
-                updated_sensor_ids.append(sensor_id)
-            except Exception:
-                # Continue with other sensors if one fails
-                logging.warning("Failed to update statistics for sensor ID %s", sensor_id)
-                continue
+        return self._force_update_sensor_statistics(station_id=station_id)
+
+    def force_update_campaign_sensor_statistics(self, campaign_id: int) -> ForceUpdateSensorStatisticsResponse:
+        """Force update statistics for all sensors of all stations in a campaign."""
+        return self._force_update_sensor_statistics(campaign_id=campaign_id)
+
+    def _force_update_sensor_statistics(self, station_id: int | None = None, campaign_id: int | None = None) -> ForceUpdateSensorStatisticsResponse:
+        # One set-based statement for all sensors; it either updates all of them or none
+        try:
+            updated_sensor_ids = self.sensor_repository.refresh_sensor_statistics_bulk(
+                station_id=station_id, campaign_id=campaign_id
+            )
+        except Exception as e:
+            self.sensor_repository.db.rollback()
+            logging.warning("Failed to update statistics for station %s / campaign %s: %s", station_id, campaign_id, str(e))
+            updated_sensor_ids = []
 
         return ForceUpdateSensorStatisticsResponse(
             updated_sensor_ids=updated_sensor_ids,
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from app.core.config import get_settings
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services.job_service import JobService
+from app.utils.ndjson_ingest import MeasurementStream
+
+
+class MeasurementStreamService:
+    """Ingests a newline-delimited JSON request body as it arrives, for live sensors.
+
+    Each request is recorded as an upload event, so its progress is reported by
+    the upload status endpoint and the refresh jobs of an upload follow it.
+    """
+
+    def __init__(
+        self,
+        upload_file_event_repository: UploadFileEventRepository,
+        sensor_repository: SensorRepository,
+        job_service: JobService,
+    ):
+        self.upload_file_event_repository = upload_file_event_repository
+        self.sensor_repository = sensor_repository
+        self.job_service = job_service
+
+    async def ingest(self, station_id: int, campaign_id: int, body: AsyncIterator[bytes]) -> dict[str, Any]:
+        """Store the measurements of a request body as it arrives.
+
+        Every database call blocks, so all of them run in the thread pool and the
+        event loop only waits for the body.
+        """
+        settings = get_settings()
+        upload_event_id = await run_in_threadpool(self._start)
+        stream = MeasurementStream(
+            station_id,
+            upload_event_id,
+            self.upload_file_event_repository.db,
+            lambda aliases: self.sensor_repository.get_sensor_ids_by_alias(station_id, aliases),
+            settings.STREAM_BATCH_ROWS,
+            settings.STREAM_FLUSH_SECONDS,
+        )
+
+        def flush() -> None:
+            stream.flush()
+            self.upload_file_event_repository.update_progress(
+                upload_event_id, stream.rows_parsed, stream.rows_inserted, stream.rows_parsed - stream.rows_inserted
+            )
+
+        # The next piece of the body is awaited across flush timeouts rather than
+        # cancelled, which would end the stream
+        pieces = body.__aiter__()
+        next_piece: asyncio.Future[bytes] | None = None
+        error: Exception | None = None
+        try:
+            try:
+                while True:
+                    if next_piece is None:
+                        next_piece = asyncio.ensure_future(pieces.__anext__())
+                    done, _ = await asyncio.wait({next_piece}, timeout=stream.seconds_until_due())
+                    if done:
+                        try:
+                            data = next_piece.result()
+                        except StopAsyncIteration:
+                            break
+                        next_piece = None
+                        stream.feed(data)
+                    if stream.due():
+                        await run_in_threadpool(flush)
+                stream.close()
+            except ClientDisconnect:
+                # Complete lines received before a client disconnects are still stored
+                logging.warning("Client disconnected from the stream of upload event %s", upload_event_id)
+            await run_in_threadpool(flush)
+        except Exception as e:
+            # A failed insert leaves the transaction aborted; nothing more is written
+            await run_in_threadpool(self.upload_file_event_repository.db.rollback)
+            logging.exception("Stream of upload event %s failed", upload_event_id)
+            error = e
+        finally:
+            if next_piece is not None:
+                next_piece.cancel()
+
+        try:
+            await run_in_threadpool(self._finish, upload_event_id, station_id, campaign_id, stream, error)
+        except Exception:
+            if error is None:
+                raise
+            logging.exception("Could not record the end of upload event %s", upload_event_id)
+        if error is not None:
+            raise error
+        return {
+            'upload_event_id': upload_event_id,
+            'lines_received': stream.lines_received,
+            'Total sensors processed': len(stream.alias_to_sensorid_map),
+            'Total measurements added to database': stream.rows_inserted,
+            'values_rejected': stream.values_rejected,
+            'errors': stream.errors,
+        }
+
+    def _start(self) -> int:
+        upload_event = self.upload_file_event_repository.create_upload_event()
+        self.upload_file_event_repository.start_processing(upload_event.id)
+        return upload_event.id
+
+    def _finish(
+        self,
+        upload_event_id: int,
+        station_id: int,
+        campaign_id: int,
+        stream: MeasurementStream,
+        error: Exception | None,
+    ) -> None:
+        """Close the upload event and queue the refresh of what was stored."""
+        errors = stream.errors + ([f"Stream failed: {error}"] if error is not None else [])
+        self.upload_file_event_repository.finish_processing(upload_event_id, errors)
+        if stream.sensor_spans:
+            self.job_service.enqueue_upload_refresh(upload_event_id, station_id, campaign_id, stream.sensor_spans)
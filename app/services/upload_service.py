@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+from typing import Any, BinaryIO
+
+from app.db.models.job import Job
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services.job_service import JobService, upload_dir
+
+PARTS_DIR = "parts"
+MANIFEST_FILE = "upload.json"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadService:
+    """Resumable uploads: the measurements file arrives in numbered parts that are
+    kept under UPLOAD_DIR until the client completes the upload, then ingested by
+    the worker like a background upload."""
+
+    def __init__(self, upload_file_event_repository: UploadFileEventRepository, job_service: JobService):
+        self.upload_file_event_repository = upload_file_event_repository
+        self.job_service = job_service
+
+    def create_resumable_upload(self, station_id: int, campaign_id: int, sensors_file: BinaryIO) -> int:
+        upload_event = self.upload_file_event_repository.create_upload_event()
+        directory = upload_dir(upload_event.id)
+        (directory / PARTS_DIR).mkdir(parents=True, exist_ok=True)
+        with open(directory / "sensors.csv", "wb") as target:
+            shutil.copyfileobj(sensors_file, target, length=COPY_BUFFER_SIZE)
+        (directory / MANIFEST_FILE).write_text(json.dumps({"station_id": station_id, "campaign_id": campaign_id}))
+        return upload_event.id
+
+    def save_part(self, upload_event_id: int, part_number: int, data: BinaryIO) -> int | None:
+        """Store one part of the measurements file, replacing an earlier copy; returns its size."""
+        if self._get_manifest(upload_event_id) is None:
+            return None
+        if part_number < 1:
+            raise ValueError("Part numbers start at 1")
+        parts = upload_dir(upload_event_id) / PARTS_DIR
+        if not parts.is_dir():
+            raise ValueError("Upload is already complete")
+        # Written aside and renamed, so a part cut off mid-transfer is never listed as received
+        partial = parts / f"{part_number}.tmp"
+        with open(partial, "wb") as target:
+            shutil.copyfileobj(data, target, length=COPY_BUFFER_SIZE)
+        os.replace(partial, parts / f"{part_number}.part")
+        return (parts / f"{part_number}.part").stat().st_size
+
+    def list_parts(self, upload_event_id: int) -> list[int] | None:
+        if self._get_manifest(upload_event_id) is None:
+            return None
+        parts = upload_dir(upload_event_id) / PARTS_DIR
+        if not parts.is_dir():
+            return []
+        return sorted(int(path.stem) for path in parts.glob("*.part"))
+
+    def complete_upload(self, upload_event_id: int, total_parts: int) -> Job | None:
+        """Join parts 1..total_parts into the measurements file and queue its ingestion.
+
+        Completing again after the ingest failed queues it again; it resumes from
+        the rows already committed.
+        """
+        manifest = self._get_manifest(upload_event_id)
+        if manifest is None:
+            return None
+        directory = upload_dir(upload_event_id)
+        parts = directory / PARTS_DIR
+        if parts.is_dir():
+            received = set(self.list_parts(upload_event_id) or [])
+            missing = [n for n in range(1, total_parts + 1) if n not in received]
+            if missing:
+                raise ValueError(f"Missing parts: {missing}")
+            if max(received, default=0) > total_parts:
+                raise ValueError(f"Received parts beyond part {total_parts}")
+            joined = directory / "measurements.csv.tmp"
+            with open(joined, "wb") as target:
+                for part_number in range(1, total_parts + 1):
+                    with open(parts / f"{part_number}.part", "rb") as source:
+                        shutil.copyfileobj(source, target, length=COPY_BUFFER_SIZE)
+            os.replace(joined, directory / "measurements.csv")
+            shutil.rmtree(parts)
+        return self.job_service.enqueue_upload_ingest(
+            upload_event_id, manifest["station_id"], manifest["campaign_id"]
+        )
+
+    def get_campaign_id(self, upload_event_id: int) -> int | None:
+        """Campaign of an upload event: from the manifest of a resumable upload still on
+        disk, otherwise from the jobs the upload queued."""
+        manifest = self._get_manifest(upload_event_id)
+        if manifest is not None:
+            return int(manifest["campaign_id"])
+        return self.job_service.get_upload_campaign_id(upload_event_id)
+
+    def _get_manifest(self, upload_event_id: int) -> dict[str, Any] | None:
+        """Station and campaign of a resumable upload whose files are still on disk."""
+        path = upload_dir(upload_event_id) / MANIFEST_FILE
+        if not path.is_file():
+            return None
+        manifest: dict[str, Any] = json.loads(path.read_text())
+        return manifest
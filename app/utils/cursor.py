@@ -0,0 +1,28 @@
+import base64
+import binascii
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(collection_time: datetime, measurement_id: int) -> str:
+    """Encode the position of a measurement as an opaque pagination cursor."""
+    raw = f"{collection_time.isoformat()}|{measurement_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a pagination cursor into (collectiontime, measurementid).
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        collection_time, measurement_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(collection_time), int(measurement_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
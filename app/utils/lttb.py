@@ -1,25 +1,187 @@
 from typing import List
-from datetime import datetime
+
+import numpy as np
+import numpy.typing as npt
+
 from app.api.v1.schemas.measurement import MeasurementItem
 
 
-def calculate_triangle_area(p1: MeasurementItem, p2: MeasurementItem, p3: MeasurementItem) -> float:
-    """Calculate the area of a triangle formed by three points."""
-    if not all(p.value is not None for p in [p1, p2, p3]):
-        return 0.0
+def lttb_indices(
+    x: npt.NDArray[np.float64], y: npt.NDArray[np.float64], threshold: int
+) -> npt.NDArray[np.intp]:
+    """
+    Implements the Largest-Triangle-Three-Buckets (LTTB) algorithm over contiguous arrays
+    and returns the indices of the points to keep.
+
+    The bucket loop is inherently sequential (each pick depends on the previous one),
+    but all per-bucket work is done with vectorized NumPy operations.
+
+    Args:
+        x: Time axis as float64 (e.g. POSIX timestamps), monotonic
+        y: Values as float64, same length as x
+        threshold: Target number of points in the output
+
+    Returns:
+        Sorted array of selected indices into x/y
+    """
+    n = len(x)
+    if threshold >= n or threshold <= 2:
+        return np.arange(n)
+
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if end <= start:
+            end = start + 1
+
+        # Average of the next bucket, or the last point for the final bucket
+        if i < threshold - 3:
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        ax, ay = x[a], y[a]
+        areas = np.abs(
+            (ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay)
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+class StreamingLTTB:
+    """
+    Incremental LTTB over a series of known length delivered in time-ordered chunks.
 
-    # Convert timestamps to numeric values for calculation
-    x1 = p1.collectiontime.timestamp()
-    x2 = p2.collectiontime.timestamp()
-    x3 = p3.collectiontime.timestamp()
+    Only the bucket being decided and the following bucket (whose average is the third
+    triangle vertex) are buffered, so memory is bounded by about 2 * n / threshold points
+    plus one chunk, independent of how many chunks are pushed.
 
-    y1 = p1.value
-    y2 = p2.value
-    y3 = p3.value
+    Usage:
+        reducer = StreamingLTTB(n, threshold)
+        for ids, x, y in chunks:
+            reducer.push(ids, x, y)
+        selected_ids = reducer.finish()
+    """
 
-    # Area = |(x1(y2-y3) + x2(y3-y1) + x3(y1-y2))/2|
-    area = abs((x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2)) / 2.0)
-    return area
+    def __init__(self, n: int, threshold: int):
+        self.n = n
+        self.threshold = threshold
+        self.passthrough = threshold >= n or threshold <= 2
+        self.selected_ids: list[int] = []
+        self._seen = 0
+        self._offset = 0  # global index of the first buffered point
+        self._bucket = 0  # next bucket to decide
+        self._ids = np.empty(0, dtype=np.int64)
+        self._x = np.empty(0, dtype=np.float64)
+        self._y = np.empty(0, dtype=np.float64)
+        self._a = (0.0, 0.0)
+        if not self.passthrough:
+            self._edges = (
+                np.arange(threshold - 1) * ((n - 2) / (threshold - 2))
+            ).astype(np.intp) + 1
+            self._edges[-1] = n - 1
+
+    def push(
+        self,
+        ids: npt.NDArray[np.int64],
+        x: npt.NDArray[np.float64],
+        y: npt.NDArray[np.float64],
+    ) -> None:
+        """Feed the next chunk of the series; points beyond n are ignored."""
+        remaining = self.n - self._seen
+        if remaining <= 0 or len(ids) == 0:
+            return
+        ids, x, y = ids[:remaining], x[:remaining], y[:remaining]
+
+        if self.passthrough:
+            self.selected_ids.extend(int(i) for i in ids)
+            self._seen += len(ids)
+            return
+
+        if self._seen == 0:
+            self.selected_ids.append(int(ids[0]))
+            self._a = (float(x[0]), float(y[0]))
+
+        self._ids = np.concatenate((self._ids, ids))
+        self._x = np.concatenate((self._x, x))
+        self._y = np.concatenate((self._y, y))
+        self._seen += len(ids)
+        self._drain()
+
+    def _drain(self) -> None:
+        edges = self._edges
+        last_bucket = self.threshold - 3
+        while self._bucket <= last_bucket:
+            i = self._bucket
+            # The next bucket (or the final point) must be fully buffered
+            needed = edges[i + 2] if i < last_bucket else self.n
+            if self._offset + len(self._x) < needed:
+                return
+
+            start = edges[i] - self._offset
+            end = max(edges[i + 1], edges[i] + 1) - self._offset
+            if i < last_bucket:
+                next_start = edges[i + 1] - self._offset
+                next_end = max(edges[i + 2], edges[i + 1] + 1) - self._offset
+                avg_x = float(self._x[next_start:next_end].mean())
+                avg_y = float(self._y[next_start:next_end].mean())
+            else:
+                avg_x = float(self._x[self.n - 1 - self._offset])
+                avg_y = float(self._y[self.n - 1 - self._offset])
+
+            ax, ay = self._a
+            areas = np.abs(
+                (ax - avg_x) * (self._y[start:end] - ay)
+                - (ax - self._x[start:end]) * (avg_y - ay)
+            )
+            pick = start + int(np.argmax(areas))
+            self.selected_ids.append(int(self._ids[pick]))
+            self._a = (float(self._x[pick]), float(self._y[pick]))
+            self._bucket += 1
+
+            # Everything before the next bucket is no longer needed
+            drop = edges[i + 1] - self._offset
+            self._ids, self._x, self._y = self._ids[drop:], self._x[drop:], self._y[drop:]
+            self._offset += drop
+
+    def finish(self) -> list[int]:
+        """Return the ids of the selected points in time order."""
+        if self.passthrough or self._seen == 0:
+            return self.selected_ids
+
+        if self._seen == self.n:
+            self.selected_ids.append(int(self._ids[-1]))
+            return self.selected_ids
+
+        # The stream ended early (rows removed since n was counted): reduce
+        # whatever is still buffered to the points we have left to hand out
+        ids, x, y = self._ids, self._x, self._y
+        if self._offset == 0:
+            # The first point is already selected
+            ids, x, y = ids[1:], x[1:], y[1:]
+        target = min(self.threshold - len(self.selected_ids), len(ids))
+        if target >= 3:
+            picks = lttb_indices(x, y, target)
+        else:
+            # Too few for a triangle: keep the last points
+            picks = np.arange(len(ids) - target, len(ids))
+        self.selected_ids.extend(int(ids[i]) for i in picks)
+        return self.selected_ids
 
 
 def lttb(data: List[MeasurementItem], threshold: int) -> List[MeasurementItem]:
@@ -37,49 +199,6 @@ def lttb(data: List[MeasurementItem], threshold: int) -> List[MeasurementItem]:
     if threshold >= len(data) or threshold <= 2:
         return data
 
-    sampled: List[MeasurementItem] = []
-    bucket_size = (len(data) - 2) / (threshold - 2)
-
-    # Always add the first point
-    sampled.append(data[0])
-
-    for i in range(threshold - 2):
-        bucket_start = int((i + 0) * bucket_size) + 1
-        bucket_end = int((i + 1) * bucket_size) + 1
-
-        # Calculate average point for the bucket
-        bucket_data = data[bucket_start:bucket_end]
-        if not bucket_data:
-            continue
-
-        avg_x = sum(p.collectiontime.timestamp() for p in bucket_data) / len(bucket_data)
-        avg_y = sum(p.value for p in bucket_data if p.value is not None) / len(bucket_data)
-
-        # Create average point
-        avg_point = MeasurementItem(
-            id=-1,  # Temporary ID
-            value=avg_y,
-            collectiontime=datetime.fromtimestamp(avg_x),
-            geometry=bucket_data[0].geometry
-        )
-
-        # Find point with maximum triangle area
-        max_area : float = -1.0
-        max_area_point = bucket_data[0]
-
-        for point in bucket_data:
-            area = calculate_triangle_area(
-                sampled[-1],
-                point,
-                avg_point
-            )
-            if area > max_area:
-                max_area = area
-                max_area_point = point
-
-        sampled.append(max_area_point)
-
-    # Always add the last point
-    sampled.append(data[-1])
-
-    return sampled
\ No newline at end of file
+    x = np.fromiter((p.collectiontime.timestamp() for p in data), np.float64, len(data))
+    y = np.fromiter((p.value for p in data), np.float64, len(data))
+    return [data[i] for i in lttb_indices(x, y, threshold)]
@@ -0,0 +1,154 @@
+from datetime import datetime
+import json
+import time
+from typing import Callable
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.utils.upload_csv import UTC_OFFSET, ingest_chunk, merge_sensor_spans
+
+# Keys of a streamed row that are not sensor aliases
+ROW_COLUMNS = ['collectiontime', 'Lat_deg', 'Lon_deg']
+MAX_REPORTED_ERRORS = 100
+
+
+class MeasurementStream:
+    """Micro-batches newline-delimited JSON measurements of one station.
+
+    Each line is one row shaped like a row of the measurements CSV, e.g.
+    {"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 20.5},
+    with any number of sensor aliases as keys. Lines are buffered as received
+    and parsed when the buffer is flushed, either because it holds batch_rows
+    lines or because its oldest line is flush_seconds old; each flush is
+    inserted like a chunk of an upload.
+    """
+
+    def __init__(
+        self,
+        station_id: int,
+        upload_event_id: int,
+        session: Session,
+        resolve_aliases: Callable[[list[str]], dict[str, int]],
+        batch_rows: int,
+        flush_seconds: float,
+    ):
+        self.station_id = station_id
+        self.upload_event_id = upload_event_id
+        self.session = session
+        self.resolve_aliases = resolve_aliases
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.alias_to_sensorid_map: dict[str, int] = {}
+        self.unknown_aliases: set[str] = set()
+        self.lines_received = 0
+        self.rows_parsed = 0
+        self.rows_inserted = 0
+        # Sensor values that were not numbers, left out of the insert
+        self.values_rejected = 0
+        self.errors: list[str] = []
+        self.sensor_spans: dict[int, tuple[datetime, datetime]] = {}
+        self._lines: list[bytes] = []
+        self._partial_line = b''
+        self._oldest: float | None = None
+
+    def feed(self, data: bytes) -> None:
+        """Buffer the complete lines in a piece of the request body; a trailing partial line waits for the next piece."""
+        lines = (self._partial_line + data).split(b'\n')
+        self._partial_line = lines.pop()
+        self._buffer(lines)
+
+    def close(self) -> None:
+        """Buffer a last line not terminated by a newline."""
+        self._buffer([self._partial_line])
+        self._partial_line = b''
+
+    def seconds_until_due(self) -> float | None:
+        """Time left before the buffered lines must be flushed; None when nothing is buffered."""
+        if self._oldest is None:
+            return None
+        return max(self._oldest + self.flush_seconds - time.monotonic(), 0.0)
+
+    def due(self) -> bool:
+        return len(self._lines) >= self.batch_rows or self.seconds_until_due() == 0.0
+
+    def flush(self) -> None:
+        """Parse and insert the buffered lines."""
+        lines, first_line = self._lines, self.lines_received - len(self._lines) + 1
+        self._lines, self._oldest = [], None
+        rows = []
+        for line_number, line in enumerate(lines, start=first_line):
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                self._error(f"Line {line_number}: invalid JSON ({e})")
+                continue
+            if not isinstance(row, dict):
+                self._error(f"Line {line_number}: expected a JSON object")
+                continue
+            rows.append(row)
+        if not rows:
+            return
+
+        chunk = pd.DataFrame.from_records(rows)
+        if 'collectiontime' not in chunk:
+            chunk['collectiontime'] = None
+        chunk['collectiontime'] = pd.to_datetime(
+            chunk['collectiontime'].astype(str).str.replace(UTC_OFFSET, '', regex=True),
+            format='ISO8601', errors='coerce',
+        )
+        missing_time = chunk['collectiontime'].isna()
+        if missing_time.any():
+            self._error(f"{int(missing_time.sum())} rows without a valid collectiontime")
+            chunk = chunk[~missing_time]
+        for column in ('Lat_deg', 'Lon_deg'):
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce') if column in chunk else float('nan')
+        # measurements.geometry cannot be NULL, and one such row would fail the whole batch
+        missing_position = chunk[['Lat_deg', 'Lon_deg']].isna().any(axis=1)
+        if missing_position.any():
+            self._error(f"{int(missing_position.sum())} rows without a valid Lat_deg and Lon_deg")
+            chunk = chunk[~missing_position]
+
+        aliases = [column for column in chunk.columns if column not in ROW_COLUMNS]
+        self._resolve([alias for alias in aliases if alias not in self.alias_to_sensorid_map])
+        aliases = [alias for alias in aliases if alias in self.alias_to_sensorid_map]
+        for alias in aliases:
+            values = pd.to_numeric(chunk[alias], errors='coerce')
+            rejected = int((values.isna() & chunk[alias].notna()).sum())
+            if rejected:
+                self.values_rejected += rejected
+                self._error(f"{rejected} values of '{alias}' are not numbers")
+            chunk[alias] = values
+        if chunk.empty or not aliases:
+            return
+
+        parsed, inserted, chunk_spans = ingest_chunk(
+            chunk, aliases, self.alias_to_sensorid_map, self.station_id, self.upload_event_id, self.session
+        )
+        self.rows_parsed += parsed
+        self.rows_inserted += inserted
+        merge_sensor_spans(self.sensor_spans, chunk_spans)
+
+    def _buffer(self, lines: list[bytes]) -> None:
+        for line in lines:
+            if not line.strip():
+                continue
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._lines.append(line)
+            self.lines_received += 1
+
+    def _resolve(self, aliases: list[str]) -> None:
+        """Look up the sensor ids of aliases not seen before in this stream."""
+        new_aliases = [alias for alias in aliases if alias not in self.unknown_aliases]
+        if not new_aliases:
+            return
+        self.alias_to_sensorid_map.update(self.resolve_aliases(new_aliases))
+        for alias in new_aliases:
+            if alias not in self.alias_to_sensorid_map:
+                self.unknown_aliases.add(alias)
+                self._error(f"No sensor with alias '{alias}' in station {self.station_id}")
+
+    def _error(self, message: str) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
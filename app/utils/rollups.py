@@ -0,0 +1,143 @@
+"""Serve confidence-interval aggregates from the measurement_rollups table.
+
+get_sensor_aggregated_measurements groups raw measurements into intervals of
+`interval_value` x `interval`. Every rollup bucket that lies entirely inside one
+such interval can be merged instead of re-reading the raw rows, so the coarsest
+rollup resolution whose buckets never straddle an interval boundary is used.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from app.api.v1.schemas.measurement import AggregatedMeasurement
+from app.db.models.measurement_rollup import MeasurementRollup
+from app.utils.sketch import merge_sketches, sketch_quantiles
+
+CALENDAR_INTERVALS = ("day", "week", "month", "quarter", "year")
+
+
+def truncate(ts: datetime, unit: str) -> datetime:
+    """Python equivalent of Postgres date_trunc for the units rollups support."""
+    if unit == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if unit == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    if unit == "quarter":
+        return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+    if unit == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unsupported interval: {unit}")
+
+
+def interval_start(ts: datetime, interval: str, interval_value: int) -> datetime:
+    """Mirror the interval expression used by get_sensor_aggregated_measurements."""
+    if interval == "minute" and interval_value > 1:
+        return truncate(ts, "hour") + timedelta(
+            minutes=interval_value * (ts.minute // interval_value)
+        )
+    if interval == "hour" and interval_value > 1:
+        return truncate(ts, "day") + timedelta(
+            hours=interval_value * (ts.hour // interval_value)
+        )
+    return truncate(ts, interval)
+
+
+def choose_rollup_resolution(
+    interval: str,
+    interval_value: int,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> str | None:
+    """Pick the coarsest rollup resolution that reproduces the requested intervals.
+
+    Returns None when no rollup can answer the request exactly and the raw
+    measurements have to be aggregated instead. The rollups are read up to end_date
+    exclusive, so it must fall on a bucket boundary as well; measurements at exactly
+    end_date are left to the caller.
+    """
+    if interval == "minute":
+        candidates = ["hour", "minute"] if interval_value >= 60 else ["minute"]
+    elif interval == "hour":
+        candidates = ["day", "hour"] if interval_value >= 24 else ["hour"]
+    elif interval in CALENDAR_INTERVALS:
+        candidates = ["day", "hour", "minute"]
+    else:
+        return None
+
+    for resolution in candidates:
+        aligned = all(
+            ts is None or truncate(ts, resolution) == ts for ts in (start_date, end_date)
+        )
+        if aligned:
+            return resolution
+    return None
+
+
+def aggregate_rollups(
+    rollups: Iterable[MeasurementRollup], interval: str, interval_value: int
+) -> list[AggregatedMeasurement]:
+    """Merge time-ordered rollup rows into AggregatedMeasurement intervals."""
+    groups: dict[datetime, list[MeasurementRollup]] = {}
+    for rollup in rollups:
+        key = interval_start(rollup.bucket_start, interval, interval_value)
+        groups.setdefault(key, []).append(rollup)
+
+    results: list[AggregatedMeasurement] = []
+    for measurement_time, buckets in sorted(groups.items()):
+        count = sum(b.count for b in buckets)
+        # Intervals with a single point have no spread, same as the SQL function
+        if count <= 1:
+            continue
+        total = sum(b.sum for b in buckets)
+        total_sq = sum(b.sum_sq for b in buckets)
+        avg = total / count
+        variance = max((total_sq - total * total / count) / (count - 1), 0.0)
+        std_dev = math.sqrt(variance)
+        min_value = min(b.min for b in buckets)
+        max_value = max(b.max for b in buckets)
+
+        quantiles = sketch_quantiles(
+            merge_sketches(b.sketch for b in buckets), [0.025, 0.25, 0.5, 0.75, 0.975]
+        )
+        p2_5, p25, median, p75, p97_5 = (
+            min(max(q if q is not None else avg, min_value), max_value)
+            for q in quantiles
+        )
+
+        if count >= 30:
+            t_value = 1.96
+        elif count >= 20:
+            t_value = 2.09
+        elif count >= 10:
+            t_value = 2.23
+        else:
+            t_value = 2.58
+        margin = t_value * (std_dev / math.sqrt(count))
+
+        results.append(
+            AggregatedMeasurement(
+                measurement_time=measurement_time,
+                value=avg,
+                median_value=median,
+                point_count=count,
+                lower_bound=p2_5,
+                upper_bound=p97_5,
+                parametric_lower_bound=avg - margin,
+                parametric_upper_bound=avg + margin,
+                std_dev=std_dev,
+                min_value=min_value,
+                max_value=max_value,
+                percentile_25=p25,
+                percentile_75=p75,
+                ci_method="percentile",
+                confidence_level=0.95,
+            )
+        )
+    return results
@@ -0,0 +1,65 @@
+"""Helpers for the quantile sketches stored in measurement_rollups.sketch.
+
+A sketch is a log-bucketed histogram with 2% relative accuracy (DDSketch):
+positive values land in bin "p<k>" and negative values in "n<k>" where
+k = ceil(log(|v|) / log(GAMMA)); values near zero land in "z". Sketches are
+merged by adding the counts of matching bins. The bin function is mirrored in
+SQL by sketch_bin() so rollups can be built in the database.
+"""
+import math
+from typing import Any, Iterable
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+ZERO_THRESHOLD = 1e-9
+
+
+def sketch_bin(value: float) -> str:
+    if value > ZERO_THRESHOLD:
+        return f"p{math.ceil(math.log(value) / math.log(GAMMA))}"
+    if value < -ZERO_THRESHOLD:
+        return f"n{math.ceil(math.log(-value) / math.log(GAMMA))}"
+    return "z"
+
+
+def merge_sketches(sketches: Iterable[dict[str, Any]]) -> dict[str, int]:
+    merged: dict[str, int] = {}
+    for sketch in sketches:
+        for key, count in sketch.items():
+            merged[key] = merged.get(key, 0) + int(count)
+    return merged
+
+
+def _bin_value(key: str) -> float:
+    """Representative value of a bin (its midpoint in log space)."""
+    if key == "z":
+        return 0.0
+    magnitude = 2 * GAMMA ** int(key[1:]) / (GAMMA + 1)
+    return magnitude if key[0] == "p" else -magnitude
+
+
+def sketch_quantiles(
+    sketch: dict[str, int], quantiles: list[float]
+) -> list[float | None]:
+    """Estimate the given quantiles (0..1) from a sketch.
+
+    Ranks follow percentile_cont (rank = q * (count - 1)) so results line up
+    with the exact values computed from raw measurements.
+    """
+    total = sum(sketch.values())
+    if total == 0:
+        return [None for _ in quantiles]
+
+    bins = sorted(((_bin_value(key), count) for key, count in sketch.items()))
+    results: list[float | None] = []
+    for q in quantiles:
+        rank = q * (total - 1)
+        cumulative = 0
+        for value, count in bins:
+            cumulative += count
+            if cumulative > rank:
+                results.append(value)
+                break
+        else:
+            results.append(bins[-1][0])
+    return results
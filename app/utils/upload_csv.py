@@ -1,45 +1,172 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import closing
 from datetime import datetime
+import io
 import logging
+import struct
+from typing import BinaryIO, Callable, Iterator
+import numpy as np
 import pandas as pd
-from sqlalchemy import insert
-from sqlalchemy.dialects.postgresql import insert
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
 from starlette.formparsers import MultiPartParser
 from fastapi import HTTPException, UploadFile
 from pandantic import Pandantic
-from geoalchemy2 import WKTElement
 from sqlalchemy.orm import Session
-from app.db.models.measurement import Measurement
+from app.core.config import get_settings
+from app.db.session import SessionLocal, engine
 from app.db.repositories.sensor_repository import SensorRepository
-from app.db.models.sensor import Sensor
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
 from app.api.v1.schemas.sensor import SensorIn
 
 # Constants
 MultiPartParser.spool_max_size = 500 * 1024 * 1024
-BATCH_SIZE = 10000
+# Rows of the measurements CSV parsed, melted and inserted with one COPY at a time
+CSV_CHUNK_ROWS = 10000
 DEFAULT_VARIABLE_NAME = 'No BestGuess Formula'
 
+STAGING_COLUMNS = [
+    'sensorid', 'stationid', 'collectiontime', 'measurementvalue',
+    'lon', 'lat', 'variablename', 'upload_file_events_id',
+]
+CREATE_STAGING_TABLE = """
+CREATE TEMP TABLE IF NOT EXISTS measurements_staging (
+    sensorid INTEGER,
+    stationid INTEGER,
+    collectiontime TIMESTAMP,
+    measurementvalue DOUBLE PRECISION,
+    lon DOUBLE PRECISION,
+    lat DOUBLE PRECISION,
+    variablename TEXT,
+    upload_file_events_id INTEGER
+)
+"""
+MERGE_STAGING_TABLE = """
+INSERT INTO measurements (
+    sensorid, stationid, collectiontime, measurementvalue, geometry, variablename, upload_file_events_id
+)
+SELECT
+    sensorid, stationid, collectiontime, measurementvalue,
+    ST_SetSRID(ST_MakePoint(lon, lat), 4326), variablename, upload_file_events_id
+FROM measurements_staging
+ON CONFLICT (sensorid, collectiontime) DO NOTHING
+"""
 
-def process_batch(batch: list[dict[str, int | datetime | float | WKTElement]], session: Session) -> int:
-    """Process a batch of measurements and insert to database."""
-    if not batch:
+# Typed batches (Parquet / Arrow uploads) are sent with binary COPY; variablename,
+# the only variable-width column, is filled in from the alias of each sensor
+BINARY_STAGING_COLUMNS = [
+    'sensorid', 'stationid', 'collectiontime', 'measurementvalue', 'lon', 'lat', 'upload_file_events_id',
+]
+BINARY_COPY_ROW = np.dtype([
+    ('field_count', '>i2'),
+    ('sensorid_size', '>i4'), ('sensorid', '>i4'),
+    ('stationid_size', '>i4'), ('stationid', '>i4'),
+    ('collectiontime_size', '>i4'), ('collectiontime', '>i8'),
+    ('measurementvalue_size', '>i4'), ('measurementvalue', '>f8'),
+    ('lon_size', '>i4'), ('lon', '>f8'),
+    ('lat_size', '>i4'), ('lat', '>f8'),
+    ('upload_file_events_id_size', '>i4'), ('upload_file_events_id', '>i4'),
+])
+BINARY_COPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+BINARY_COPY_TRAILER = struct.pack('>h', -1)
+# Postgres stores timestamps as microseconds since 2000-01-01
+POSTGRES_EPOCH = np.datetime64('2000-01-01T00:00:00', 'us')
+MERGE_BINARY_STAGING_TABLE = """
+INSERT INTO measurements (
+    sensorid, stationid, collectiontime, measurementvalue, geometry, variablename, upload_file_events_id
+)
+SELECT
+    s.sensorid, s.stationid, s.collectiontime, s.measurementvalue,
+    ST_SetSRID(ST_MakePoint(NULLIF(s.lon, 'NaN'), NULLIF(s.lat, 'NaN')), 4326), a.alias, s.upload_file_events_id
+FROM measurements_staging s
+JOIN unnest(CAST(:sensor_ids AS INTEGER[]), CAST(:aliases AS TEXT[])) AS a (sensorid, alias)
+    ON a.sensorid = s.sensorid
+ON CONFLICT (sensorid, collectiontime) DO NOTHING
+"""
+
+# Trailing UTC offset of an ISO 8601 time; Postgres ignores it when reading a TIMESTAMP
+UTC_OFFSET = r'(Z|[+-]\d\d:?\d\d)$'
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+ARROW_STREAM_MAGIC = b'\xff\xff\xff\xff'
+
+
+def copy_batch(batch: pd.DataFrame, session: Session) -> int:
+    """Insert a batch of measurements with COPY and return how many were new.
+
+    The rows are streamed as CSV into a session-local staging table, then merged
+    into measurements by a single INSERT ... SELECT that builds the geometries
+    from the lon/lat columns and skips rows already stored.
+    """
+    if batch.empty:
+        return 0
+    buffer = io.StringIO()
+    batch.to_csv(buffer, columns=STAGING_COLUMNS, header=False, index=False)
+    buffer.seek(0)
+
+    session.execute(text(CREATE_STAGING_TABLE))
+    with closing(session.connection().connection.cursor()) as cursor:
+        cursor.copy_expert(
+            f"COPY measurements_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    inserted_count: int = session.execute(text(MERGE_STAGING_TABLE)).rowcount  # type: ignore[attr-defined]
+    session.execute(text("TRUNCATE measurements_staging"))
+    session.commit()
+    return inserted_count
+
+def encode_binary_copy(batch: pd.DataFrame) -> bytes:
+    """Encode typed long-form measurements in the Postgres binary COPY format."""
+    times = batch['collectiontime'].to_numpy(dtype='datetime64[us]')
+    if np.isnat(times).any():
+        raise ValueError("Measurements without a collectiontime")
+    rows = np.empty(len(batch), dtype=BINARY_COPY_ROW)
+    rows['field_count'] = len(BINARY_STAGING_COLUMNS)
+    for column in BINARY_STAGING_COLUMNS:
+        rows[f'{column}_size'] = BINARY_COPY_ROW[column].itemsize
+    rows['sensorid'] = batch['sensorid'].to_numpy()
+    rows['stationid'] = batch['stationid'].to_numpy()
+    rows['collectiontime'] = (times - POSTGRES_EPOCH).astype(np.int64)
+    rows['measurementvalue'] = batch['measurementvalue'].to_numpy(dtype=np.float64)
+    rows['lon'] = batch['lon'].to_numpy(dtype=np.float64)
+    rows['lat'] = batch['lat'].to_numpy(dtype=np.float64)
+    rows['upload_file_events_id'] = batch['upload_file_events_id'].to_numpy()
+    return BINARY_COPY_HEADER + rows.tobytes() + BINARY_COPY_TRAILER
+
+def copy_batch_binary(batch: pd.DataFrame, session: Session) -> int:
+    """Insert a batch of typed measurements with binary COPY and return how many were new.
+
+    Same staging table and merge as copy_batch, without formatting any value as text.
+    """
+    if batch.empty:
         return 0
-    stmt = insert(Measurement).values(batch)
-    stmt = stmt.on_conflict_do_nothing( # type: ignore[attr-defined]
-        index_elements=['sensorid', 'collectiontime']
-    )
-    result = session.execute(stmt)
-    inserted_count = result.rowcount if hasattr(result, 'rowcount') else len(batch)
+    aliases = batch.groupby('variablename', observed=True)['sensorid'].first()
+
+    session.execute(text(CREATE_STAGING_TABLE))
+    with closing(session.connection().connection.cursor()) as cursor:
+        cursor.copy_expert(
+            f"COPY measurements_staging ({', '.join(BINARY_STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT binary)",
+            io.BytesIO(encode_binary_copy(batch)),
+        )
+    inserted_count: int = session.execute(  # type: ignore[attr-defined]
+        text(MERGE_BINARY_STAGING_TABLE),
+        {'sensor_ids': aliases.tolist(), 'aliases': [str(alias) for alias in aliases.index]},
+    ).rowcount
+    session.execute(text("TRUNCATE measurements_staging"))
     session.commit()
-    batch.clear()
     return inserted_count
 
 def process_sensors_file(file: UploadFile, station_id: int, upload_event_id: int, session: Session) -> dict[str, int]:
-    """Process the sensors CSV file and return a mapping of aliases to sensor IDs."""
+    """Process the sensors CSV file and return a mapping of aliases to sensor IDs.
+
+    Sensors already on the station are looked up with one query and the rest are
+    created with one INSERT ... RETURNING.
+    """
     # Read CSV using pandas
     sensor_repository = SensorRepository(session)
     df_sensors = pd.read_csv(file.file, keep_default_na=False, na_values=[])
-    sensor_maps : list[Sensor]= []
-    existing_sensors : list[Sensor]= []
     validator = Pandantic(schema=SensorIn)
 
     try:
@@ -48,118 +175,334 @@ def process_sensors_file(file: UploadFile, station_id: int, upload_event_id: int
         file.file.close()
         logging.error(f"Validation error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Validation failed: {str(e)}")
-    # Process each row
-    for _, sensor_row in df_sensors.iterrows():
-        sensor: Sensor = Sensor(
-            alias=sensor_row.alias,
-            variablename=sensor_row.variablename if 'variablename' in sensor_row else DEFAULT_VARIABLE_NAME,
-            stationid=station_id,
-            upload_file_events_id=upload_event_id,
-            units=sensor_row.units if 'units' in sensor_row else None,
-            postprocess=sensor_row.postprocess if 'postprocess' in sensor_row else None,
-            postprocessscript=sensor_row.postprocessscript if 'postprocessscript' in sensor_row else None,
-        )
-        existing_sensor = sensor_repository.get_sensor_by_alias_and_station_id(str(sensor.alias), station_id)
-        if existing_sensor is None:
-            sensor_maps.append(sensor)
-        else:
-            existing_sensors.append(existing_sensor)
-    sensor_repository.create_sensors(sensor_maps)
-
-    # Get sensor mapping
-    alias_to_sensorid = session.query(
-        Sensor.alias, Sensor.sensorid
-    ).filter(Sensor.upload_file_events_id == upload_event_id).all()
-
-    response: dict[str, int] = {}
-    for el in alias_to_sensorid:
-        if el.alias is not None:
-          response[el.alias] = el.sensorid
-    for sensor in existing_sensors:
-        if sensor.alias is not None:
-          response[sensor.alias] = sensor.sensorid
 
+    df_sensors['alias'] = df_sensors['alias'].astype(str)
+    # A repeated alias maps to a single sensor
+    df_sensors = df_sensors.drop_duplicates(subset='alias')
+    response = sensor_repository.get_sensor_ids_by_alias(station_id, df_sensors['alias'].tolist())
+
+    new_sensors = [
+        {
+            'alias': sensor_row['alias'],
+            'variablename': sensor_row.get('variablename', DEFAULT_VARIABLE_NAME),
+            'stationid': station_id,
+            'upload_file_events_id': upload_event_id,
+            'units': sensor_row.get('units'),
+            'postprocess': sensor_row.get('postprocess'),
+            'postprocessscript': sensor_row.get('postprocessscript'),
+        }
+        for sensor_row in df_sensors.to_dict('records')
+        if sensor_row['alias'] not in response
+    ]
+    response.update(sensor_repository.insert_sensors(new_sensors))
     return response
 
-def create_measurement_dict(
+def melt_measurements(
+    chunk: pd.DataFrame,
+    aliases: list[str],
+    alias_to_sensorid_map: dict[str, int],
     station_id: int,
-    collection_time: datetime,
-    measurement_value: float,
-    geometry: WKTElement,
-    sensor_id: int,
-    upload_event_id: int
-) -> dict[str, int | datetime | float | WKTElement]:
-    """Create a measurement dictionary with all required fields."""
-    return {
+    upload_event_id: int,
+) -> pd.DataFrame:
+    """Turn a wide chunk (one column per alias) into one row per non-empty cell.
+
+    The alias columns are stacked as one 2-D array and filtered with a single
+    mask; row positions index the shared columns and alias codes index the
+    sensor ids, so no Python object is created per measurement.
+    """
+    values = chunk[aliases].to_numpy()
+    mask = pd.notna(values).ravel(order='F')
+    n_rows = len(chunk)
+    rows = np.tile(np.arange(n_rows), len(aliases))[mask]
+    codes = np.repeat(np.arange(len(aliases)), n_rows)[mask]
+    sensor_ids = np.array([alias_to_sensorid_map[alias] for alias in aliases], dtype=np.int64)
+
+    # copy=False keeps every column in its own block instead of consolidating them
+    return pd.DataFrame({
+        'sensorid': sensor_ids[codes],
         'stationid': station_id,
-        'collectiontime': collection_time,
-        'measurementvalue': measurement_value,
-        'geometry': geometry,
-        'sensorid': sensor_id,
-        'upload_file_events_id': upload_event_id
-    }
+        'collectiontime': chunk['collectiontime'].to_numpy()[rows],
+        'measurementvalue': values.ravel(order='F')[mask],
+        'lon': chunk['Lon_deg'].to_numpy()[rows],
+        'lat': chunk['Lat_deg'].to_numpy()[rows],
+        'variablename': pd.Categorical.from_codes(codes, categories=pd.Index(aliases)),  # type: ignore[arg-type]
+        'upload_file_events_id': upload_event_id,
+    }, copy=False)
+
+
+def parse_collection_times(times: pd.Series) -> pd.Series:
+    """Read collectiontime values as naive datetimes, the way Postgres reads them into a TIMESTAMP.
+
+    A UTC offset is ignored, keeping the wall-clock time; values that cannot be
+    read become NaT.
+    """
+    if isinstance(times.dtype, pd.DatetimeTZDtype):
+        naive: pd.Series = times.dt.tz_convert(None)
+        return naive
+    if pd.api.types.is_datetime64_any_dtype(times):
+        return times
+    text = times.astype(str).str.strip().str.replace(UTC_OFFSET, '', regex=True)
+    try:
+        return pd.to_datetime(text, format='ISO8601')
+    except ValueError:
+        # Mixed layouts are read value by value
+        return pd.to_datetime(text, format='mixed', errors='coerce')
+
+
+def extend_sensor_spans(
+    sensor_spans: dict[int, tuple[datetime, datetime]],
+    chunk: pd.DataFrame,
+    aliases: list[str],
+    alias_to_sensorid_map: dict[str, int],
+) -> None:
+    """Widen each sensor's time window to cover its non-empty cells in a wide chunk."""
+    if chunk.empty or not aliases:
+        return
+    times = parse_collection_times(chunk['collectiontime'])
+    ticks = times.to_numpy().view('i8')[:, None]
+    # Rows whose time cannot be read are rejected by the database and cover nothing
+    mask = pd.notna(chunk[aliases].to_numpy()) & times.notna().to_numpy()[:, None]
+    first = np.where(mask, ticks, np.iinfo(np.int64).max).argmin(axis=0)
+    last = np.where(mask, ticks, np.iinfo(np.int64).min).argmax(axis=0)
+    for column in np.flatnonzero(mask.any(axis=0)):
+        sensor_id = alias_to_sensorid_map[aliases[column]]
+        start, end = times.iloc[first[column]].to_pydatetime(), times.iloc[last[column]].to_pydatetime()
+        if sensor_id in sensor_spans:
+            start = min(start, sensor_spans[sensor_id][0])
+            end = max(end, sensor_spans[sensor_id][1])
+        sensor_spans[sensor_id] = (start, end)
+
+
+def merge_sensor_spans(
+    sensor_spans: dict[int, tuple[datetime, datetime]], other: dict[int, tuple[datetime, datetime]]
+) -> None:
+    """Widen the windows in sensor_spans to also cover those in other."""
+    for sensor_id, (start, end) in other.items():
+        if sensor_id in sensor_spans:
+            start = min(start, sensor_spans[sensor_id][0])
+            end = max(end, sensor_spans[sensor_id][1])
+        sensor_spans[sensor_id] = (start, end)
+
+
+ChunkResult = tuple[int, int, dict[int, tuple[datetime, datetime]]]
+
+
+class ChunkIngestError(Exception):
+    """A chunk of the measurements file could not be inserted."""
+
+    def __init__(self, index: int, first_row: int, last_row: int, error: BaseException):
+        super().__init__(f"Chunk {index} (data rows {first_row}-{last_row}) failed: {error}")
+
+
+def ingest_chunk(
+    chunk: pd.DataFrame,
+    aliases: list[str],
+    alias_to_sensorid_map: dict[str, int],
+    station_id: int,
+    upload_event_id: int,
+    session: Session,
+) -> ChunkResult:
+    """Insert one wide chunk; returns the rows parsed and inserted and the sensor windows it covers."""
+    measurements = melt_measurements(chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id)
+    sensor_spans: dict[int, tuple[datetime, datetime]] = {}
+    extend_sensor_spans(sensor_spans, chunk, aliases, alias_to_sensorid_map)
+    # Chunks read from Parquet / Arrow keep their types and skip the text round-trip
+    typed = pd.api.types.is_datetime64_any_dtype(chunk['collectiontime'])
+    inserted = copy_batch_binary(measurements, session) if typed else copy_batch(measurements, session)
+    return len(measurements), inserted, sensor_spans
+
+
+# Session of an ingest worker process, opened by init_ingest_worker
+_worker_session: Session | None = None
+
+
+def init_ingest_worker() -> None:
+    global _worker_session
+    # Connections inherited from the parent process must not be reused here
+    engine.dispose(close=False)
+    _worker_session = SessionLocal()
+
+
+def ingest_chunk_in_worker(
+    chunk: pd.DataFrame,
+    aliases: list[str],
+    alias_to_sensorid_map: dict[str, int],
+    station_id: int,
+    upload_event_id: int,
+) -> ChunkResult:
+    assert _worker_session is not None, "init_ingest_worker was not run in this process"
+    return ingest_chunk(chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id, _worker_session)
+
+
+def arrow_chunks(batches: Iterator[pa.RecordBatch]) -> Iterator[pd.DataFrame]:
+    """Slice record batches into CSV_CHUNK_ROWS frames; timestamps keep their wall-clock time, as in CSV."""
+    for batch in batches:
+        for offset in range(0, batch.num_rows, CSV_CHUNK_ROWS):
+            chunk = batch.slice(offset, CSV_CHUNK_ROWS).to_pandas()
+            times = chunk['collectiontime']
+            if isinstance(times.dtype, pd.DatetimeTZDtype):
+                chunk['collectiontime'] = times.dt.tz_localize(None)
+            yield chunk
+
+
+def read_measurement_chunks(file: BinaryIO) -> Iterator[pd.DataFrame]:
+    """Read a measurements file CSV_CHUNK_ROWS rows at a time.
+
+    Parquet and Arrow IPC (file or stream) uploads are recognised by their magic
+    bytes and read column batch by column batch; anything else is parsed as CSV.
+    """
+    magic = file.read(6)
+    file.seek(0)
+    if magic.startswith(PARQUET_MAGIC):
+        yield from arrow_chunks(pq.ParquetFile(file).iter_batches(batch_size=CSV_CHUNK_ROWS))
+    elif magic == ARROW_FILE_MAGIC:
+        reader = pa.ipc.open_file(file)
+        yield from arrow_chunks(reader.get_batch(i) for i in range(reader.num_record_batches))
+    elif magic.startswith(ARROW_STREAM_MAGIC):
+        yield from arrow_chunks(iter(pa.ipc.open_stream(file)))
+    else:
+        with pd.read_csv(
+            file,
+            keep_default_na=False,  # Prevent NaN creation
+            na_values=[''],         # Only empty strings become NaN
+            dtype={'Lon_deg': 'str', 'Lat_deg': 'str'},  # Pre-specify dtypes
+            chunksize=CSV_CHUNK_ROWS,
+        ) as reader:
+            yield from reader
+
 
 def process_measurements_file(
     file: UploadFile,
     station_id: int,
     alias_to_sensorid_map: dict[str, int],
     upload_event_id: int,
-    session: Session
-) -> tuple[int, list[str]]:
-    """Process the measurements CSV file and return total number of measurements processed and any errors."""
-    # Read CSV using pandas
+    session: Session,
+    on_progress: Callable[[int, int, int], None] | None = None,
+    processes: int | None = None,
+    skip_rows: int = 0,
+    on_checkpoint: Callable[[int, int, int], None] | None = None,
+) -> tuple[int, list[str], dict[int, tuple[datetime, datetime]]]:
+    """Process the measurements file (CSV, Parquet or Arrow IPC).
 
-    df = pd.read_csv(
-        file.file,
-        keep_default_na=False,  # Prevent NaN creation
-        na_values=[''],         # Only empty strings become NaN
-        dtype={'Lon_deg': 'str', 'Lat_deg': 'str'},  # Pre-specify dtypes
-    )
-    measurement_batch = []
+    The file is read CSV_CHUNK_ROWS rows at a time and each chunk is inserted
+    before the next one is parsed, so memory does not grow with the file size.
+    With more than one process (UPLOAD_INGEST_PROCESSES by default) the chunks
+    are inserted concurrently by a pool of workers, at most two per worker in
+    flight. Returns the total number of measurements processed, any errors, and
+    the time window covered for each sensor. on_progress, if given, is called
+    after every chunk with the rows parsed, inserted and rejected so far.
+
+    The first skip_rows data rows are parsed for their time windows but not
+    inserted, which resumes an interrupted ingest. on_checkpoint, if given, is
+    called with the number of leading data rows whose chunks are all committed,
+    and the measurements parsed and inserted from those chunks in this call.
+
+    If a chunk fails, the chunks still queued are cancelled, the failure is added
+    to the errors of the upload event, which is marked finished, and the
+    exception is raised again.
+    """
+    if processes is None:
+        processes = get_settings().UPLOAD_INGEST_PROCESSES
     total_measurements = 0
-    errors = []
-    df['geometry_str'] = 'Point (' + df['Lon_deg'] + ' ' + df['Lat_deg'] + ')'
-
-    for alias, sensor_id in alias_to_sensorid_map.items():
-        if alias not in df.columns:
-            # Handle errors if alias is missing in the file
-            error_msg = f"Measurements columns are {df.columns.tolist()} doesn't match with '{alias}'"
-            logging.error(error_msg)
-            errors.append(error_msg)
-            continue
-        valid_mask = pd.notna(df[alias])
-        if not valid_mask.any():
-            continue
-
-        sensor_measurements = [
-            {
-                'stationid': station_id,
-                'collectiontime': time,
-                'measurementvalue': value,
-                'geometry': WKTElement(geom, srid=4326),
-                'sensorid': sensor_id,
-                'variablename': alias,
-                'upload_file_events_id': upload_event_id
-            }
-            for time, value, geom in zip(
-                df.loc[valid_mask, 'collectiontime'],
-                df.loc[valid_mask, alias],
-                df.loc[valid_mask, 'geometry_str']
+    rows_parsed = 0
+    errors: list[str] = []
+    # Time window touched per sensor, used to rebuild its rollups afterwards
+    sensor_spans: dict[int, tuple[datetime, datetime]] = {}
+    aliases: list[str] | None = None
+    rows_read = 0
+    # Chunks may complete out of order with worker processes; the checkpoint only
+    # moves past a chunk once every chunk before it is committed too
+    # First and last data row of each chunk not yet under the checkpoint
+    chunk_rows: dict[int, tuple[int, int]] = {}
+    committed_chunks: dict[int, tuple[int, int]] = {}
+    next_checkpoint = 0
+    # Measurements parsed and inserted from the chunks below the checkpoint
+    checkpoint_parsed = checkpoint_inserted = 0
+
+    def record(index: int, result: ChunkResult) -> None:
+        nonlocal rows_parsed, total_measurements, next_checkpoint, checkpoint_parsed, checkpoint_inserted
+        parsed, inserted, chunk_spans = result
+        rows_parsed += parsed
+        total_measurements += inserted
+        merge_sensor_spans(sensor_spans, chunk_spans)
+        if on_progress:
+            on_progress(rows_parsed, total_measurements, rows_parsed - total_measurements)
+
+        committed_chunks[index] = (parsed, inserted)
+        checkpoint = None
+        while next_checkpoint in committed_chunks:
+            chunk_parsed, chunk_inserted = committed_chunks.pop(next_checkpoint)
+            checkpoint_parsed += chunk_parsed
+            checkpoint_inserted += chunk_inserted
+            checkpoint = chunk_rows.pop(next_checkpoint)[1]
+            next_checkpoint += 1
+        if on_checkpoint and checkpoint is not None:
+            on_checkpoint(checkpoint, checkpoint_parsed, checkpoint_inserted)
+
+    pool = ProcessPoolExecutor(max_workers=processes, initializer=init_ingest_worker) if processes > 1 else None
+    pending: dict[Future[ChunkResult], int] = {}
+
+    def wait_for_chunks(max_pending: int) -> None:
+        while len(pending) > max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    raise ChunkIngestError(index, *chunk_rows[index], e) from e
+                record(index, result)
+
+    try:
+        for index, chunk in enumerate(read_measurement_chunks(file.file)):
+            if aliases is None:
+                aliases = []
+                for alias in alias_to_sensorid_map:
+                    if alias in chunk.columns:
+                        aliases.append(alias)
+                        continue
+                    # Handle errors if alias is missing in the file
+                    error_msg = f"Measurements columns are {chunk.columns.tolist()} doesn't match with '{alias}'"
+                    logging.error(error_msg)
+                    errors.append(error_msg)
+
+            chunk_start, rows_read = rows_read, rows_read + len(chunk)
+            chunk_rows[index] = (chunk_start + 1, rows_read)
+            if chunk_start < skip_rows:
+                # Rows committed by an earlier attempt still bound the sensors' time windows
+                committed = chunk.iloc[:skip_rows - chunk_start]
+                extend_sensor_spans(sensor_spans, committed, aliases, alias_to_sensorid_map)
+                chunk = chunk.iloc[skip_rows - chunk_start:]
+
+            if chunk.empty:
+                record(index, (0, 0, {}))
+                continue
+            if pool is None:
+                try:
+                    result = ingest_chunk(chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id, session)
+                except Exception as e:
+                    raise ChunkIngestError(index, *chunk_rows[index], e) from e
+                record(index, result)
+                continue
+            future = pool.submit(
+                ingest_chunk_in_worker, chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id
             )
-        ]
-        measurement_batch.extend(sensor_measurements)
-        if len(measurement_batch) >= BATCH_SIZE:
-            total_measurements += process_batch(measurement_batch, session)
-            measurement_batch = []
-
-    if measurement_batch:
-        total_measurements += process_batch(measurement_batch, session)
-        measurement_batch = []
-
-    return total_measurements, errors
-
-def update_sensor_statistics(sensor_repository: SensorRepository, alias_to_sensorid_map: dict[str, int]) -> None:
-    """Update statistics for all sensors."""
-    for sensor_id in alias_to_sensorid_map.values():
-        sensor_repository.delete_sensor_statistics(sensor_id)
-        sensor_repository.refresh_sensor_statistics(sensor_id)
\ No newline at end of file
+            pending[future] = index
+            wait_for_chunks(2 * processes - 1)
+
+        wait_for_chunks(0)
+    except Exception as e:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+            pool = None
+        # The upload event must not be left looking in progress
+        session.rollback()
+        errors.append(str(e) if isinstance(e, ChunkIngestError) else f"Reading the measurements file failed: {e}")
+        logging.error(errors[-1])
+        UploadFileEventRepository(session).finish_processing(upload_event_id, errors)
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return total_measurements, errors, sensor_spans
@@ -0,0 +1,60 @@
+"""Background worker for the jobs table.
+
+Run one or more worker processes next to the API:
+
+    python -m app.worker                 # one process, polls forever
+    python -m app.worker --processes 4   # four processes
+    python -m app.worker --drain         # run until the queue is empty, then exit
+"""
+import argparse
+from datetime import timedelta
+import logging
+import multiprocessing
+import time
+
+from app.db.repositories.job_repository import JobRepository
+from app.db.session import SessionLocal
+from app.services.job_service import MAX_ATTEMPTS, JobService
+
+# A running job whose heartbeat is older than this belongs to a worker that died
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def run_worker(poll_interval: float = 2.0, drain: bool = False) -> None:
+    with SessionLocal() as db:
+        job_service = JobService(JobRepository(db))
+        while True:
+            if job_service.run_next():
+                continue
+            # The queue is empty: pick up the jobs of workers that died
+            if job_service.job_repository.requeue_stale(STALE_JOB_TIMEOUT, MAX_ATTEMPTS):
+                continue
+            if drain:
+                return
+            time.sleep(poll_interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.processes == 1:
+        run_worker(args.poll_interval, args.drain)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(args.poll_interval, args.drain))
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark get_sensor_aggregated_measurements against the previous two-CTE query.
+
+Seeds n_rows synthetic measurements (one per second, starting 1900-01-01 so they
+cannot collide with real data) for an existing sensor inside a transaction that
+is rolled back at the end, then times both statements on the same rows.
+
+Usage:
+    python -m benchmarks.bench_confidence_intervals <sensor_id> [n_rows] [interval]
+"""
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+SEED_START = "1900-01-01"
+
+# The statement executed by the 80811109be28 version of the function for a plain
+# date_trunc interval: two CTEs that each scan the sensor's rows, joined afterwards.
+LEGACY_QUERY = """
+WITH aggregated_stats AS (
+    SELECT
+        date_trunc(:interval, collectiontime) AS interval_start,
+        AVG(measurementvalue) AS avg_value,
+        COUNT(*) AS point_count,
+        STDDEV(measurementvalue) AS std_dev,
+        MIN(measurementvalue) AS min_value,
+        MAX(measurementvalue) AS max_value
+    FROM measurements
+    WHERE sensorid = :sensor_id AND collectiontime >= :start_date
+    GROUP BY interval_start
+    ORDER BY interval_start
+),
+percentile_stats AS (
+    SELECT
+        date_trunc(:interval, collectiontime) AS interval_start,
+        percentile_cont(0.025) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_2_5,
+        percentile_cont(0.25) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_25,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY measurementvalue) AS median_value,
+        percentile_cont(0.75) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_75,
+        percentile_cont(0.975) WITHIN GROUP (ORDER BY measurementvalue) AS percentile_97_5
+    FROM measurements
+    WHERE sensorid = :sensor_id AND collectiontime >= :start_date
+    GROUP BY interval_start
+)
+SELECT
+    a.interval_start AS measurement_time,
+    a.avg_value AS value,
+    p.median_value,
+    a.point_count,
+    p.percentile_2_5 AS lower_bound,
+    p.percentile_97_5 AS upper_bound,
+    a.std_dev,
+    a.min_value,
+    a.max_value,
+    p.percentile_25,
+    p.percentile_75
+FROM aggregated_stats a
+JOIN percentile_stats p ON a.interval_start = p.interval_start
+WHERE a.point_count > 1
+ORDER BY measurement_time
+"""
+
+CURRENT_QUERY = """
+SELECT * FROM get_sensor_aggregated_measurements(
+    :sensor_id, :interval, 1, :start_date, NULL, NULL, NULL
+)
+"""
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    sensor_id = int(sys.argv[1])
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+    interval = sys.argv[3] if len(sys.argv) > 3 else "hour"
+    params = {"sensor_id": sensor_id, "interval": interval, "start_date": SEED_START}
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            start = time.perf_counter()
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO measurements (sensorid, collectiontime, measurementvalue, geometry)
+                    SELECT
+                        :sensor_id,
+                        CAST(:start_date AS TIMESTAMP) + i * INTERVAL '1 second',
+                        20 + 5 * sin(i / 3600.0) + random(),
+                        'SRID=4326;POINT(0 0)'
+                    FROM generate_series(0, :n_rows - 1) AS i
+                    """
+                ),
+                {**params, "n_rows": n_rows},
+            )
+            conn.execute(text("ANALYZE measurements"))
+            print(f"seeded {n_rows} rows in {time.perf_counter() - start:.1f}s")
+
+            timings = {}
+            for name, query in (("legacy (two scans + join)", LEGACY_QUERY), ("single scan", CURRENT_QUERY)):
+                # Warm the cache once so both runs read the same buffers
+                conn.execute(text(query), params).fetchall()
+                start = time.perf_counter()
+                rows = conn.execute(text(query), params).fetchall()
+                timings[name] = time.perf_counter() - start
+                print(f"{name}: {timings[name]:.2f}s -> {len(rows)} intervals")
+
+            legacy, current = timings.values()
+            print(f"speedup: {legacy / current:.2f}x")
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the chunked export generators: OFFSET pages against one server-side cursor.
+
+Seeds n_rows synthetic measurements (one per second from 1900-01-01) for a new
+sensor of an existing station, then reads the station back chunk by chunk as
+the CSV export does, once with the LIMIT/OFFSET pagination the generators used
+to run and once with get_measurements_with_coordinates_by_station_chunked. Every
+OFFSET page re-reads all the rows before it, so the legacy run stops after
+legacy_seconds and reports how far it got. Everything happens in a transaction
+that is rolled back afterwards.
+
+Usage:
+    python -m benchmarks.bench_export <station_id> [n_rows] [legacy_seconds]
+"""
+import sys
+import time
+import typing
+from datetime import datetime
+
+from geoalchemy2.functions import ST_X, ST_Y
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.db.models.measurement import Measurement
+from app.db.models.sensor import Sensor
+from app.db.repositories.measurement_repository import MeasurementRepository
+from app.db.session import engine
+
+SEED_START = "1900-01-01"
+CHUNK_SIZE = 1000
+
+SEED_SENSOR = """
+INSERT INTO sensors (alias, variablename, stationid) VALUES ('bench_export', 'bench', :station_id)
+RETURNING sensorid
+"""
+SEED_MEASUREMENTS = """
+INSERT INTO measurements (sensorid, stationid, collectiontime, measurementvalue, geometry, variablename)
+SELECT :sensor_id, :station_id, CAST(:start AS TIMESTAMP) + n * INTERVAL '1 second', random(),
+       ST_SetSRID(ST_MakePoint(-97 + random(), 30 + random()), 4326), 'bench'
+FROM generate_series(0, :n_rows - 1) AS n
+"""
+
+
+def legacy_chunks(
+    session: Session, station_id: int, chunk_size: int
+) -> typing.Iterator[list[tuple[datetime, float, float, str, float]]]:
+    """The OFFSET pagination the chunked generators used before server-side cursors."""
+    offset = 0
+    while True:
+        stmt = (
+            select(
+                Measurement.collectiontime,
+                ST_Y(Measurement.geometry).label("lat"),
+                ST_X(Measurement.geometry).label("lon"),
+                Sensor.alias,
+                Measurement.measurementvalue,
+            )
+            .join(Sensor, Measurement.sensorid == Sensor.sensorid)
+            .filter(Sensor.stationid == station_id)
+            .filter(Sensor.alias.is_not(None))
+            .order_by(Measurement.collectiontime, Measurement.measurementid)
+            .offset(offset)
+            .limit(chunk_size)
+        )
+        rows = list(session.execute(stmt).all())
+        if not rows:
+            break
+        yield [tuple(row) for row in rows]
+        offset += chunk_size
+
+
+def timed(
+    chunks: typing.Iterator[list[typing.Any]], budget_seconds: float | None = None
+) -> tuple[float, int, float, float, bool]:
+    """Seconds, rows read, first and last chunk latency, and whether the budget ran out."""
+    rows = 0
+    latencies = []
+    started = previous = time.perf_counter()
+    for chunk in chunks:
+        now = time.perf_counter()
+        latencies.append(now - previous)
+        previous = now
+        rows += len(chunk)
+        if budget_seconds is not None and now - started > budget_seconds:
+            return now - started, rows, latencies[0], latencies[-1], True
+    return time.perf_counter() - started, rows, latencies[0], latencies[-1], False
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    station_id = int(sys.argv[1])
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+    legacy_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 300.0
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            started = time.perf_counter()
+            sensor_id = session.execute(text(SEED_SENSOR), {"station_id": station_id}).scalar_one()
+            session.execute(
+                text(SEED_MEASUREMENTS),
+                {"sensor_id": sensor_id, "station_id": station_id, "start": SEED_START, "n_rows": n_rows},
+            )
+            session.execute(text("ANALYZE measurements"))
+            print(f"seeded {n_rows} rows in {time.perf_counter() - started:.1f}s")
+
+            repository = MeasurementRepository(session)
+            cursor_run = timed(repository.get_measurements_with_coordinates_by_station_chunked(station_id, CHUNK_SIZE))
+            legacy_run = timed(legacy_chunks(session, station_id, CHUNK_SIZE), legacy_seconds)
+        finally:
+            session.close()
+            transaction.rollback()
+
+    for name, (seconds, rows, first, last, stopped) in (("OFFSET pages", legacy_run), ("server cursor", cursor_run)):
+        print(
+            f"{name:>13}: {rows} rows in {seconds:.1f}s, {rows / seconds:,.0f} rows/s, "
+            f"chunk latency {first * 1000:.1f}ms first / {last * 1000:.1f}ms last"
+            + (" (stopped at the time budget)" if stopped else "")
+        )
+    cursor_rate, legacy_rate = cursor_run[1] / cursor_run[0], legacy_run[1] / legacy_run[0]
+    print(f"throughput: {cursor_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark COPY-based measurement ingest against the multi-row INSERT it replaces.
+
+Builds n_rows synthetic measurements (one per second, starting 1900-01-01 so they
+cannot collide with real data) for an existing sensor and station, then inserts
+them once with insert_batch (dicts with WKTElement geometries, BATCH_SIZE rows
+per INSERT ... ON CONFLICT DO NOTHING) and once with copy_batch (COPY into the
+staging table, COPY_BATCH_ROWS rows per merge). Each run happens in a transaction
+that is rolled back afterwards; the per-batch commits become savepoint releases.
+
+Usage:
+    python -m benchmarks.bench_ingest <station_id> <sensor_id> [n_rows]
+"""
+import sys
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from geoalchemy2 import WKTElement
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models.measurement import Measurement
+from app.db.session import engine
+from app.utils.upload_csv import copy_batch
+
+SEED_START = "1900-01-01"
+# Rows per multi-row INSERT in the ingest COPY replaced
+BATCH_SIZE = 10000
+# Long-form rows per COPY: a CSV_CHUNK_ROWS chunk of a ten-sensor upload
+COPY_BATCH_ROWS = 100_000
+
+
+def synthetic_frame(station_id: int, sensor_id: int, n_rows: int) -> pd.DataFrame:
+    """Rows shaped like the columns process_measurements_file reads from the CSV."""
+    rng = np.random.default_rng(0)
+    times = pd.date_range(SEED_START, periods=n_rows, freq="s")
+    return pd.DataFrame({
+        'sensorid': sensor_id,
+        'stationid': station_id,
+        'collectiontime': times.strftime("%Y-%m-%dT%H:%M:%S"),
+        'measurementvalue': rng.normal(20, 5, n_rows),
+        'lon': (-97 + rng.random(n_rows)).round(6).astype(str),
+        'lat': (30 + rng.random(n_rows)).round(6).astype(str),
+        'variablename': 'bench',
+        'upload_file_events_id': None,
+    })
+
+
+def insert_batch(batch: list[dict[str, Any]], session: Session) -> int:
+    """Insert a batch of measurement dicts with one INSERT ... ON CONFLICT DO NOTHING."""
+    if not batch:
+        return 0
+    stmt = insert(Measurement).values(batch).on_conflict_do_nothing(
+        index_elements=['sensorid', 'collectiontime']
+    )
+    inserted_count: int = session.execute(stmt).rowcount
+    session.commit()
+    return inserted_count
+
+
+def legacy_ingest(frame: pd.DataFrame, session: Session) -> int:
+    """Dict-per-row batches, as process_measurements_file built them before COPY."""
+    inserted = 0
+    for start in range(0, len(frame), BATCH_SIZE):
+        chunk = frame.iloc[start:start + BATCH_SIZE]
+        batch = [
+            {
+                'stationid': station_id,
+                'collectiontime': collectiontime,
+                'measurementvalue': value,
+                'geometry': WKTElement(f"Point ({lon} {lat})", srid=4326),
+                'sensorid': sensor_id,
+                'variablename': variablename,
+                'upload_file_events_id': None,
+            }
+            for sensor_id, station_id, collectiontime, value, lon, lat, variablename in zip(
+                chunk['sensorid'], chunk['stationid'], chunk['collectiontime'],
+                chunk['measurementvalue'], chunk['lon'], chunk['lat'], chunk['variablename'],
+            )
+        ]
+        inserted += insert_batch(batch, session)
+    return inserted
+
+
+def copy_ingest(frame: pd.DataFrame, session: Session) -> int:
+    inserted = 0
+    for start in range(0, len(frame), COPY_BATCH_ROWS):
+        inserted += copy_batch(frame.iloc[start:start + COPY_BATCH_ROWS], session)
+    return inserted
+
+
+def timed(ingest: Callable[[pd.DataFrame, Session], int], frame: pd.DataFrame) -> tuple[float, int]:
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            started = time.perf_counter()
+            inserted = ingest(frame, session)
+            return time.perf_counter() - started, inserted
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    station_id, sensor_id = int(sys.argv[1]), int(sys.argv[2])
+    n_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 1_000_000
+    frame = synthetic_frame(station_id, sensor_id, n_rows)
+
+    legacy_seconds, legacy_inserted = timed(legacy_ingest, frame)
+    copy_seconds, copy_inserted = timed(copy_ingest, frame)
+
+    print(f"rows: {n_rows}")
+    print(f"INSERT ... VALUES: {legacy_seconds:.2f}s, {legacy_inserted / legacy_seconds:,.0f} rows/s ({legacy_inserted} inserted)")
+    print(f"COPY + merge:      {copy_seconds:.2f}s, {copy_inserted / copy_seconds:,.0f} rows/s ({copy_inserted} inserted)")
+    print(f"speedup: {legacy_seconds / copy_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
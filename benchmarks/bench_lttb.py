@@ -0,0 +1,99 @@
+"""Benchmark the array-based LTTB against the previous MeasurementItem implementation.
+
+Usage:
+    python -m benchmarks.bench_lttb [n_points] [threshold]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+from geojson_pydantic import Point
+from geojson_pydantic.types import Position2D
+
+from app.api.v1.schemas.measurement import MeasurementItem
+from app.utils.lttb import lttb_indices
+
+
+def legacy_lttb(data: List[MeasurementItem], threshold: int) -> List[MeasurementItem]:
+    """Pure-Python LTTB over MeasurementItem objects, as shipped before lttb_indices."""
+    if threshold >= len(data) or threshold <= 2:
+        return data
+
+    sampled: List[MeasurementItem] = [data[0]]
+    bucket_size = (len(data) - 2) / (threshold - 2)
+    for i in range(threshold - 2):
+        bucket_data = data[int(i * bucket_size) + 1:int((i + 1) * bucket_size) + 1]
+        if not bucket_data:
+            continue
+        avg_x = sum(p.collectiontime.timestamp() for p in bucket_data) / len(bucket_data)
+        avg_y = sum(p.value for p in bucket_data) / len(bucket_data)
+        avg_point = MeasurementItem(
+            id=-1,
+            value=avg_y,
+            collectiontime=datetime.fromtimestamp(avg_x),
+            geometry=bucket_data[0].geometry,
+        )
+        max_area = -1.0
+        max_area_point = bucket_data[0]
+        for point in bucket_data:
+            x1, x2, x3 = (
+                sampled[-1].collectiontime.timestamp(),
+                point.collectiontime.timestamp(),
+                avg_point.collectiontime.timestamp(),
+            )
+            y1, y2, y3 = sampled[-1].value, point.value, avg_point.value
+            area = abs((x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2)) / 2.0)
+            if area > max_area:
+                max_area = area
+                max_area_point = point
+        sampled.append(max_area_point)
+    sampled.append(data[-1])
+    return sampled
+
+
+def main() -> None:
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    base_time = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(size=n_points))
+    times = [base_time + timedelta(seconds=i) for i in range(n_points)]
+
+    start = time.perf_counter()
+    x = np.fromiter((t.timestamp() for t in times), np.float64, n_points)
+    indices = lttb_indices(x, values, threshold)
+    items = [
+        MeasurementItem(
+            id=int(i),
+            value=float(values[i]),
+            collectiontime=times[i],
+            geometry=Point(type="Point", coordinates=Position2D(0.0, 0.0)),
+        )
+        for i in indices
+    ]
+    array_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = [
+        MeasurementItem(
+            id=i,
+            value=float(values[i]),
+            collectiontime=times[i],
+            geometry=Point(type="Point", coordinates=Position2D(0.0, 0.0)),
+        )
+        for i in range(n_points)
+    ]
+    legacy = legacy_lttb(data, threshold)
+    legacy_seconds = time.perf_counter() - start
+
+    print(f"points={n_points} threshold={threshold}")
+    print(f"legacy (MeasurementItem + pure Python): {legacy_seconds:.2f}s -> {len(legacy)} points")
+    print(f"lttb_indices (arrays, items built after): {array_seconds:.2f}s -> {len(items)} points")
+    print(f"speedup: {legacy_seconds / array_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
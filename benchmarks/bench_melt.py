@@ -0,0 +1,132 @@
+"""Benchmark the wide-to-long transform of measurement uploads.
+
+Builds a wide upload (n_rows rows, one column per sensor, ~10% empty cells),
+splits it into CSV_CHUNK_ROWS chunks as process_measurements_file reads them,
+and times three ways of turning the chunks into insertable measurements plus the
+per-sensor time windows, without touching the database:
+
+  dicts       per-alias loop creating a dict and a WKTElement per cell (before COPY)
+  pd.melt     DataFrame.melt + alias map, spans from the long frame
+  vectorized  melt_measurements + extend_sensor_spans
+
+Usage:
+    python -m benchmarks.bench_melt [n_rows] [n_sensors]
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from geoalchemy2 import WKTElement
+
+from app.utils.upload_csv import CSV_CHUNK_ROWS, extend_sensor_spans, melt_measurements
+
+Spans = dict[int, tuple[datetime, datetime]]
+
+
+def synthetic_chunks(n_rows: int, n_sensors: int) -> tuple[list[pd.DataFrame], dict[str, int]]:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'collectiontime': pd.date_range("2024-01-01", periods=n_rows, freq="s").strftime("%Y-%m-%dT%H:%M:%S"),
+        'Lat_deg': (30 + rng.random(n_rows)).round(6).astype(str),
+        'Lon_deg': (-97 + rng.random(n_rows)).round(6).astype(str),
+    })
+    alias_to_sensorid_map = {}
+    for i in range(n_sensors):
+        values = rng.normal(20, 5, n_rows).round(3)
+        values[rng.random(n_rows) < 0.1] = np.nan
+        frame[f"SENSOR_{i}"] = values
+        alias_to_sensorid_map[f"SENSOR_{i}"] = i + 1
+    chunks = [frame.iloc[start:start + CSV_CHUNK_ROWS].reset_index(drop=True) for start in range(0, n_rows, CSV_CHUNK_ROWS)]
+    return chunks, alias_to_sensorid_map
+
+
+def update_spans(sensor_spans: Spans, sensor_id: int, start: datetime, end: datetime) -> None:
+    if sensor_id in sensor_spans:
+        start, end = min(start, sensor_spans[sensor_id][0]), max(end, sensor_spans[sensor_id][1])
+    sensor_spans[sensor_id] = (start, end)
+
+
+def dict_transform(chunk: pd.DataFrame, alias_to_sensorid_map: dict[str, int], sensor_spans: Spans) -> int:
+    geometry = 'Point (' + chunk['Lon_deg'] + ' ' + chunk['Lat_deg'] + ')'
+    rows = 0
+    for alias, sensor_id in alias_to_sensorid_map.items():
+        valid_mask = pd.notna(chunk[alias])
+        times = pd.to_datetime(chunk.loc[valid_mask, 'collectiontime'])
+        update_spans(sensor_spans, sensor_id, times.min().to_pydatetime(), times.max().to_pydatetime())
+        rows += len([
+            {
+                'stationid': 1, 'collectiontime': time, 'measurementvalue': value,
+                'geometry': WKTElement(geom, srid=4326), 'sensorid': sensor_id,
+                'variablename': alias, 'upload_file_events_id': 1,
+            }
+            for time, value, geom in zip(
+                chunk.loc[valid_mask, 'collectiontime'], chunk.loc[valid_mask, alias], geometry[valid_mask]
+            )
+        ])
+    return rows
+
+
+def pandas_melt(chunk: pd.DataFrame, alias_to_sensorid_map: dict[str, int]) -> pd.DataFrame:
+    long = chunk.melt(
+        id_vars=['collectiontime', 'Lon_deg', 'Lat_deg'], value_vars=list(alias_to_sensorid_map),
+        var_name='variablename', value_name='measurementvalue',
+    ).dropna(subset=['measurementvalue'])
+    long['sensorid'] = long['variablename'].map(alias_to_sensorid_map)
+    return long
+
+
+def melt_transform(chunk: pd.DataFrame, alias_to_sensorid_map: dict[str, int], sensor_spans: Spans) -> int:
+    long = pandas_melt(chunk, alias_to_sensorid_map)
+    bounds = pd.to_datetime(long['collectiontime']).groupby(long['sensorid']).agg(['min', 'max'])
+    for sensor_id, start, end in zip(bounds.index, bounds['min'], bounds['max']):
+        update_spans(sensor_spans, int(sensor_id), start.to_pydatetime(), end.to_pydatetime())
+    return len(long)
+
+
+def vectorized_transform(chunk: pd.DataFrame, alias_to_sensorid_map: dict[str, int], sensor_spans: Spans) -> int:
+    aliases = list(alias_to_sensorid_map)
+    extend_sensor_spans(sensor_spans, chunk, aliases, alias_to_sensorid_map)
+    return len(melt_measurements(chunk, aliases, alias_to_sensorid_map, 1, 1))
+
+
+def timed(
+    transform: Callable[[pd.DataFrame, dict[str, int], Spans], int],
+    chunks: list[pd.DataFrame],
+    alias_to_sensorid_map: dict[str, int],
+) -> tuple[float, int, Spans]:
+    sensor_spans: Spans = {}
+    started = time.perf_counter()
+    rows = sum(transform(chunk, alias_to_sensorid_map, sensor_spans) for chunk in chunks)
+    return time.perf_counter() - started, rows, sensor_spans
+
+
+def main() -> None:
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_sensors = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    chunks, alias_to_sensorid_map = synthetic_chunks(n_rows, n_sensors)
+
+    # Same measurements, in the same order, as the pandas melt
+    expected = pandas_melt(chunks[0], alias_to_sensorid_map)
+    actual = melt_measurements(chunks[0], list(alias_to_sensorid_map), alias_to_sensorid_map, 1, 1)
+    assert (expected['sensorid'].to_numpy() == actual['sensorid'].to_numpy()).all()
+    assert (expected['measurementvalue'].to_numpy() == actual['measurementvalue'].to_numpy()).all()
+    assert (expected['collectiontime'].to_numpy() == actual['collectiontime'].to_numpy()).all()
+
+    print(f"{n_rows} rows x {n_sensors} sensors, {len(chunks)} chunks")
+    results = {}
+    spans = []
+    for name, transform in [("dicts", dict_transform), ("pd.melt", melt_transform), ("vectorized", vectorized_transform)]:
+        seconds, rows, sensor_spans = timed(transform, chunks, alias_to_sensorid_map)
+        results[name] = seconds
+        spans.append(sensor_spans)
+        print(f"{name:>10}: {seconds:7.2f}s, {rows / seconds:>12,.0f} measurements/s ({rows} measurements)")
+    assert spans[0] == spans[1] == spans[2]
+    print(f"vectorized vs dicts: {results['dicts'] / results['vectorized']:.1f}x, "
+          f"vs pd.melt: {results['pd.melt'] / results['vectorized']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app.api.v1.schemas.campaign import CampaignsIn, CampaignUpdate, CampaignCreateResponse
+from app.api.v1.schemas.measurement import ExportFormat
 from app.api.v1.schemas.user import User
 from app.db.models.campaign import Campaign
 from app.api.dependencies.auth import get_current_user
@@ -430,4 +431,89 @@ class TestCampaignUpdateIntegration:
             call_args = mock_update.call_args
             assert call_args[0][0] == campaign_id  # campaign_id parameter
             # The second parameter should be the CampaignsIn object
-            assert hasattr(call_args[0][1], 'name')  # Should have campaign attributes
\ No newline at end of file
+            assert hasattr(call_args[0][1], 'name')  # Should have campaign attributes
+
+class TestCampaignExportRoute:
+    """Tests for GET /campaigns/{campaign_id}/measurements/export"""
+
+    def test_export_csv(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=True), \
+             patch('app.services.export_service.ExportService.export_campaign_measurements_csv') as mock_export:
+            mock_export.return_value = iter(["station_id,collectiontime,Lat_deg,Lon_deg\n"])
+
+            response = client_with_auth.get("/api/v1/campaigns/3/measurements/export?start_date=2024-01-01T00:00:00")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/csv")
+            assert response.text == "station_id,collectiontime,Lat_deg,Lon_deg\n"
+            mock_export.assert_called_once_with(3, datetime(2024, 1, 1), None)
+
+    def test_export_csv_gzip(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=True), \
+             patch('app.services.export_service.ExportService.export_campaign_measurements_csv') as mock_export:
+            mock_export.return_value = iter(["station_id,collectiontime,Lat_deg,Lon_deg\n", '"1","2024-01-01T00:00:00","",""\n'])
+
+            response = client_with_auth.get(
+                "/api/v1/campaigns/3/measurements/export", headers={"Accept-Encoding": "gzip"}
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["vary"] == "Accept-Encoding"
+            # Decoded by the client
+            assert response.text == 'station_id,collectiontime,Lat_deg,Lon_deg\n"1","2024-01-01T00:00:00","",""\n'
+
+    def test_export_csv_identity(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=True), \
+             patch('app.services.export_service.ExportService.export_campaign_measurements_csv') as mock_export:
+            mock_export.return_value = iter(["station_id,collectiontime,Lat_deg,Lon_deg\n"])
+
+            response = client_with_auth.get(
+                "/api/v1/campaigns/3/measurements/export", headers={"Accept-Encoding": "identity"}
+            )
+
+            assert response.status_code == 200
+            assert "content-encoding" not in response.headers
+            assert response.text == "station_id,collectiontime,Lat_deg,Lon_deg\n"
+
+    def test_export_zip(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=True), \
+             patch('app.services.export_service.ExportService.export_campaign_measurements_zip') as mock_export:
+            mock_export.return_value = iter([b"PK"])
+
+            response = client_with_auth.get("/api/v1/campaigns/3/measurements/export?format=zip")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/zip"
+            assert 'filename="campaign-3.zip"' in response.headers["content-disposition"]
+
+    def test_export_arrow(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=True), \
+             patch('app.services.export_service.ExportService.export_campaign_measurements_arrow') as mock_export:
+            mock_export.return_value = iter([b"\xff\xff\xff\xff"])
+
+            response = client_with_auth.get("/api/v1/campaigns/3/measurements/export?format=arrow")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+            assert 'filename="measurements-campaign-3.arrows"' in response.headers["content-disposition"]
+            mock_export.assert_called_once_with(3, ExportFormat.ARROW, None, None)
+
+    def test_export_campaign_not_found(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.campaign_repository.CampaignRepository.campaign_exists', return_value=False):
+            response = client_with_auth.get("/api/v1/campaigns/999/measurements/export")
+
+            assert response.status_code == 404
+            assert response.json()["detail"] == "Campaign not found"
+
+    def test_export_permission_denied(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.root.check_allocation_permission', return_value=False):
+            response = client_with_auth.get("/api/v1/campaigns/3/measurements/export")
+
+            assert response.status_code == 403
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app.api.v1.schemas.station import StationCreate, StationUpdate, StationCreateResponse, GetStationResponse, StationItemWithSummary
+from app.api.v1.schemas.measurement import ExportFormat
 from app.api.v1.schemas.user import User
 from app.api.dependencies.auth import get_current_user
 from app.db.session import get_db
@@ -275,4 +276,41 @@ class TestCampaignStationRoutes:
         del payload_missing_field["name"] # 'name' is required by StationCreate
         with patch('app.api.v1.routes.campaigns.campaign_stations.check_allocation_permission', return_value=True):
             response = client_with_auth.post(f"/api/v1/campaigns/{self.campaign_id}/stations", json=payload_missing_field)
-            assert response.status_code == 422
\ No newline at end of file
+            assert response.status_code == 422
+    def test_export_measurements_parquet(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_stations.check_allocation_permission', return_value=True), \
+             patch('app.services.station_service.StationService.get_station', return_value=Mock()), \
+             patch('app.services.export_service.ExportService.export_measurements_arrow') as mock_export:
+            mock_export.return_value = iter([b"PAR1", b"PAR1"])
+
+            response = client_with_auth.get(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/measurements/export?format=parquet"
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/vnd.apache.parquet"
+            assert f'filename="measurements-{self.station_id}.parquet"' in response.headers["content-disposition"]
+            assert response.content == b"PAR1PAR1"
+            mock_export.assert_called_once_with(self.station_id, ExportFormat.PARQUET, None, None)
+
+    def test_export_measurements_csv_gzip(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_stations.check_allocation_permission', return_value=True), \
+             patch('app.services.station_service.StationService.get_station', return_value=Mock()), \
+             patch('app.services.export_service.ExportService.export_measurements_csv') as mock_export:
+            mock_export.return_value = iter(["collectiontime,Lat_deg,Lon_deg\n"])
+
+            response = client_with_auth.get(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/measurements/export",
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.text == "collectiontime,Lat_deg,Lon_deg\n"
+
+    def test_export_measurements_zip_is_campaign_only(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_stations.check_allocation_permission', return_value=True):
+            response = client_with_auth.get(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/measurements/export?format=zip"
+            )
+            assert response.status_code == 422
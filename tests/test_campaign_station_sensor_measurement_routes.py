@@ -80,6 +80,7 @@ def mock_measurement_repo(
         sensor_id: int, page: int, limit: int, start_date: Any, end_date: Any,
         min_value: Any, max_value: Any, # variable_name is not a param in route
         # downsample_threshold is handled by service, repo just returns data
+        after: Any = None,
     ) -> Tuple[List[Tuple[MeasurementModel, str]], int, float | None, float | None, float | None]:
         # Simulate filtering and pagination based on inputs if needed for more complex tests
         # For now, return sample data
@@ -88,6 +89,7 @@ def mock_measurement_repo(
 
     repository.list_measurements.side_effect = list_measurements_mock
     repository.get_measurements_with_confidence_intervals.return_value = sample_aggregated_measurements_data
+    repository.get_measurement_rollups.return_value = []
 
     # For PUT/PATCH
     def update_measurement_mock(measurement_id: int, request: Any, partial: bool = False) -> MeasurementModel | None:
@@ -154,6 +156,85 @@ def test_get_sensor_measurements_success(
     mock_check_alloc.assert_called_once() # Simplified check
     mock_measurement_repo.list_measurements.assert_called_once()
 
+@patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.MeasurementRepository')
+@patch('app.core.config.get_settings')
+@patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.check_allocation_permission', return_value=True)
+def test_get_sensor_measurements_with_cursor(
+    mock_check_alloc: MagicMock,
+    mock_get_settings: MagicMock,
+    mock_repo_class: MagicMock,
+    client: TestClient,
+    auth_headers: Dict[str, str],
+    mock_measurement_repo: MagicMock,
+    sample_measurement_model_data: List[Tuple[MeasurementModel, str]]
+):
+    mock_repo_class.return_value = mock_measurement_repo
+    mock_settings = MagicMock()
+    mock_settings.JWT_SECRET = TEST_JWT_SECRET
+    mock_settings.ALG = TEST_JWT_ALGORITHM
+    mock_get_settings.return_value = mock_settings
+
+    # A full first page hands out a cursor pointing at its last row
+    response = client.get(
+        f"/api/v1/campaigns/{CAMPAIGN_ID}/stations/{STATION_ID}/sensors/{SENSOR_ID}/measurements?limit=1",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    next_cursor = response.json()["next_cursor"]
+    assert next_cursor is not None
+
+    response = client.get(
+        f"/api/v1/campaigns/{CAMPAIGN_ID}/stations/{STATION_ID}/sensors/{SENSOR_ID}/measurements?limit=1&cursor={next_cursor}",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    first = sample_measurement_model_data[0][0]
+    assert mock_measurement_repo.list_measurements.call_args.kwargs["after"] == (first.collectiontime, first.measurementid)
+
+@patch('app.core.config.get_settings')
+@patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.check_allocation_permission', return_value=True)
+def test_get_sensor_measurements_invalid_cursor(
+    mock_check_alloc: MagicMock,
+    mock_get_settings: MagicMock,
+    client: TestClient,
+    auth_headers: Dict[str, str]
+):
+    mock_settings = MagicMock()
+    mock_settings.JWT_SECRET = TEST_JWT_SECRET
+    mock_settings.ALG = TEST_JWT_ALGORITHM
+    mock_get_settings.return_value = mock_settings
+
+    response = client.get(
+        f"/api/v1/campaigns/{CAMPAIGN_ID}/stations/{STATION_ID}/sensors/{SENSOR_ID}/measurements?cursor=not-a-cursor",
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+@patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.MeasurementRepository')
+@patch('app.core.config.get_settings')
+@patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.check_allocation_permission', return_value=True)
+def test_get_sensor_measurements_internal_value_error_is_not_a_cursor_error(
+    mock_check_alloc: MagicMock,
+    mock_get_settings: MagicMock,
+    mock_repo_class: MagicMock,
+    client: TestClient,
+    auth_headers: Dict[str, str],
+    mock_measurement_repo: MagicMock
+):
+    """Only a malformed cursor is the client's fault"""
+    mock_repo_class.return_value = mock_measurement_repo
+    mock_measurement_repo.list_measurements.side_effect = ValueError("bad bucket")
+    mock_settings = MagicMock()
+    mock_settings.JWT_SECRET = TEST_JWT_SECRET
+    mock_settings.ALG = TEST_JWT_ALGORITHM
+    mock_get_settings.return_value = mock_settings
+
+    with pytest.raises(ValueError, match="bad bucket"):
+        client.get(
+            f"/api/v1/campaigns/{CAMPAIGN_ID}/stations/{STATION_ID}/sensors/{SENSOR_ID}/measurements",
+            headers=auth_headers
+        )
+
 @patch('app.core.config.get_settings')
 @patch('app.api.v1.routes.campaigns.campaign_station_sensor_measurements.check_allocation_permission', return_value=False)
 def test_get_sensor_measurements_allocation_denied(
@@ -270,4 +270,34 @@ class TestCampaignStationSensorRoutes:
                 f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/sensors/{self.sensor_id}",
                 json={"postprocess": "not-a-boolean"}
             )
-            assert response.status_code == 422
\ No newline at end of file
+            assert response.status_code == 422
+    # POST /campaigns/{campaign_id}/stations/{station_id}/sensors/statistics
+    def test_force_update_station_statistics_single_statement(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_station_sensors.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.sensor_repository.SensorRepository.refresh_sensor_statistics_bulk', return_value=[1, 2, 3]) as mock_bulk:
+            response = client_with_auth.post(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/sensors/statistics"
+            )
+            assert response.status_code == 200
+            assert response.json() == {"updated_sensor_ids": [1, 2, 3], "total_updated": 3}
+            mock_bulk.assert_called_once_with(station_id=self.station_id, campaign_id=None)
+
+    def test_force_update_station_statistics_failure_reports_none(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_station_sensors.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.sensor_repository.SensorRepository.refresh_sensor_statistics_bulk', side_effect=Exception("boom")):
+            response = client_with_auth.post(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/{self.station_id}/sensors/statistics"
+            )
+            assert response.status_code == 200
+            assert response.json() == {"updated_sensor_ids": [], "total_updated": 0}
+
+    # POST /campaigns/{campaign_id}/stations/sensors/statistics
+    def test_force_update_campaign_statistics(self, client_with_auth):
+        with patch('app.api.v1.routes.campaigns.campaign_stations.check_allocation_permission', return_value=True), \
+             patch('app.db.repositories.sensor_repository.SensorRepository.refresh_sensor_statistics_bulk', return_value=[4, 5]) as mock_bulk:
+            response = client_with_auth.post(
+                f"/api/v1/campaigns/{self.campaign_id}/stations/sensors/statistics"
+            )
+            assert response.status_code == 200
+            assert response.json()["total_updated"] == 2
+            mock_bulk.assert_called_once_with(station_id=None, campaign_id=self.campaign_id)
@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+import io
+from types import SimpleNamespace
+from unittest.mock import Mock
+import zipfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.api.v1.schemas.measurement import ExportFormat
+
+from app.db.repositories.measurement_repository import MeasurementRepository
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.station_repository import StationRepository
+from app.services import export_service as export_module
+from app.services.export_service import ExportService
+
+
+def pivot_row(station_id: int, second: int, *values: float | None) -> tuple:
+    return (station_id, datetime(2024, 1, 1) + timedelta(seconds=second), 30.1, -97.5, *values)
+
+
+@pytest.fixture
+def export_service() -> ExportService:
+    return ExportService(
+        Mock(spec=SensorRepository), Mock(spec=MeasurementRepository), Mock(spec=StationRepository)
+    )
+
+
+def test_campaign_csv_has_one_column_per_campaign_alias(export_service: ExportService) -> None:
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_campaign.return_value = ["RH", "TEMP"]
+    measurement_repository.get_measurements_pivot_rows_by_campaign_chunked.return_value = iter([
+        [pivot_row(1, 0, 80.0, None)],
+        [pivot_row(2, 0, None, 20.5)],
+    ])
+
+    blocks = list(export_service.export_campaign_measurements_csv(3))
+
+    assert blocks == [
+        "station_id,collectiontime,Lat_deg,Lon_deg,RH,TEMP\n"
+        '"1","2024-01-01T00:00:00","30.1","-97.5","80.0",""\n'
+        '"2","2024-01-01T00:00:00","30.1","-97.5","","20.5"\n'
+    ]
+    measurement_repository.get_measurements_pivot_rows_by_campaign_chunked.assert_called_once_with(
+        3, ["RH", "TEMP"], chunk_size=export_module.CSV_CHUNK_ROWS, start_date=None, end_date=None
+    )
+
+
+def test_station_csv_is_written_in_blocks_of_whole_rows(export_service: ExportService, monkeypatch) -> None:
+    monkeypatch.setattr(export_module, "CSV_BLOCK_CHARS", 100)
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_station.return_value = ["TEMP"]
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.return_value = iter([
+        [pivot_row(5, second, second / 7) for second in range(3)],
+        [pivot_row(5, 3, None), (5, None, None, None, 'say "hi"')],
+    ])
+
+    blocks = list(export_service.export_measurements_csv(5))
+
+    assert len(blocks) == 2 and all(block.endswith("\n") for block in blocks)
+    assert "".join(blocks).splitlines() == [
+        "collectiontime,Lat_deg,Lon_deg,TEMP",
+        '"2024-01-01T00:00:00","30.1","-97.5","0.0"',
+        '"2024-01-01T00:00:01","30.1","-97.5","0.14285714285714285"',
+        '"2024-01-01T00:00:02","30.1","-97.5","0.2857142857142857"',
+        '"2024-01-01T00:00:03","30.1","-97.5",""',
+        '"","","","say ""hi"""',
+    ]
+
+
+def test_station_csv_keeps_the_rows_read_before_an_error(export_service: ExportService) -> None:
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_station.return_value = ["TEMP"]
+
+    def row_chunks():  # type: ignore[no-untyped-def]
+        yield [pivot_row(5, 0, 1.5)]
+        raise RuntimeError("connection lost")
+
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.return_value = row_chunks()
+
+    assert "".join(export_service.export_measurements_csv(5)).splitlines() == [
+        "collectiontime,Lat_deg,Lon_deg,TEMP",
+        '"2024-01-01T00:00:00","30.1","-97.5","1.5"',
+        "# Error during export: connection lost",
+    ]
+
+
+def test_campaign_zip_streams_the_station_exports(export_service: ExportService, monkeypatch) -> None:
+    monkeypatch.setattr(export_module, "ZIP_FLUSH_BYTES", 1024)
+    export_service.station_repository.get_station_ids_by_campaign_id.return_value = [1, 2]
+    export_service.sensor_repository.get_sensors_by_station_chunked.side_effect = lambda station_id, chunk_size: iter([
+        [SimpleNamespace(alias=f"TEMP{station_id}", variablename="Temperature", units="C", description=None)]
+    ])
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_station.side_effect = lambda station_id: [f"TEMP{station_id}"]
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.side_effect = (
+        lambda station_id, sensor_aliases, chunk_size, start_date, end_date: iter([
+            [pivot_row(station_id, second, second / 7) for second in range(5000)]
+        ])
+    )
+
+    pieces = list(export_service.export_campaign_measurements_zip(3))
+
+    # Handed out as it is compressed rather than built whole
+    assert len(pieces) > 2
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.namelist() == ["sensors-1.csv", "measurements-1.csv", "sensors-2.csv", "measurements-2.csv"]
+    assert archive.read("sensors-2.csv").decode() == 'alias,variablename,units,description\n"TEMP2","Temperature","C",""\n'
+    measurements = archive.read("measurements-1.csv").decode().splitlines()
+    assert measurements[0] == "collectiontime,Lat_deg,Lon_deg,TEMP1"
+    assert len(measurements) == 5001
+    assert measurements[50] == '"2024-01-01T00:00:49","30.1","-97.5","7.0"'
+
+
+def test_station_parquet_writes_a_row_group_per_cursor_partition(export_service: ExportService) -> None:
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_station.return_value = ["RH", "TEMP"]
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.return_value = iter([
+        [(5, datetime(2024, 1, 1), 30.1, -97.5, 80.0, None), (5, datetime(2024, 1, 1, 0, 1), 30.1, -97.5, 81.5, 0.1)],
+        [(5, datetime(2024, 1, 1, 0, 2), None, None, None, 20.5)],
+    ])
+
+    pieces = list(export_service.export_measurements_arrow(5, ExportFormat.PARQUET, end_date=datetime(2024, 2, 1)))
+
+    # One piece per row group, then the footer
+    assert len(pieces) == 3 and all(pieces)
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(pieces)))
+    assert parquet_file.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.schema.names == ["collectiontime", "Lat_deg", "Lon_deg", "RH", "TEMP"]
+    assert table.schema.field("collectiontime").type == pa.timestamp("us")
+    assert table.schema.field("TEMP").type == pa.float64()
+    assert table.column("RH").to_pylist() == [80.0, 81.5, None]
+    assert table.column("TEMP").to_pylist() == [None, 0.1, 20.5]
+    assert table.column("collectiontime").to_pylist()[2] == datetime(2024, 1, 1, 0, 2)
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.assert_called_once_with(
+        5, ["RH", "TEMP"], chunk_size=export_module.ARROW_BATCH_ROWS, start_date=None, end_date=datetime(2024, 2, 1)
+    )
+
+
+def test_campaign_arrow_stream_leads_with_station_id(export_service: ExportService) -> None:
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_campaign.return_value = ["TEMP"]
+    measurement_repository.get_measurements_pivot_rows_by_campaign_chunked.return_value = iter([
+        [(1, datetime(2024, 1, 1), 30.1, -97.5, 20.5)],
+        [(2, datetime(2024, 1, 1), 30.2, -97.6, None)],
+    ])
+
+    pieces = list(export_service.export_campaign_measurements_arrow(3, ExportFormat.ARROW))
+
+    reader = pa.ipc.open_stream(b"".join(pieces))
+    assert reader.schema.field("station_id").type == pa.int32()
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [1, 1]
+    assert pa.Table.from_batches(batches).to_pydict() == {
+        "station_id": [1, 2],
+        "collectiontime": [datetime(2024, 1, 1), datetime(2024, 1, 1)],
+        "Lat_deg": [30.1, 30.2],
+        "Lon_deg": [-97.5, -97.6],
+        "TEMP": [20.5, None],
+    }
+
+
+def test_empty_parquet_export_still_has_the_columns(export_service: ExportService) -> None:
+    measurement_repository = export_service.measurement_repository
+    measurement_repository.get_unique_sensor_aliases_for_station.return_value = ["TEMP"]
+    measurement_repository.get_measurements_pivot_rows_by_station_chunked.return_value = iter([])
+
+    table = pq.read_table(io.BytesIO(b"".join(export_service.export_measurements_arrow(5, ExportFormat.PARQUET))))
+
+    assert table.num_rows == 0
+    assert table.schema.names == ["collectiontime", "Lat_deg", "Lon_deg", "TEMP"]
@@ -0,0 +1,32 @@
+import gzip
+
+from app.utils.gzip_stream import accepts_gzip, csv_streaming_response, gzip_stream
+
+
+def test_accepts_gzip() -> None:
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("deflate;q=1.0, GZIP;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip(None)
+    assert not accepts_gzip("deflate, br")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip;q=0, *")
+    assert not accepts_gzip("*;q=0")
+
+
+def test_gzip_stream_round_trips() -> None:
+    blocks = [f'"{i}","{i / 7}"\n' * 1000 for i in range(50)]
+
+    pieces = list(gzip_stream(iter(blocks)))
+
+    assert gzip.decompress(b"".join(pieces)).decode() == "".join(blocks)
+
+
+def test_csv_streaming_response_headers() -> None:
+    plain = csv_streaming_response(iter(["a\n"]), "measurements-5.csv", "deflate")
+    compressed = csv_streaming_response(iter(["a\n"]), "measurements-5.csv", "gzip")
+
+    assert plain.headers["content-disposition"] == 'attachment; filename="measurements-5.csv"'
+    assert plain.headers["vary"] == compressed.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
@@ -0,0 +1,24 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from app.db.models.job import Job
+from app.db.repositories.job_repository import JobRepository
+
+
+def test_requeue_stale_fails_jobs_out_of_attempts(mock_db_session: MagicMock) -> None:
+    failed_query, requeued_query = MagicMock(), MagicMock()
+    failed_query.filter.return_value.update.return_value = 1
+    requeued_query.filter.return_value.update.return_value = 2
+    mock_db_session.query.side_effect = [failed_query, requeued_query]
+
+    assert JobRepository(mock_db_session).requeue_stale(timedelta(minutes=10), max_attempts=3) == 2
+
+    # Jobs that used their last attempt fail first, the remaining stale jobs are queued again
+    failed_filters = failed_query.filter.call_args.args
+    assert str(failed_filters[-1]) == str(Job.attempts >= 3)
+    (failed_values,), _ = failed_query.filter.return_value.update.call_args
+    assert failed_values[Job.status] == "failed" and failed_values[Job.error]
+    (requeued_values,), _ = requeued_query.filter.return_value.update.call_args
+    assert requeued_values == {Job.status: "queued"}
+    assert requeued_query.filter.call_args.args == failed_filters[:-1]
+    mock_db_session.commit.assert_called_once()
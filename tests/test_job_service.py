@@ -0,0 +1,185 @@
+import io
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.db.models.job import Job
+from app.db.models.upload_file_event import UploadFileEvent
+from app.db.repositories.job_repository import JobRepository
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services import job_service as job_module
+from app.services.job_service import JobService
+
+
+def create_job(kind: str, status: str = "running", attempts: int = 1) -> Job:
+    return Job(
+        id=1, kind=kind, payload={"station_id": 5}, status=status, attempts=attempts,
+        created_at=datetime(2024, 1, 1),
+    )
+
+
+@pytest.fixture
+def job_service() -> JobService:
+    return JobService(Mock(spec=JobRepository, db=Mock()), Mock(spec=UploadFileEventRepository))
+
+
+def test_enqueue_upload_refresh_serializes_spans(job_service: JobService) -> None:
+    job_service.enqueue_upload_refresh(
+        upload_event_id=7, station_id=5, campaign_id=2,
+        sensor_spans={11: (datetime(2024, 1, 1), datetime(2024, 1, 2))},
+    )
+
+    stats_call, geometry_call = job_service.job_repository.enqueue.call_args_list
+    assert stats_call.args == (
+        "upload_statistics",
+        {"upload_event_id": 7, "sensor_spans": {"11": ["2024-01-01T00:00:00", "2024-01-02T00:00:00"]}},
+    )
+    assert geometry_call.args == ("station_geometry", {"station_id": 5, "campaign_id": 2})
+    assert stats_call.kwargs == geometry_call.kwargs == {"upload_event_id": 7}
+
+
+def test_get_upload_campaign_id_from_job_payload(job_service: JobService) -> None:
+    statistics = create_job("upload_statistics")
+    statistics.payload = {"upload_event_id": 7, "sensor_spans": {}}
+    geometry = create_job("station_geometry")
+    geometry.payload = {"station_id": 5, "campaign_id": 2}
+    job_service.job_repository.list_jobs_for_upload.return_value = [statistics, geometry]
+
+    assert job_service.get_upload_campaign_id(7) == 2
+    job_service.job_repository.list_jobs_for_upload.return_value = []
+    assert job_service.get_upload_campaign_id(8) is None
+
+
+def test_run_next_empty_queue(job_service: JobService) -> None:
+    job_service.job_repository.claim_next.return_value = None
+    assert job_service.run_next() is False
+
+
+def test_run_next_success(job_service: JobService) -> None:
+    job = create_job("station_geometry")
+    job_service.job_repository.claim_next.return_value = job
+    handler = Mock()
+
+    with patch.dict(job_module.JOB_HANDLERS, {"station_geometry": handler}):
+        assert job_service.run_next() is True
+
+    db, payload, heartbeat = handler.call_args.args
+    assert db is job_service.job_repository.db and payload == {"station_id": 5}
+    heartbeat()
+    job_service.job_repository.heartbeat.assert_called_once_with(1)
+    job_service.job_repository.mark_succeeded.assert_called_once_with(job)
+
+
+@pytest.mark.parametrize("attempts, retry", [(1, True), (3, False)])
+def test_run_next_failure_retries_until_max_attempts(
+    job_service: JobService, attempts: int, retry: bool
+) -> None:
+    job = create_job("station_geometry", attempts=attempts)
+    job_service.job_repository.claim_next.return_value = job
+
+    with patch.dict(job_module.JOB_HANDLERS, {"station_geometry": Mock(side_effect=RuntimeError("boom"))}):
+        job_service.run_next()
+
+    job_service.job_repository.db.rollback.assert_called_once()
+    job_service.job_repository.mark_failed.assert_called_once_with(job, "boom", retry=retry)
+
+
+def test_get_upload_jobs_status(job_service: JobService) -> None:
+    job_service.job_repository.list_jobs_for_upload.return_value = [
+        create_job("upload_statistics", status="succeeded"),
+        create_job("station_geometry", status="queued"),
+    ]
+
+    response = job_service.get_upload_jobs(7)
+
+    assert response is not None
+    assert response.status == "running"
+    assert [job.kind for job in response.jobs] == ["upload_statistics", "station_geometry"]
+
+
+def test_get_upload_jobs_unknown_upload(job_service: JobService) -> None:
+    job_service.upload_file_event_repository.get_upload_event.return_value = None
+    assert job_service.get_upload_jobs(7) is None
+
+
+def test_get_upload_status_reports_throughput(job_service: JobService) -> None:
+    job_service.upload_file_event_repository.get_upload_event.return_value = UploadFileEvent(
+        id=7, rows_parsed=1000, rows_inserted=990, rows_rejected=10,
+        processing_started_at=datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+        processing_finished_at=datetime(2024, 1, 1, 0, 0, 4, tzinfo=timezone.utc),
+        errors=["bad column"],
+    )
+    job_service.job_repository.list_jobs_for_upload.return_value = [
+        create_job("process_upload", status="succeeded"),
+    ]
+
+    response = job_service.get_upload_status(7)
+
+    assert response is not None
+    assert response.status == "succeeded"
+    assert (response.rows_parsed, response.rows_inserted, response.rows_rejected) == (1000, 990, 10)
+    assert response.elapsed_seconds == 4.0
+    assert response.rows_per_second == 250.0
+    assert response.errors == ["bad column"]
+
+
+def test_get_upload_status_not_started(job_service: JobService) -> None:
+    job_service.upload_file_event_repository.get_upload_event.return_value = UploadFileEvent(
+        id=7, rows_parsed=0, rows_inserted=0, rows_rejected=0,
+    )
+    job_service.job_repository.list_jobs_for_upload.return_value = [create_job("process_upload", status="queued")]
+
+    response = job_service.get_upload_status(7)
+
+    assert response is not None
+    assert response.status == "queued"
+    assert response.elapsed_seconds is None and response.rows_per_second is None
+
+
+def test_enqueue_upload_processing_saves_files(job_service: JobService, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(job_module, "upload_dir", lambda upload_event_id: tmp_path / str(upload_event_id))
+    job_service.job_repository.list_jobs_for_upload.return_value = []
+
+    job_service.enqueue_upload_processing(7, 5, 2, io.BytesIO(b"alias\nA\n"), io.BytesIO(b"collectiontime\n"))
+
+    assert (tmp_path / "7" / "sensors.csv").read_bytes() == b"alias\nA\n"
+    assert (tmp_path / "7" / "measurements.csv").read_bytes() == b"collectiontime\n"
+    job_service.job_repository.enqueue.assert_called_once_with(
+        "process_upload", {"upload_event_id": 7, "station_id": 5, "campaign_id": 2}, upload_event_id=7
+    )
+
+
+def test_enqueue_upload_ingest_reuses_pending_job(job_service: JobService) -> None:
+    pending = create_job("process_upload", status="queued")
+    job_service.job_repository.list_jobs_for_upload.return_value = [pending]
+
+    assert job_service.enqueue_upload_ingest(7, 5, 2) is pending
+    job_service.job_repository.enqueue.assert_not_called()
+
+
+def test_process_upload_resumes_after_watermark(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(job_module, "upload_dir", lambda upload_event_id: tmp_path)
+    (tmp_path / "sensors.csv").write_bytes(b"alias\nTEMP\n")
+    (tmp_path / "measurements.csv").write_bytes(b"collectiontime\n")
+    repository = Mock(spec=UploadFileEventRepository)
+    repository.get_upload_event.return_value = UploadFileEvent(
+        id=7, rows_parsed=100, rows_inserted=90, rows_committed=40,
+    )
+    monkeypatch.setattr(job_module, "UploadFileEventRepository", lambda db: repository)
+    monkeypatch.setattr(job_module, "process_sensors_file", Mock(return_value={"TEMP": 1}))
+    process_measurements_file = Mock(return_value=(0, [], {}))
+    monkeypatch.setattr(job_module, "process_measurements_file", process_measurements_file)
+    monkeypatch.setattr(JobService, "enqueue_upload_refresh", Mock())
+
+    heartbeat = Mock()
+    job_module.process_upload(Mock(), {"upload_event_id": 7, "station_id": 5, "campaign_id": 2}, heartbeat)
+
+    repository.resume_processing.assert_called_once_with(7)
+    repository.start_processing.assert_not_called()
+    kwargs = process_measurements_file.call_args.kwargs
+    assert kwargs["skip_rows"] == 40
+    assert "on_progress" not in kwargs
+    kwargs["on_checkpoint"](60, 10, 8)
+    repository.commit_rows.assert_called_once_with(7, 60, 110, 98)
+    heartbeat.assert_called_once_with()
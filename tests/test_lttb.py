@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.api.v1.schemas.measurement import MeasurementItem
+from app.utils.lttb import StreamingLTTB, lttb, lttb_indices
+
+
+def test_lttb_indices_keeps_endpoints_and_threshold() -> None:
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50.0)
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_indices_picks_spike() -> None:
+    x = np.arange(100, dtype=np.float64)
+    y = np.zeros(100)
+    y[42] = 50.0
+
+    indices = lttb_indices(x, y, 10)
+
+    assert 42 in indices
+
+
+def test_lttb_indices_below_threshold_returns_all() -> None:
+    x = np.arange(5, dtype=np.float64)
+    assert list(lttb_indices(x, x, 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb_indices(x, x, 2)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_on_measurement_items() -> None:
+    base_time = datetime(2024, 1, 1)
+    data = [
+        MeasurementItem(
+            id=i,
+            value=float(i % 7),
+            collectiontime=base_time + timedelta(minutes=i),
+            geometry={"type": "Point", "coordinates": [10.0, 20.0]},
+        )
+        for i in range(50)
+    ]
+
+    sampled = lttb(data, 10)
+
+    assert len(sampled) == 10
+    assert sampled[0] is data[0]
+    assert sampled[-1] is data[-1]
+
+
+def test_streaming_lttb_matches_batch() -> None:
+    rng = np.random.default_rng(0)
+    n = 5000
+    x = np.arange(n, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=n))
+    ids = np.arange(n, dtype=np.int64) + 100
+
+    reducer = StreamingLTTB(n, 200)
+    for start in range(0, n, 333):
+        reducer.push(ids[start:start + 333], x[start:start + 333], y[start:start + 333])
+
+    assert reducer.finish() == [int(i) for i in ids[lttb_indices(x, y, 200)]]
+
+
+def test_streaming_lttb_short_stream() -> None:
+    """Fewer rows than announced still yields time-ordered unique ids"""
+    x = np.arange(600, dtype=np.float64)
+    reducer = StreamingLTTB(1000, 50)
+    reducer.push(np.arange(600, dtype=np.int64), x, np.sin(x))
+
+    selected = reducer.finish()
+
+    assert selected == sorted(set(selected))
+    assert len(selected) <= 50
+
+
+@pytest.mark.parametrize("announced", [999, 1001])
+def test_streaming_lttb_count_off_by_one(announced: int) -> None:
+    """A count that drifted from the streamed rows still yields exactly threshold points"""
+    x = np.arange(1000, dtype=np.float64)
+    reducer = StreamingLTTB(announced, 50)
+    for start in range(0, 1000, 300):
+        reducer.push(np.arange(start, min(start + 300, 1000), dtype=np.int64), x[start:start + 300], np.sin(x[start:start + 300]))
+
+    selected = reducer.finish()
+
+    assert selected == sorted(set(selected))
+    assert len(selected) == 50
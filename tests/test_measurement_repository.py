@@ -0,0 +1,200 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+# Registers every mapper Measurement's relationships refer to
+import app.main  # noqa: F401
+from app.db.repositories.measurement_repository import MeasurementRepository
+
+
+def create_page_query() -> MagicMock:
+    page_query = MagicMock()
+    page_query.filter.return_value = page_query
+    page_query.order_by.return_value = page_query
+    page_query.offset.return_value = page_query
+    page_query.limit.return_value = page_query
+    page_query.all.return_value = []
+    return page_query
+
+
+@pytest.fixture
+def measurement_repository(mock_db_session: MagicMock) -> MeasurementRepository:
+    return MeasurementRepository(mock_db_session)
+
+
+def test_list_measurements_stats_in_single_query(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """Count, min, max and avg come back from one aggregate statement"""
+    page_query = create_page_query()
+
+    stats_query = MagicMock()
+    stats_query.filter.return_value = stats_query
+    stats_query.one.return_value = (42, 1.0, 9.0, 5.0)
+
+    mock_db_session.query.side_effect = [page_query, stats_query]
+
+    rows, total, min_value, max_value, avg_value = (
+        measurement_repository.list_measurements(
+            sensor_id=1, start_date=datetime(2024, 1, 1), page=2, limit=10
+        )
+    )
+
+    assert rows == []
+    assert (total, min_value, max_value, avg_value) == (42, 1.0, 9.0, 5.0)
+    assert mock_db_session.query.call_count == 2
+    stats_query.one.assert_called_once()
+    page_query.offset.assert_called_once_with(10)
+
+
+def test_list_measurements_unfiltered_uses_sensor_statistics(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """Only sensor_id set: stats come from a fresh sensor_statistics row"""
+    mock_db_session.query.return_value = create_page_query()
+    mock_db_session.execute.return_value.first.return_value = (
+        7,
+        Decimal("1.5"),
+        Decimal("3.5"),
+        Decimal("2"),
+    )
+
+    _, total, min_value, max_value, avg_value = (
+        measurement_repository.list_measurements(sensor_id=1)
+    )
+
+    assert (total, min_value, max_value, avg_value) == (7, 1.5, 3.5, 2.0)
+    assert mock_db_session.query.call_count == 1
+
+
+def test_list_measurements_unfiltered_falls_back_when_stale(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """No fresh sensor_statistics row: fall back to the live aggregate"""
+    stats_query = MagicMock()
+    stats_query.filter.return_value = stats_query
+    stats_query.one.return_value = (3, 1.0, 2.0, 1.5)
+    mock_db_session.query.side_effect = [create_page_query(), stats_query]
+    mock_db_session.execute.return_value.first.return_value = None
+
+    _, total, min_value, max_value, avg_value = (
+        measurement_repository.list_measurements(sensor_id=1)
+    )
+
+    assert (total, min_value, max_value, avg_value) == (3, 1.0, 2.0, 1.5)
+    stats_query.one.assert_called_once()
+
+
+def test_fresh_sensor_statistics_checks_count_sign_and_pending_uploads(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """The precomputed row is only used when it agrees with the live count and is fully merged"""
+    from sqlalchemy.dialects import postgresql
+
+    mock_db_session.execute.return_value.first.return_value = None
+
+    assert measurement_repository.get_fresh_sensor_statistics(4) is None
+
+    stmt = mock_db_session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "sensor_statistics.min_value > " in sql
+    assert "sum(measurement_rollups.count)" in sql
+    assert "NOT (EXISTS (SELECT jobs.id" in sql
+    assert "jobs.created_at > sensor_statistics.stats_last_updated" in sql
+
+
+def test_update_measurement_marks_sensor_statistics_stale(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    from types import SimpleNamespace
+
+    from app.api.v1.schemas.measurement import MeasurementUpdate
+
+    measurement = SimpleNamespace(measurementid=1, sensorid=4, collectiontime=datetime(2024, 1, 1), measurementvalue=1.0)
+    mock_db_session.query.return_value.filter.return_value.first.return_value = measurement
+
+    measurement_repository.update_measurement(1, MeasurementUpdate(measurementvalue=2.0), partial=True)
+
+    assert measurement.measurementvalue == 2.0
+    mark = mock_db_session.query.return_value.filter.return_value.update
+    mark.assert_called_once()
+    assert list(mark.call_args.args[0].values()) == [None]
+
+
+def test_get_bucket_extrema_ids_collects_unique_ids(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    from app.api.v1.schemas.measurement import DownsampleMethod
+
+    bounds = MagicMock()
+    bounds.one.return_value = (0.0, 100.0)
+    mock_db_session.execute.side_effect = [
+        bounds,
+        iter([(3.0, 1.0, 1.0, 5.0), (7.0, 9.0, 6.0, 9.0)]),
+    ]
+
+    ids = measurement_repository.get_bucket_extrema_ids(
+        DownsampleMethod.M4, buckets=2, sensor_id=1
+    )
+
+    assert ids == [1, 3, 5, 6, 7, 9]
+
+
+def test_get_bucket_extrema_ids_empty_range(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    from app.api.v1.schemas.measurement import DownsampleMethod
+
+    mock_db_session.execute.return_value.one.return_value = (None, None)
+
+    assert measurement_repository.get_bucket_extrema_ids(
+        DownsampleMethod.MINMAX, buckets=10, sensor_id=1
+    ) == []
+    assert mock_db_session.execute.call_count == 1
+
+
+def test_measurements_pivot_is_one_streamed_query(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """One GROUP BY with a filtered aggregate per alias, read in server-side cursor partitions"""
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = ["RH", "TEMP"]
+    mock_db_session.execute.return_value.partitions.return_value = iter([
+        [(5, datetime(2024, 1, 1), 30.1, -97.5, 80.0, 20.5)],
+        [(5, datetime(2024, 1, 1, 0, 1), 30.1, -97.5, None, 21.0)],
+    ])
+
+    chunks = list(measurement_repository.get_measurements_pivot_by_station_chunked(5, chunk_size=500))
+
+    assert [row["sensor_values"] for chunk in chunks for row in chunk] == [
+        {"RH": 80.0, "TEMP": 20.5},
+        {"RH": None, "TEMP": 21.0},
+    ]
+    assert chunks[0][0]["lat"] == 30.1 and chunks[0][0]["lon"] == -97.5
+    assert chunks[0][0]["station_id"] == 5
+    # The alias lookup and the pivot itself, whatever the number of rows
+    assert mock_db_session.execute.call_count == 2
+    pivot = mock_db_session.execute.call_args.args[0]
+    assert pivot.get_execution_options()["yield_per"] == 500
+    assert str(pivot).count("FILTER (WHERE sensors.alias =") == 2
+
+
+def test_measurements_by_station_stream_from_one_cursor(
+    measurement_repository: MeasurementRepository, mock_db_session: MagicMock
+) -> None:
+    """Chunks are partitions of one server-side cursor, not OFFSET pages"""
+    first, second, orphan = MagicMock(), MagicMock(), MagicMock()
+    mock_db_session.execute.return_value.partitions.return_value = iter([
+        [(first, "TEMP"), (orphan, None)],
+        [(orphan, None)],
+        [(second, "RH")],
+    ])
+
+    chunks = list(measurement_repository.get_measurements_by_station_chunked(5, chunk_size=2))
+
+    assert chunks == [[(first, "TEMP")], [(second, "RH")]]
+    mock_db_session.execute.assert_called_once()
+    stmt = mock_db_session.execute.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 2
+    assert "OFFSET" not in str(stmt)
@@ -120,9 +120,9 @@ def test_list_measurements_with_downsampling(measurement_service: MeasurementSer
     )
 
     # Act
-    with patch('app.services.measurement_service.lttb') as mock_lttb:
+    with patch('app.services.measurement_service.lttb_indices') as mock_lttb:
         # Mock the downsampling result to return exactly downsample_threshold items
-        mock_lttb.return_value = mock_measurements[:downsample_threshold]
+        mock_lttb.return_value = list(range(downsample_threshold))
 
         result = measurement_service.list_measurements(
             sensor_id=1,
@@ -149,13 +149,17 @@ def test_list_measurements_with_downsampling(measurement_service: MeasurementSer
     assert result.average_value == 20.0
 
     # Verify that lttb was called with the correct arguments
-    with patch('app.services.measurement_service.lttb') as mock_lttb:
+    with patch('app.services.measurement_service.lttb_indices') as mock_lttb:
+        mock_lttb.return_value = []
         measurement_service.list_measurements(
             sensor_id=1, start_date=None, end_date=None,
             min_value=None, max_value=None, page=1,
             limit=20, downsample_threshold=downsample_threshold
         )
         mock_lttb.assert_called_once()
+        times, values, threshold = mock_lttb.call_args.args
+        assert len(times) == len(values) == total_count
+        assert threshold == downsample_threshold
 
 def test_list_measurements_downsampling_pages_calculation(measurement_service: MeasurementService) -> None:
     """Test pages calculation with downsampling enabled"""
@@ -180,9 +184,9 @@ def test_list_measurements_downsampling_pages_calculation(measurement_service: M
     )
 
     # Act
-    with patch('app.services.measurement_service.lttb') as mock_lttb:
+    with patch('app.services.measurement_service.lttb_indices') as mock_lttb:
         # Mock downsampling to return a specific number of items
-        mock_lttb.return_value = mock_measurements[:downsampled_result_count]
+        mock_lttb.return_value = list(range(downsampled_result_count))
 
         result = measurement_service.list_measurements(
             sensor_id=1,
@@ -198,4 +202,141 @@ def test_list_measurements_downsampling_pages_calculation(measurement_service: M
     # Assert
     assert result.pages == downsampled_result_count // downsample_threshold + 1  # 40 // 30 + 1 = 2
     assert result.downsampled is True
-    assert result.downsampled_total == downsampled_result_count
\ No newline at end of file
+    assert result.downsampled_total == downsampled_result_count
+def test_list_measurements_full_range_downsampling(measurement_service: MeasurementService) -> None:
+    """Full-range mode streams the series and only fetches the selected rows"""
+    import numpy as np
+
+    n = 1000
+    repository = measurement_service.measurement_repository
+    # Two of the rows are not positive, so the series is longer than the total
+    repository.get_measurement_series_statistics.return_value = (n, n - 2, 1.0, 9.0, 5.0)
+    ids = np.arange(1, n + 1, dtype=np.int64)
+    times = np.arange(n, dtype=np.float64)
+    values = np.sin(times / 10.0)
+    repository.stream_measurement_series.return_value = iter(
+        [(ids[k:k + 100], times[k:k + 100], values[k:k + 100]) for k in range(0, n, 100)]
+    )
+
+    def get_by_ids(measurement_ids: list[int]) -> list[tuple[MockRow, str]]:
+        return [
+            (MockRow(i, 1.0, datetime(2024, 1, 1) + timedelta(seconds=i)), '{"type":"Point","coordinates":[10.0,20.0]}')
+            for i in measurement_ids
+        ]
+    repository.get_measurements_by_ids.side_effect = get_by_ids
+
+    result = measurement_service.list_measurements(
+        sensor_id=1, start_date=None, end_date=None, min_value=None, max_value=None,
+        page=1, limit=20, downsample_threshold=50, full_range=True
+    )
+
+    repository.list_measurements.assert_not_called()
+    repository.get_measurement_statistics.assert_not_called()
+    assert result.downsampled is True
+    assert result.downsampled_total == 50
+    assert len(result.items) == 50
+    assert result.total == n - 2
+    selected = repository.get_measurements_by_ids.call_args.args[0]
+    assert selected[0] == 1 and selected[-1] == n
+
+def test_list_measurements_m4_pushed_to_database(measurement_service: MeasurementService) -> None:
+    """m4 asks the repository for per-bucket extrema instead of streaming the series"""
+    from app.api.v1.schemas.measurement import DownsampleMethod
+
+    repository = measurement_service.measurement_repository
+    repository.get_measurement_statistics.return_value = (1000, 1.0, 9.0, 5.0)
+    repository.get_bucket_extrema_ids.return_value = [1, 2, 3, 4]
+    repository.get_measurements_by_ids.return_value = [
+        (MockRow(i, 1.0, datetime(2024, 1, 1) + timedelta(seconds=i)), '{"type":"Point","coordinates":[10.0,20.0]}')
+        for i in [1, 2, 3, 4]
+    ]
+
+    result = measurement_service.list_measurements(
+        sensor_id=1, start_date=None, end_date=None, min_value=None, max_value=None,
+        page=1, limit=20, downsample_threshold=100, downsample_method=DownsampleMethod.M4
+    )
+
+    repository.stream_measurement_series.assert_not_called()
+    assert repository.get_bucket_extrema_ids.call_args.kwargs["buckets"] == 25
+    assert repository.get_bucket_extrema_ids.call_args.kwargs["method"] == DownsampleMethod.M4
+    assert len(result.items) == 4
+    assert result.downsampled is True
+
+def test_confidence_intervals_served_from_rollups(measurement_service: MeasurementService) -> None:
+    """Day intervals without value filters merge the daily rollups"""
+    from app.db.models.measurement_rollup import MeasurementRollup
+
+    repository = measurement_service.measurement_repository
+    repository.get_measurement_rollups.return_value = [
+        MeasurementRollup(
+            sensorid=1, resolution="day", bucket_start=datetime(2024, 1, 1),
+            count=4, sum=10.0, sum_sq=30.0, min=1.0, max=4.0,
+            sketch={"p0": 1, "p18": 1, "p28": 1, "p35": 1},
+        )
+    ]
+    repository.has_measurement_at.return_value = False
+    repository.has_pending_rollup_refresh.return_value = False
+
+    result = measurement_service.get_measurements_with_confidence_intervals(
+        sensor_id=1, interval="day", interval_value=1,
+        start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 2),
+        min_value=None, max_value=None,
+    )
+
+    repository.get_measurement_rollups.assert_called_once_with(1, "day", datetime(2024, 1, 1), datetime(2024, 1, 2))
+    repository.has_measurement_at.assert_called_once_with(1, datetime(2024, 1, 2))
+    repository.get_measurements_with_confidence_intervals.assert_not_called()
+    assert len(result) == 1
+    assert result[0].point_count == 4
+    assert result[0].value == 2.5
+    assert result[0].min_value == 1.0 and result[0].max_value == 4.0
+
+def test_confidence_intervals_measurement_at_end_date_uses_raw_measurements(measurement_service: MeasurementService) -> None:
+    """end_date is inclusive, and the rollups stop before it"""
+    from app.db.models.measurement_rollup import MeasurementRollup
+
+    repository = measurement_service.measurement_repository
+    repository.get_measurement_rollups.return_value = [
+        MeasurementRollup(sensorid=1, resolution="day", bucket_start=datetime(2024, 1, 1),
+                          count=2, sum=3.0, sum_sq=5.0, min=1.0, max=2.0, sketch={})
+    ]
+    repository.has_measurement_at.return_value = True
+    repository.has_pending_rollup_refresh.return_value = False
+    repository.get_measurements_with_confidence_intervals.return_value = []
+
+    measurement_service.get_measurements_with_confidence_intervals(
+        sensor_id=1, interval="day", interval_value=1,
+        start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 2),
+        min_value=None, max_value=None,
+    )
+
+    repository.get_measurements_with_confidence_intervals.assert_called_once()
+    assert repository.get_measurements_with_confidence_intervals.call_args.kwargs["end_date"] == datetime(2024, 1, 2)
+
+def test_confidence_intervals_pending_upload_refresh_uses_raw_measurements(measurement_service: MeasurementService) -> None:
+    """An upload whose rollups are not rebuilt yet is only in the raw measurements"""
+    repository = measurement_service.measurement_repository
+    repository.has_pending_rollup_refresh.return_value = True
+    repository.get_measurements_with_confidence_intervals.return_value = []
+
+    measurement_service.get_measurements_with_confidence_intervals(
+        sensor_id=1, interval="day", interval_value=1,
+        start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 2),
+        min_value=None, max_value=None,
+    )
+
+    repository.has_pending_rollup_refresh.assert_called_once_with(1)
+    repository.get_measurement_rollups.assert_not_called()
+    repository.get_measurements_with_confidence_intervals.assert_called_once()
+
+def test_confidence_intervals_value_filter_uses_raw_measurements(measurement_service: MeasurementService) -> None:
+    repository = measurement_service.measurement_repository
+    repository.get_measurements_with_confidence_intervals.return_value = []
+
+    measurement_service.get_measurements_with_confidence_intervals(
+        sensor_id=1, interval="hour", interval_value=1,
+        start_date=None, end_date=None, min_value=0.0, max_value=None,
+    )
+
+    repository.get_measurement_rollups.assert_not_called()
+    repository.get_measurements_with_confidence_intervals.assert_called_once()
@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.db.models.upload_file_event import UploadFileEvent
+from app.db.repositories.sensor_repository import SensorRepository
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services.job_service import JobService
+from app.services.stream_service import MeasurementStreamService
+from app.utils import ndjson_ingest
+from app.utils.ndjson_ingest import MeasurementStream
+
+
+def make_stream(batch_rows: int = 100, flush_seconds: float = 60.0) -> MeasurementStream:
+    return MeasurementStream(
+        5, 7, Mock(), lambda aliases: {alias: i for i, alias in enumerate(aliases, 1) if alias != "NOPE"},
+        batch_rows, flush_seconds,
+    )
+
+
+def test_lines_split_across_pieces_are_joined() -> None:
+    stream = make_stream()
+    stream.feed(b'{"collectiontime": "2024-01-01T00:00:00", "TEMP"')
+    stream.feed(b': 1.5}\n\n{"collectiontime": "2024-01-01T00:01:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 2}')
+    assert stream.lines_received == 1
+    stream.close()
+    assert stream.lines_received == 2
+
+
+def test_flush_inserts_rows_like_an_upload_chunk() -> None:
+    stream = make_stream()
+    stream.feed(
+        b'{"collectiontime": "2024-01-01T00:00:00-06:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 1.5}\n'
+        b'{"collectiontime": "2024-01-01T00:01:00", "Lat_deg": "30.2", "Lon_deg": -97.5, "TEMP": 2, "RH": "80"}\n'
+        b'not json\n'
+        b'{"collectiontime": "yesterday", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 3}\n'
+        b'{"collectiontime": "2024-01-01T00:01:30", "Lat_deg": "north", "Lon_deg": -97.5, "TEMP": 3}\n'
+        b'{"collectiontime": "2024-01-01T00:01:45", "TEMP": 3}\n'
+        b'{"collectiontime": "2024-01-01T00:02:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "NOPE": 4}\n'
+    )
+    spans = {1: (datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 1))}
+    with patch.object(ndjson_ingest, "ingest_chunk", return_value=(3, 2, spans)) as ingest:
+        stream.flush()
+
+    chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id, _ = ingest.call_args.args
+    assert aliases == ["TEMP", "RH"] and alias_to_sensorid_map == {"TEMP": 1, "RH": 2}
+    assert (station_id, upload_event_id) == (5, 7)
+    # Offsets are dropped so times keep their wall-clock value, as in CSV uploads
+    assert chunk['collectiontime'].tolist() == [
+        pd.Timestamp("2024-01-01T00:00:00"), pd.Timestamp("2024-01-01T00:01:00"), pd.Timestamp("2024-01-01T00:02:00"),
+    ]
+    assert chunk['RH'].tolist()[1] == 80.0 and pd.isna(chunk['RH'].iloc[0])
+    assert chunk['Lat_deg'].tolist() == [30.1, 30.2, 30.1]
+    assert (stream.rows_parsed, stream.rows_inserted) == (3, 2)
+    assert stream.errors == [
+        "Line 3: invalid JSON (Expecting value: line 1 column 1 (char 0))",
+        "1 rows without a valid collectiontime",
+        "2 rows without a valid Lat_deg and Lon_deg",
+        "No sensor with alias 'NOPE' in station 5",
+    ]
+    assert stream.seconds_until_due() is None
+
+
+def test_non_numeric_values_are_counted_and_reported() -> None:
+    stream = make_stream()
+    stream.feed(
+        b'{"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": "abc"}\n'
+        b'{"collectiontime": "2024-01-01T00:01:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 2, "RH": null}\n'
+    )
+    with patch.object(ndjson_ingest, "ingest_chunk", return_value=(1, 1, {})) as ingest:
+        stream.flush()
+
+    chunk = ingest.call_args.args[0]
+    assert pd.isna(chunk['TEMP'].iloc[0]) and chunk['TEMP'].iloc[1] == 2.0
+    assert stream.values_rejected == 1
+    assert stream.errors == ["1 values of 'TEMP' are not numbers"]
+
+
+def test_due_by_size_and_by_age() -> None:
+    stream = make_stream(batch_rows=2)
+    assert not stream.due() and stream.seconds_until_due() is None
+    stream.feed(b'{}\n')
+    assert not stream.due()
+    stream.feed(b'{}\n')
+    assert stream.due()
+
+    stream = make_stream(flush_seconds=0.0)
+    stream.feed(b'{}\n')
+    assert stream.due()
+
+
+def make_service() -> MeasurementStreamService:
+    upload_file_event_repository = Mock(spec=UploadFileEventRepository)
+    upload_file_event_repository.db = Mock()
+    upload_file_event_repository.create_upload_event.return_value = UploadFileEvent(id=7)
+    sensor_repository = Mock(spec=SensorRepository)
+    sensor_repository.get_sensor_ids_by_alias.return_value = {"TEMP": 1}
+    return MeasurementStreamService(upload_file_event_repository, sensor_repository, Mock(spec=JobService))
+
+
+def ingest(chunk, aliases, alias_to_sensorid_map, station_id, upload_event_id, session):  # type: ignore[no-untyped-def]
+    return len(chunk), len(chunk), {1: (chunk['collectiontime'].min(), chunk['collectiontime'].max())}
+
+
+def test_stream_service_flushes_a_slow_body_on_time() -> None:
+    service = make_service()
+    upload_file_event_repository, job_service = service.upload_file_event_repository, service.job_service
+    flushed_before_second_line = []
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 1}\n'
+        await asyncio.sleep(0.3)
+        flushed_before_second_line.append(upload_file_event_repository.update_progress.call_count)
+        yield b'{"collectiontime": "2024-01-01T00:01:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 2}'
+
+    with patch("app.services.stream_service.get_settings") as settings, \
+            patch.object(ndjson_ingest, "ingest_chunk", side_effect=ingest):
+        settings.return_value.STREAM_BATCH_ROWS = 100
+        settings.return_value.STREAM_FLUSH_SECONDS = 0.1
+        response = asyncio.run(service.ingest(5, 2, body()))
+
+    assert flushed_before_second_line == [1]
+    assert response['lines_received'] == 2
+    assert response['Total measurements added to database'] == 2
+    assert response['values_rejected'] == 0
+    upload_file_event_repository.update_progress.assert_called_with(7, 2, 2, 0)
+    upload_file_event_repository.finish_processing.assert_called_once_with(7, [])
+    (_, station_id, campaign_id, spans), _ = job_service.enqueue_upload_refresh.call_args
+    assert (station_id, campaign_id) == (5, 2)
+    assert spans[1] == (pd.Timestamp("2024-01-01T00:00:00"), pd.Timestamp("2024-01-01T00:01:00"))
+
+
+def test_stream_service_stores_complete_lines_when_the_client_disconnects() -> None:
+    service = make_service()
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 1}\n{"collectiontime": "2024-01-01T00:0'
+        raise ClientDisconnect()
+
+    with patch.object(ndjson_ingest, "ingest_chunk", side_effect=ingest):
+        response = asyncio.run(service.ingest(5, 2, body()))
+
+    assert response['Total measurements added to database'] == 1
+    service.upload_file_event_repository.finish_processing.assert_called_once_with(7, [])
+    service.job_service.enqueue_upload_refresh.assert_called_once()
+
+
+def test_stream_service_database_error_is_recorded_and_raised() -> None:
+    service = make_service()
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"collectiontime": "2024-01-01T00:00:00", "Lat_deg": 30.1, "Lon_deg": -97.5, "TEMP": 1}\n'
+
+    with patch.object(ndjson_ingest, "ingest_chunk", side_effect=RuntimeError("current transaction is aborted")) as copy, \
+            pytest.raises(RuntimeError, match="aborted"):
+        asyncio.run(service.ingest(5, 2, body()))
+
+    # The failed insert is not retried on the aborted transaction
+    assert copy.call_count == 1
+    service.upload_file_event_repository.db.rollback.assert_called_once()
+    service.upload_file_event_repository.finish_processing.assert_called_once_with(
+        7, ["Stream failed: current transaction is aborted"]
+    )
+    service.job_service.enqueue_upload_refresh.assert_not_called()
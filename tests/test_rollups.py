@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.db.models.measurement_rollup import MeasurementRollup
+from app.utils.rollups import aggregate_rollups, choose_rollup_resolution, interval_start
+from app.utils.sketch import RELATIVE_ACCURACY, merge_sketches, sketch_bin, sketch_quantiles
+
+
+def test_sketch_quantiles_within_relative_accuracy() -> None:
+    values = np.random.default_rng(0).lognormal(mean=2.0, sigma=1.0, size=5000)
+    sketch: dict[str, int] = {}
+    for value in values:
+        key = sketch_bin(float(value))
+        sketch[key] = sketch.get(key, 0) + 1
+
+    for q, estimate in zip([0.025, 0.5, 0.975], sketch_quantiles(sketch, [0.025, 0.5, 0.975])):
+        exact = float(np.quantile(values, q))
+        assert estimate is not None
+        assert abs(estimate - exact) <= RELATIVE_ACCURACY * exact * 1.5
+
+
+def test_merge_sketches_adds_counts() -> None:
+    assert merge_sketches([{"p1": 2, "z": 1}, {"p1": 3, "n4": 1}]) == {"p1": 5, "z": 1, "n4": 1}
+
+
+def test_choose_rollup_resolution() -> None:
+    assert choose_rollup_resolution("hour", 1) == "hour"
+    assert choose_rollup_resolution("hour", 24) == "day"
+    assert choose_rollup_resolution("minute", 15) == "minute"
+    assert choose_rollup_resolution("month", 1, datetime(2024, 1, 1), datetime(2024, 3, 1, 6)) == "hour"
+    # Not aligned to any rollup bucket
+    assert choose_rollup_resolution("day", 1, datetime(2024, 1, 1, 0, 0, 30)) is None
+    assert choose_rollup_resolution("second", 1) is None
+
+
+def test_interval_start_matches_sql_grouping() -> None:
+    ts = datetime(2024, 5, 17, 13, 47, 12)
+    assert interval_start(ts, "minute", 15) == datetime(2024, 5, 17, 13, 45)
+    assert interval_start(ts, "hour", 6) == datetime(2024, 5, 17, 12)
+    assert interval_start(ts, "week", 1) == datetime(2024, 5, 13)
+    assert interval_start(ts, "month", 1) == datetime(2024, 5, 1)
+
+
+def test_aggregate_rollups_merges_buckets_and_drops_single_points() -> None:
+    def rollup(hour: int, values: list[float]) -> MeasurementRollup:
+        sketch: dict[str, int] = {}
+        for value in values:
+            sketch[sketch_bin(value)] = sketch.get(sketch_bin(value), 0) + 1
+        return MeasurementRollup(
+            sensorid=1, resolution="hour", bucket_start=datetime(2024, 1, 1, hour),
+            count=len(values), sum=sum(values), sum_sq=sum(v * v for v in values),
+            min=min(values), max=max(values), sketch=sketch,
+        )
+
+    result = aggregate_rollups(
+        [rollup(0, [1.0, 2.0]), rollup(1, [3.0, 4.0]), rollup(6, [5.0])], "hour", 6
+    )
+
+    assert len(result) == 1
+    assert result[0].measurement_time == datetime(2024, 1, 1)
+    assert result[0].point_count == 4
+    assert result[0].value == 2.5
+    assert abs(result[0].std_dev - float(np.std([1, 2, 3, 4], ddof=1))) < 1e-9
+    assert 1.0 <= result[0].lower_bound <= result[0].median_value <= result[0].upper_bound <= 4.0
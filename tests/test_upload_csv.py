@@ -0,0 +1,308 @@
+from datetime import datetime
+import io
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import UploadFile
+
+from app.utils import upload_csv
+from app.utils.upload_csv import copy_batch, process_measurements_file
+
+MEASUREMENTS_CSV = b"""collectiontime,Lat_deg,Lon_deg,TEMP,RH
+2024-01-01T00:00:00,30.1,-97.5,20.5,80
+2024-01-01T00:01:00,30.1,-97.5,,81
+2024-01-01T00:02:00,30.2,-97.4,21.0,82
+"""
+
+
+def test_copy_batch_streams_csv_and_merges() -> None:
+    session = MagicMock()
+    session.execute.return_value.rowcount = 2
+    cursor = session.connection.return_value.connection.cursor.return_value
+    batch = pd.DataFrame({
+        'sensorid': [1, 1], 'stationid': [5, 5],
+        'collectiontime': ['2024-01-01T00:00:00', '2024-01-01T00:01:00'],
+        'measurementvalue': [1.5, 2.5], 'lon': ['-97.5', '-97.5'], 'lat': ['30.1', '30.1'],
+        'variablename': ['TEMP, outside', 'TEMP, outside'], 'upload_file_events_id': [7, 7],
+    })
+
+    assert copy_batch(batch, session) == 2
+
+    sql, buffer = cursor.copy_expert.call_args.args
+    assert sql.startswith("COPY measurements_staging (sensorid, stationid, collectiontime")
+    assert buffer.getvalue().splitlines()[0] == '1,5,2024-01-01T00:00:00,1.5,-97.5,30.1,"TEMP, outside",7'
+    cursor.close.assert_called_once()
+    session.commit.assert_called_once()
+
+
+def test_copy_batch_empty() -> None:
+    session = Mock()
+    assert copy_batch(pd.DataFrame(columns=upload_csv.STAGING_COLUMNS), session) == 0
+    session.execute.assert_not_called()
+
+
+def test_process_measurements_file_spans_and_progress() -> None:
+    progress = Mock()
+    with patch.object(upload_csv, "copy_batch", side_effect=lambda batch, session: len(batch) - 1) as copy:
+        total, errors, spans = process_measurements_file(
+            UploadFile(io.BytesIO(MEASUREMENTS_CSV)), 5, {"TEMP": 1, "RH": 2, "WIND": 3}, 7, Mock(),
+            on_progress=progress,
+        )
+
+    (batch, _), = [call.args for call in copy.call_args_list]
+    assert sorted(batch['sensorid'].tolist()) == [1, 1, 2, 2, 2]
+    assert total == 4
+    assert len(errors) == 1 and "WIND" in errors[0]
+    assert spans[1] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2))
+    progress.assert_called_once_with(5, 4, 1)
+
+
+def test_process_measurements_file_in_chunks() -> None:
+    progress = Mock()
+    with patch.object(upload_csv, "CSV_CHUNK_ROWS", 2), \
+            patch.object(upload_csv, "copy_batch", side_effect=lambda batch, session: len(batch)) as copy:
+        total, errors, spans = process_measurements_file(
+            UploadFile(io.BytesIO(MEASUREMENTS_CSV)), 5, {"TEMP": 1, "RH": 2}, 7, Mock(), on_progress=progress,
+        )
+
+    assert [len(call.args[0]) for call in copy.call_args_list] == [3, 2]
+    assert total == 5 and errors == []
+    assert spans == {
+        1: (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2)),
+        2: (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2)),
+    }
+    assert [call.args for call in progress.call_args_list] == [(3, 3, 0), (5, 5, 0)]
+
+
+def test_process_measurements_file_spans_with_offsets_and_fractional_seconds() -> None:
+    csv = b"""collectiontime,Lat_deg,Lon_deg,TEMP,RH
+2024-01-01T00:00:00-06:00,30.1,-97.5,20.5,80
+2024-01-01T00:01:00.250Z,30.1,-97.5,,81
+2024-01-01T00:02:00+0530,30.2,-97.4,21.0,
+"""
+    with patch.object(upload_csv, "copy_batch", side_effect=lambda batch, session: len(batch)):
+        total, errors, spans = process_measurements_file(
+            UploadFile(io.BytesIO(csv)), 5, {"TEMP": 1, "RH": 2}, 7, Mock(),
+        )
+
+    assert total == 4 and errors == []
+    # Offsets are ignored, as Postgres does when storing a TIMESTAMP
+    assert spans[1] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2))
+    assert spans[2] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 1, 0, 250000))
+
+
+def test_extend_sensor_spans_with_mixed_layouts() -> None:
+    chunk = pd.DataFrame({
+        'collectiontime': ['2024-01-01 00:00:00.5', '01/02/2024 03:04', 'not a time', '2024-01-01T00:00:01'],
+        'TEMP': [1.0, 2.0, 3.0, None],
+    })
+    spans: dict = {}
+
+    upload_csv.extend_sensor_spans(spans, chunk, ["TEMP"], {"TEMP": 1})
+
+    assert spans == {1: (datetime(2024, 1, 1, 0, 0, 0, 500000), datetime(2024, 1, 2, 3, 4))}
+
+
+def test_melt_measurements_column_major() -> None:
+    chunk = pd.read_csv(io.BytesIO(MEASUREMENTS_CSV), na_values=[''], keep_default_na=False,
+                        dtype={'Lon_deg': 'str', 'Lat_deg': 'str'})
+
+    long = upload_csv.melt_measurements(chunk, ["TEMP", "RH"], {"TEMP": 1, "RH": 2}, 5, 7)
+
+    assert long['sensorid'].tolist() == [1, 1, 2, 2, 2]
+    assert long['variablename'].tolist() == ["TEMP", "TEMP", "RH", "RH", "RH"]
+    assert long['measurementvalue'].tolist() == [20.5, 21.0, 80, 81, 82]
+    assert long['collectiontime'].tolist()[:2] == ['2024-01-01T00:00:00', '2024-01-01T00:02:00']
+    assert long['lon'].tolist()[:2] == ['-97.5', '-97.4']
+    assert set(long['stationid']) == {5} and set(long['upload_file_events_id']) == {7}
+
+
+def test_process_measurements_file_with_worker_processes() -> None:
+    progress = Mock()
+    checkpoint = Mock()
+    # Forked workers inherit the patched module
+    with patch.object(upload_csv, "CSV_CHUNK_ROWS", 1), \
+            patch.object(upload_csv, "copy_batch", lambda batch, session: len(batch)):
+        total, errors, spans = process_measurements_file(
+            UploadFile(io.BytesIO(MEASUREMENTS_CSV)), 5, {"TEMP": 1, "RH": 2}, 7, Mock(),
+            on_progress=progress, processes=2, on_checkpoint=checkpoint,
+        )
+
+    assert total == 5 and errors == []
+    assert spans[1] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2))
+    assert progress.call_count == 3
+    assert progress.call_args.args == (5, 5, 0)
+    # The counters sent with a checkpoint only cover the chunks below it
+    rows, parsed, inserted = zip(*(call.args for call in checkpoint.call_args_list))
+    assert list(rows) == sorted(rows) and rows[-1] == 3
+    assert parsed[-1] == inserted[-1] == 5
+
+
+def failing_copy(batch: pd.DataFrame, session) -> int:
+    if batch['collectiontime'].iloc[0] == '2024-01-01T00:02:00':
+        raise RuntimeError("connection lost")
+    return len(batch)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_process_measurements_file_records_failed_chunk(processes: int) -> None:
+    session = Mock()
+    with patch.object(upload_csv, "CSV_CHUNK_ROWS", 1), \
+            patch.object(upload_csv, "copy_batch", failing_copy), \
+            patch.object(upload_csv, "UploadFileEventRepository") as repository_class, \
+            pytest.raises(upload_csv.ChunkIngestError):
+        process_measurements_file(
+            UploadFile(io.BytesIO(MEASUREMENTS_CSV)), 5, {"TEMP": 1, "RH": 2}, 7, session, processes=processes,
+        )
+
+    session.rollback.assert_called_once()
+    repository_class.return_value.finish_processing.assert_called_once_with(
+        7, ["Chunk 2 (data rows 3-3) failed: connection lost"]
+    )
+
+
+def test_process_sensors_file_inserts_only_new_aliases() -> None:
+    sensors_csv = b"alias,variablename,units\nTEMP,Temperature,C\nRH,Humidity,%\nRH,Humidity,%\n"
+    with patch.object(upload_csv, "SensorRepository") as repository_class:
+        repository = repository_class.return_value
+        repository.get_sensor_ids_by_alias.return_value = {"TEMP": 1}
+        repository.insert_sensors.return_value = {"RH": 2}
+
+        response = upload_csv.process_sensors_file(UploadFile(io.BytesIO(sensors_csv)), 5, 7, Mock())
+
+    assert response == {"TEMP": 1, "RH": 2}
+    repository.get_sensor_ids_by_alias.assert_called_once_with(5, ["TEMP", "RH"])
+    (new_sensors,), _ = repository.insert_sensors.call_args
+    assert new_sensors == [{
+        'alias': 'RH', 'variablename': 'Humidity', 'stationid': 5, 'upload_file_events_id': 7,
+        'units': '%', 'postprocess': None, 'postprocessscript': None,
+    }]
+
+
+def test_process_measurements_file_skips_committed_rows() -> None:
+    checkpoint = Mock()
+    with patch.object(upload_csv, "CSV_CHUNK_ROWS", 2), \
+            patch.object(upload_csv, "copy_batch", side_effect=lambda batch, session: len(batch)) as copy:
+        total, _, spans = process_measurements_file(
+            UploadFile(io.BytesIO(MEASUREMENTS_CSV)), 5, {"TEMP": 1, "RH": 2}, 7, Mock(),
+            skip_rows=1, on_checkpoint=checkpoint,
+        )
+
+    # Only rows 2 and 3 are inserted, but row 1 still bounds the time windows
+    assert [len(call.args[0]) for call in copy.call_args_list] == [1, 2]
+    assert total == 3
+    assert spans[2] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2))
+    assert [call.args for call in checkpoint.call_args_list] == [(2, 1, 1), (3, 3, 3)]
+
+
+def measurements_table() -> pa.Table:
+    return pa.table({
+        'collectiontime': pa.array(pd.to_datetime(["2024-01-01T00:00:00", "2024-01-01T00:01:00", "2024-01-01T00:02:00"])),
+        'Lat_deg': [30.1, 30.1, 30.2],
+        'Lon_deg': [-97.5, -97.5, -97.4],
+        'TEMP': [20.5, None, 21.0],
+        'RH': [80.0, 81.0, 82.0],
+    })
+
+
+def test_read_measurement_chunks_parquet_and_arrow() -> None:
+    table = measurements_table()
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet)
+    arrow_file = io.BytesIO()
+    with pa.ipc.new_file(arrow_file, table.schema) as writer:
+        writer.write_table(table)
+    arrow_stream = io.BytesIO()
+    with pa.ipc.new_stream(arrow_stream, table.schema) as writer:
+        writer.write_table(table)
+
+    for data in (parquet, arrow_file, arrow_stream):
+        data.seek(0)
+        with patch.object(upload_csv, "CSV_CHUNK_ROWS", 2):
+            chunks = list(upload_csv.read_measurement_chunks(data))
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert chunks[0]['collectiontime'].dtype == 'datetime64[ns]'
+        assert chunks[0]['TEMP'].isna().tolist() == [False, True]
+
+
+def test_read_measurement_chunks_csv() -> None:
+    chunks = list(upload_csv.read_measurement_chunks(io.BytesIO(MEASUREMENTS_CSV)))
+    assert len(chunks) == 1 and chunks[0]['Lon_deg'].tolist() == ['-97.5', '-97.5', '-97.4']
+
+
+def test_read_measurement_chunks_drops_time_zone() -> None:
+    table = pa.table({'collectiontime': pa.array(pd.to_datetime(["2024-01-01T00:00:00-06:00"]))})
+    data = io.BytesIO()
+    pq.write_table(table, data)
+    data.seek(0)
+
+    (chunk,) = upload_csv.read_measurement_chunks(data)
+
+    assert chunk['collectiontime'].tolist() == [pd.Timestamp("2024-01-01T00:00:00")]
+
+
+def test_encode_binary_copy() -> None:
+    batch = pd.DataFrame({
+        'sensorid': [3], 'stationid': [5], 'collectiontime': pd.to_datetime(["2000-01-01T00:00:01"]),
+        'measurementvalue': [1.5], 'lon': [-97.5], 'lat': [np.nan], 'upload_file_events_id': [7],
+    })
+
+    data = upload_csv.encode_binary_copy(batch)
+
+    assert data.startswith(upload_csv.BINARY_COPY_HEADER) and data.endswith(upload_csv.BINARY_COPY_TRAILER)
+    row = np.frombuffer(data[len(upload_csv.BINARY_COPY_HEADER):-2], dtype=upload_csv.BINARY_COPY_ROW)[0]
+    assert row['field_count'] == 7
+    assert (row['sensorid_size'], row['sensorid']) == (4, 3)
+    assert (row['collectiontime_size'], row['collectiontime']) == (8, 1_000_000)
+    assert row['measurementvalue'] == 1.5 and np.isnan(row['lat'])
+
+
+def test_encode_binary_copy_rejects_missing_times() -> None:
+    batch = pd.DataFrame({
+        'sensorid': [3], 'stationid': [5], 'collectiontime': pd.to_datetime([None]),
+        'measurementvalue': [1.5], 'lon': [-97.5], 'lat': [30.1], 'upload_file_events_id': [7],
+    })
+    with pytest.raises(ValueError):
+        upload_csv.encode_binary_copy(batch)
+
+
+def test_process_measurements_file_parquet_uses_binary_copy() -> None:
+    data = io.BytesIO()
+    pq.write_table(measurements_table(), data)
+    data.seek(0)
+    with patch.object(upload_csv, "copy_batch") as copy, \
+            patch.object(upload_csv, "copy_batch_binary", side_effect=lambda batch, session: len(batch)) as copy_binary:
+        total, errors, spans = process_measurements_file(
+            UploadFile(data), 5, {"TEMP": 1, "RH": 2}, 7, Mock(),
+        )
+
+    copy.assert_not_called()
+    (batch, _), = [call.args for call in copy_binary.call_args_list]
+    assert batch['lon'].tolist()[:2] == [-97.5, -97.4]
+    assert total == 5 and errors == []
+    assert spans[1] == (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 2))
+
+
+def test_copy_batch_binary_merges_with_aliases() -> None:
+    session = MagicMock()
+    session.execute.return_value.rowcount = 2
+    cursor = session.connection.return_value.connection.cursor.return_value
+    batch = pd.DataFrame({
+        'sensorid': [1, 2], 'stationid': [5, 5],
+        'collectiontime': pd.to_datetime(["2024-01-01T00:00:00", "2024-01-01T00:00:00"]),
+        'measurementvalue': [1.5, 2.5], 'lon': [-97.5, -97.5], 'lat': [30.1, 30.1],
+        'variablename': pd.Categorical(["TEMP", "RH"]), 'upload_file_events_id': [7, 7],
+    })
+
+    assert upload_csv.copy_batch_binary(batch, session) == 2
+
+    sql, buffer = cursor.copy_expert.call_args.args
+    assert sql.endswith("FROM STDIN WITH (FORMAT binary)")
+    assert buffer.getvalue().startswith(upload_csv.BINARY_COPY_HEADER)
+    merge_params = session.execute.call_args_list[1].args[1]
+    assert dict(zip(merge_params['aliases'], merge_params['sensor_ids'])) == {"TEMP": 1, "RH": 2}
+    session.commit.assert_called_once()
@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.api.v1.schemas.user import User
+from app.api.dependencies.auth import get_current_user
+from app.db.session import get_db
+
+MOCK_USER = User(
+    id=1,
+    username="testuser",
+    email="test@example.com",
+    is_active=True
+)
+
+UPLOAD_FILES = {
+    "upload_file_sensors": ("sensors.csv", b"alias\nTEMP\n", "text/csv"),
+    "upload_file_measurements": ("measurements.csv", b"collectiontime,TEMP\n", "text/csv"),
+}
+
+
+@pytest.fixture
+def client_with_auth():
+    app.dependency_overrides[get_current_user] = lambda: MOCK_USER
+    app.dependency_overrides[get_db] = lambda: Mock(spec=Session)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("background", ["true", "false"])
+def test_upload_permission_denied(client_with_auth, background):
+    with patch('app.api.v1.routes.upload_file.upload_csv.check_allocation_permission', return_value=False), \
+            patch('app.api.v1.routes.upload_file.upload_csv.JobService') as job_service:
+        response = client_with_auth.post(
+            f"/api/v1/uploadfile_csv/campaign/3/station/5/sensor?background={background}", files=UPLOAD_FILES
+        )
+
+    assert response.status_code == 403
+    job_service.assert_not_called()
+
+
+def test_stream_permission_denied(client_with_auth):
+    with patch('app.api.v1.routes.upload_file.upload_csv.check_allocation_permission', return_value=False), \
+            patch('app.api.v1.routes.upload_file.upload_csv.MeasurementStreamService') as stream_service:
+        response = client_with_auth.post(
+            "/api/v1/uploadfile_csv/campaign/3/station/5/stream", content=b'{"collectiontime": "2024-01-01"}\n'
+        )
+
+    assert response.status_code == 403
+    stream_service.assert_not_called()
+
+
+def test_resumable_upload_permission_denied(client_with_auth):
+    with patch('app.api.v1.routes.upload_file.upload_csv.check_allocation_permission', return_value=False), \
+            patch('app.api.v1.routes.upload_file.upload_csv.get_upload_service') as get_upload_service:
+        response = client_with_auth.post(
+            "/api/v1/uploadfile_csv/campaign/3/station/5/resumable",
+            files={"upload_file_sensors": UPLOAD_FILES["upload_file_sensors"]},
+        )
+
+    assert response.status_code == 403
+    get_upload_service.assert_not_called()
+
+
+@pytest.mark.parametrize("path", ["/api/v1/uploadfile_csv/events/7", "/api/v1/uploadfile_csv/events/7/jobs"])
+def test_upload_status_permission_denied(client_with_auth, path):
+    with patch('app.api.v1.routes.upload_file.upload_csv.check_allocation_permission', return_value=False) as check, \
+            patch('app.api.v1.routes.upload_file.upload_csv.get_upload_service') as get_upload_service, \
+            patch('app.api.v1.routes.upload_file.upload_csv.JobService') as job_service:
+        get_upload_service.return_value.get_campaign_id.return_value = 3
+        response = client_with_auth.get(path)
+
+    assert response.status_code == 403
+    check.assert_called_once_with(MOCK_USER, 3)
+    job_service.assert_not_called()
+
+
+def test_upload_status_unknown_campaign(client_with_auth):
+    with patch('app.api.v1.routes.upload_file.upload_csv.get_upload_service') as get_upload_service:
+        get_upload_service.return_value.get_campaign_id.return_value = None
+        response = client_with_auth.get("/api/v1/uploadfile_csv/events/7")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("method, path, kwargs, service_method", [
+    ("put", "/api/v1/uploadfile_csv/events/7/parts/1", {"files": {"part": ("part", b"x")}}, "save_part"),
+    ("get", "/api/v1/uploadfile_csv/events/7/parts", {}, "list_parts"),
+    ("post", "/api/v1/uploadfile_csv/events/7/complete?total_parts=1", {}, "complete_upload"),
+])
+def test_resumable_upload_parts_permission_denied(client_with_auth, method, path, kwargs, service_method):
+    with patch('app.api.v1.routes.upload_file.upload_csv.check_allocation_permission', return_value=False) as check, \
+            patch('app.api.v1.routes.upload_file.upload_csv.get_upload_service') as get_upload_service:
+        upload_service = get_upload_service.return_value
+        upload_service.get_campaign_id.return_value = 3
+        response = client_with_auth.request(method, path, **kwargs)
+
+    assert response.status_code == 403
+    check.assert_called_once_with(MOCK_USER, 3)
+    getattr(upload_service, service_method).assert_not_called()
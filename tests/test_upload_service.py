@@ -0,0 +1,70 @@
+import io
+from unittest.mock import Mock
+
+import pytest
+
+from app.db.models.upload_file_event import UploadFileEvent
+from app.db.repositories.upload_file_event_repository import UploadFileEventRepository
+from app.services import upload_service as upload_module
+from app.services.job_service import JobService
+from app.services.upload_service import UploadService
+
+
+@pytest.fixture
+def upload_service(tmp_path, monkeypatch) -> UploadService:
+    monkeypatch.setattr(upload_module, "upload_dir", lambda upload_event_id: tmp_path / str(upload_event_id))
+    repository = Mock(spec=UploadFileEventRepository)
+    repository.create_upload_event.return_value = UploadFileEvent(id=7)
+    return UploadService(repository, Mock(spec=JobService))
+
+
+def test_parts_are_joined_in_order(upload_service: UploadService, tmp_path) -> None:
+    upload_event_id = upload_service.create_resumable_upload(5, 2, io.BytesIO(b"alias\nTEMP\n"))
+    upload_service.save_part(upload_event_id, 2, io.BytesIO(b"2024-01-01,1\n"))
+    upload_service.save_part(upload_event_id, 1, io.BytesIO(b"collectiontime,TEMP\n"))
+    # A resent part replaces the earlier copy
+    assert upload_service.save_part(upload_event_id, 2, io.BytesIO(b"2024-01-01,2\n")) == 13
+    assert upload_service.list_parts(upload_event_id) == [1, 2]
+
+    upload_service.complete_upload(upload_event_id, 2)
+
+    assert (tmp_path / "7" / "measurements.csv").read_bytes() == b"collectiontime,TEMP\n2024-01-01,2\n"
+    assert not (tmp_path / "7" / "parts").exists()
+    upload_service.job_service.enqueue_upload_ingest.assert_called_once_with(7, 5, 2)
+
+
+def test_complete_reports_missing_parts(upload_service: UploadService) -> None:
+    upload_event_id = upload_service.create_resumable_upload(5, 2, io.BytesIO(b"alias\n"))
+    upload_service.save_part(upload_event_id, 2, io.BytesIO(b"x"))
+
+    with pytest.raises(ValueError, match=r"Missing parts: \[1, 3\]"):
+        upload_service.complete_upload(upload_event_id, 3)
+    upload_service.job_service.enqueue_upload_ingest.assert_not_called()
+
+
+def test_completing_again_requeues_ingest(upload_service: UploadService) -> None:
+    upload_event_id = upload_service.create_resumable_upload(5, 2, io.BytesIO(b"alias\n"))
+    upload_service.save_part(upload_event_id, 1, io.BytesIO(b"collectiontime\n"))
+    upload_service.complete_upload(upload_event_id, 1)
+
+    upload_service.complete_upload(upload_event_id, 1)
+
+    assert upload_service.job_service.enqueue_upload_ingest.call_count == 2
+    with pytest.raises(ValueError, match="already complete"):
+        upload_service.save_part(upload_event_id, 2, io.BytesIO(b"x"))
+
+
+def test_unknown_upload(upload_service: UploadService) -> None:
+    assert upload_service.list_parts(99) is None
+    assert upload_service.save_part(99, 1, io.BytesIO(b"x")) is None
+    assert upload_service.complete_upload(99, 1) is None
+
+
+def test_campaign_id_from_manifest_then_jobs(upload_service: UploadService) -> None:
+    upload_event_id = upload_service.create_resumable_upload(5, 2, io.BytesIO(b"alias\n"))
+    upload_service.job_service.get_upload_campaign_id.return_value = 4
+
+    assert upload_service.get_campaign_id(upload_event_id) == 2
+    # Once the files are ingested and removed only the queued jobs know the campaign
+    assert upload_service.get_campaign_id(99) == 4
+    upload_service.job_service.get_upload_campaign_id.assert_called_once_with(99)